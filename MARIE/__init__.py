@@ -1,4 +1,19 @@
 from .abstraction import MemoryABC
-from .memory import Memory
+from .memory import Memory, ArrayMemory, PagedMemory, SparseMemory
+from .image import MemoryImage
 from .assembler import Assembler
-from .marie import Marie
\ No newline at end of file
+from .marie import Marie, RunResult, MarieSnapshot
+from .engine import Engine, PredecodedEngine
+from .compiler import CompiledEngine
+from .vector import VectorMarie
+from .incremental import AssemblySession
+from .profiler import Profile, ProfilingEngine
+from .fusion import FusedEngine
+from .sinks import OutputSink, ListSink, RingBufferSink, FileSink, ExpectedSink, TeeSink
+from .linker import ObjectModule, Linker, assembleObject, loadObject, MarieLinkError
+from .render import StepRenderer
+from .debugger import Debugger, DebugEngine, DebugStop
+from .reverse import TraceRecorder, RecordingEngine
+from .runcache import RunCache
+from .accel import AcceleratedEngine, LoopSummary
+from .multicore import SharedMemory, MultiCore, MultiCoreResult, CoreStats
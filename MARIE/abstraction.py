@@ -31,7 +31,8 @@ keyWords = ['HEX','DEC', 'ADD', 'SUBT', 'ADDI', 'CLEAR', 'LOAD', 'STORE', 'INPUT
 class MemoryABC(ABC):
     '''
     Abstract definition of the memory simulator. Provides interfaces for querying and storing values within a Marie
-    like system. Should contain 4096 bytes of memory (simulated with an array of size 4096).
+    like system. Should contain 4096 words of memory by default, len() reports the addressable size (see SparseMemory
+    for configurable address widths).
     '''
     def store(self, value:int, address:int):
         '''
@@ -50,4 +51,10 @@ class MemoryABC(ABC):
             Args:
                 address (int): hex/decimal value for the target address
         '''
-        pass
\ No newline at end of file
+        pass
+
+    def __len__(self) -> int:
+        '''
+        Number of addressable words within the memory, default 4096.
+        '''
+        return 4096
\ No newline at end of file
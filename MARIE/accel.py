@@ -0,0 +1,269 @@
+# Loop acceleration for the MARIE simple computer. Summarizes small counted
+# loops whose bodies only make affine updates to the AC and memory words, and
+# applies every iteration up to the loop exit in one step when the trip count
+# follows from the current state.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 8/22/2025
+import sys
+from .engine import PredecodedEngine, _Halt
+from .memory import Memory, PagedMemory, SparseMemory
+
+#Longest loop body summarized, in instructions
+maxBody = 64
+
+#SKIPCOND conditions to the sign of the AC that skips
+_conditions = {0x000: -1, 0x400: 0, 0x800: 1}
+
+class LoopSummary():
+    '''
+    Symbolic summary of one iteration of a loop, built by following the body from its head with the branch outcomes
+    taken in the current state. Values are linear expressions, dicts of variable ('AC' or a memory address) to
+    coefficient with the constant under None, over the variables at the start of the iteration.
+
+    Attributes:
+        head (int): address of the first instruction of the body
+        length (int): number of instructions executed per iteration
+        code (set): addresses of the body instructions
+        updates (dict): variables written by the body mapped to their value at the end of the iteration
+        conditions (list): (expression, sign, skipped) tuple for each SKIPCOND, the loop continues while the sign test
+            of the expression gives the skipped outcome
+        stores (list): expressions stored to memory
+        translated (dict): variables updated as v + delta, mapped to the delta expression over invariant variables
+    '''
+    def __init__(self, head: int, length: int, code: set, updates: dict, conditions: list, stores: list,
+                 translated: dict):
+        self.head = head
+        self.length = length
+        self.code = code
+        self.updates = updates
+        self.conditions = conditions
+        self.stores = stores
+        self.translated = translated
+
+def _evaluate(expression: dict, values: dict) -> int:
+    total = expression.get(None, 0)
+    for name, coefficient in expression.items():
+        if name is not None:
+            total += coefficient * values[name]
+    return total
+
+def _combine(left: dict, right: dict, sign: int) -> dict:
+    result = dict(left)
+    for name, coefficient in right.items():
+        result[name] = result.get(name, 0) + sign * coefficient
+        if not result[name]:
+            del result[name]
+    return result
+
+def _firstFailure(start: int, slope: int, sign: int, skipped: bool):
+    '''
+    Returns the first iteration k >= 0 at which the SKIPCOND test of start + slope * k no longer gives the skipped
+    outcome, None if it never changes.
+    '''
+    if sign < 0:
+        start, slope, sign = -start, -slope, 1
+    if sign == 0:
+        if skipped:
+            return None if start == 0 and slope == 0 else (0 if start != 0 else 1)
+        if slope == 0:
+            return 0 if start == 0 else None
+        return -start // slope if -start % slope == 0 and -start // slope >= 0 else None
+    #Skips while the value is positive
+    if skipped:
+        if start <= 0:
+            return 0
+        return None if slope >= 0 else -(start // slope)
+    if start > 0:
+        return 0
+    return None if slope <= 0 else -start // slope + 1
+
+class AcceleratedEngine(PredecodedEngine):
+    '''
+    Pre-decoded engine fast-forwarding counted loops. When a backward JUMP lands on a loop head the body is summarized
+    once (see LoopSummary). Bodies qualify when they only LOAD, ADD, SUBT, STORE, CLEAR, SKIPCOND and JUMP, store outside
+    their own code, and every written variable is either updated by a loop invariant delta or recomputed without reading
+    its previous value. The trip count is then solved from the SKIPCOND tests and the 0xFFFF storage bound, and every
+    iteration before the exiting one is applied at once. The exiting iteration, and loops that do not qualify, run
+    instruction by instruction, so registers, memory and the step count match the fetch/decode loop exactly.
+
+    Only Memory, PagedMemory and SparseMemory are accelerated, other memories run every instruction.
+    '''
+    def __init__(self, machine):
+        super().__init__(machine)
+        self.summaries = {}
+        self.covers = {}
+        self.accelerate = type(self.memory) in (Memory, PagedMemory, SparseMemory)
+        self.iterations = 0
+
+    def invalidate(self, address: int):
+        self.table[address] = None
+        heads = self.covers.pop(address, None)
+        if heads:
+            for head in heads:
+                self.summaries.pop(head, None)
+
+    def summarize(self, head: int):
+        '''
+        Builds the summary of the loop starting at a passed address from the current state.
+
+        Returns:
+            summary (LoopSummary): loop summary, False if the loop does not qualify
+        '''
+        load = self.memory.load
+        values = {'AC': self.ac}
+        def value(name):
+            if name not in values:
+                values[name] = load(name)
+            return values[name]
+        env = {}
+        ac = {'AC': 1}
+        conditions, stores, code = [], [], []
+        pc = head
+        try:
+            while True:
+                if pc in code or len(code) >= maxBody:
+                    return False
+                code.append(pc)
+                word = load(pc)
+                inst, operand = (word >> 12) & 0xF, word & 0xFFF
+                if inst == 0x1:
+                    ac = env.get(operand, {operand: 1})
+                elif inst == 0x3 or inst == 0x4:
+                    ac = _combine(ac, env.get(operand, {operand: 1}), 1 if inst == 0x3 else -1)
+                elif inst == 0x2:
+                    env[operand] = ac
+                    stores.append(ac)
+                elif inst == 0xA:
+                    ac = {}
+                elif inst == 0x8:
+                    if operand in _conditions:
+                        current = _evaluate(ac, {name: value(name) for name in ac if name is not None})
+                        sign = _conditions[operand]
+                        skipped = (current > 0) - (current < 0) == sign
+                        conditions.append((ac, sign, skipped))
+                        if skipped:
+                            pc += 2
+                            continue
+                elif inst == 0x9:
+                    if operand == head:
+                        break
+                    pc = operand
+                    continue
+                else:
+                    return False
+                pc += 1
+        except Exception:
+            return False
+
+        code = set(code)
+        env['AC'] = ac
+        if any(address in code for address in env if address != 'AC'):
+            return False
+        expressions = list(env.values()) + stores + [condition[0] for condition in conditions]
+        read = {name for expression in expressions for name in expression if name is not None}
+        translated = {}
+        for name, expression in env.items():
+            rest = dict(expression)
+            if rest.pop(name, 0) == 1 and not any(other in env for other in rest if other is not None):
+                translated[name] = rest
+        for name, expression in env.items():
+            # Recomputed variables must not read their previous value and may only read translated or invariant variables
+            if name not in translated and (name in read or any(other in env and other not in translated
+                                                               for other in expression if other is not None)):
+                return False
+        return LoopSummary(head, len(code), code, env, conditions, stores, translated)
+
+    def apply(self, summary: LoopSummary, budget: int) -> int:
+        '''
+        Applies every iteration of a summarized loop before its exiting iteration, at most budget instructions.
+
+        Returns:
+            steps (int): number of instructions applied, 0 if no whole iteration can be applied
+        '''
+        load = self.memory.load
+        names = set(summary.updates)
+        for expression in list(summary.updates.values()) + summary.stores + [c[0] for c in summary.conditions]:
+            names.update(name for name in expression if name is not None)
+        values = {name: (self.ac if name == 'AC' else load(name)) for name in names}
+        deltas = {name: _evaluate(delta, values) for name, delta in summary.translated.items()}
+
+        def line(expression):
+            start = _evaluate(expression, values)
+            slope = sum(coefficient * deltas[name] for name, coefficient in expression.items() if name in deltas)
+            return start, slope
+
+        count = budget // summary.length
+        if budget == sys.maxsize:
+            count = None
+        for expression, sign, skipped in summary.conditions:
+            first = _firstFailure(*line(expression), sign, skipped)
+            if first is not None and (count is None or first < count):
+                count = first
+        for expression in summary.stores:
+            start, slope = line(expression)
+            if start > 0xFFFF:
+                return 0
+            if slope > 0:
+                first = (0xFFFF - start) // slope + 1
+                if count is None or first < count:
+                    count = first
+        if not count:
+            return 0
+
+        #State at the start of the last applied iteration, then one iteration of every update
+        last = dict(values)
+        for name, delta in deltas.items():
+            last[name] += (count - 1) * delta
+        store = self.store
+        for name, expression in summary.updates.items():
+            result = _evaluate(expression, last)
+            if name == 'AC':
+                self.ac = result
+            else:
+                store(result, name)
+                self.invalidate(name)
+        self.iterations += count
+        return count * summary.length
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table, summaries = self.table, self.summaries
+        decode, load = self.decode, self.load
+        jump = self._jump
+        accelerate = self.accelerate
+        self.ac = m.AC
+        self.halted = False
+        limit = sys.maxsize if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps < limit:
+                entry = table[pc]
+                if entry is None:
+                    entry = table[pc] = decode(load(pc))
+                target = entry[0](entry[1], pc + 1)
+                steps += 1
+                if target <= pc and accelerate and entry[0] == jump:
+                    summary = summaries.get(target)
+                    if summary is None:
+                        summary = summaries[target] = self.summarize(target)
+                        if summary:
+                            for address in summary.code:
+                                self.covers.setdefault(address, []).append(target)
+                    if summary:
+                        steps += self.apply(summary, sys.maxsize if maxSteps is None else limit - steps)
+                pc = target
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
@@ -0,0 +1,200 @@
+# Content-addressed assembly cache. Assembled memory images and address books
+# are keyed on a hash of the normalized source text and the assembler version,
+# held in an in-process LRU tier and an optional size bounded on-disk tier.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 6/6/2025
+from collections import OrderedDict
+import hashlib
+import os
+from .assembler import Assembler, ASSEMBLER_VERSION
+from .image import MemoryImageError
+from .memory import Memory
+
+def normalizeSource(lines) -> str:
+    '''
+    Normalizes Marie assembly source for hashing. Comments, blank lines, letter case and spacing do not change the
+    assembled image and are removed.
+
+    Args:
+        lines: iterable of source lines
+
+    Returns:
+        normalized (str): normalized source text
+    '''
+    normalized = []
+    for line in lines:
+        read = line.partition('/')[0].upper().replace(',', ' , ')
+        read = ' '.join(read.split())
+        if read:
+            normalized.append(read)
+    return '\n'.join(normalized)
+
+class AssemblyCache():
+    '''
+    Cache in front of the assembler returning stored memory images and address books for previously assembled sources.
+    Sources are keyed on a SHA-256 hash of the normalized source text and ASSEMBLER_VERSION. Failed assemblies are not
+    cached.
+
+    Attributes:
+        hits (int): lookups served from the in-process tier
+        diskHits (int): lookups served from the on-disk tier
+        misses (int): lookups that ran the assembler
+        evictions (int): entries evicted from the in-process tier
+        diskEvictions (int): image files evicted from the on-disk tier
+    '''
+    def __init__(self, maxEntries: int = 256, cacheDir: str = None, maxDiskBytes: int = 64 * 1024 * 1024):
+        '''
+        Args:
+            maxEntries (int): maximum number of entries held in the in-process LRU tier
+            cacheDir (str): directory for the on-disk tier, default no on-disk tier
+            maxDiskBytes (int): maximum total size of the on-disk tier, least recently used images are evicted first
+        '''
+        self.maxEntries = maxEntries
+        self.cacheDir = cacheDir
+        self.maxDiskBytes = maxDiskBytes
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.diskEvictions = 0
+        if cacheDir:
+            os.makedirs(cacheDir, exist_ok=True)
+
+    def key(self, source: str) -> str:
+        '''
+        Returns the cache key of a source text.
+        '''
+        normalized = normalizeSource(source.splitlines())
+        return hashlib.sha256(f'{ASSEMBLER_VERSION}\0{normalized}'.encode('utf-8')).hexdigest()
+
+    def assembleFile(self, filepath: str) -> tuple:
+        '''
+        Returns the assembled image of a source file, assembling it on a cache miss.
+
+        Args:
+            filepath (str): target file path to assemble
+
+        Returns:
+            (memory, address_book): a fresh Memory holding the image and a copy of the address book, None if the
+            assembly failed
+        '''
+        with open(filepath, 'r') as file:
+            return self.assembleString(file.read())
+
+    def assembleString(self, source: str) -> tuple:
+        '''
+        Returns the assembled image of a source string, assembling it on a cache miss.
+
+        Args:
+            source (str): Marie assembly source
+
+        Returns:
+            (memory, address_book): a fresh Memory holding the image and a copy of the address book, None if the
+            assembly failed
+        '''
+        key = self.key(source)
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+        else:
+            entry = self.__loadDisk(key)
+            if entry is not None:
+                self.diskHits += 1
+            else:
+                self.misses += 1
+                assembler = Assembler()
+                if not assembler.assembleString(source):
+                    return None
+                mem = assembler.memory
+                entry = (tuple(mem.memory[:mem._head + 1]), dict(assembler.address_book))
+                self.__saveDisk(key, entry)
+            self.__insert(key, entry)
+
+        words, address_book = entry
+        mem = Memory()
+        mem.memory[:len(words)] = words
+        mem._head = len(words) - 1
+        return mem, dict(address_book)
+
+    def __insert(self, key: str, entry: tuple):
+        self.__entries[key] = entry
+        while len(self.__entries) > self.maxEntries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def __loadDisk(self, key: str) -> tuple:
+        '''
+        Loads an entry from the on-disk tier, refreshing its modification time for LRU eviction.
+        '''
+        if not self.cacheDir:
+            return None
+        path = os.path.join(self.cacheDir, f'{key}.mri')
+        mem = Memory()
+        try:
+            address_book = mem.loadFromImage(key, os.path.join(self.cacheDir, ''))
+            os.utime(path)
+        except (OSError, MemoryImageError):
+            return None
+        return tuple(mem.memory[:mem._head + 1]), address_book
+
+    def __saveDisk(self, key: str, entry: tuple):
+        '''
+        Writes an entry to the on-disk tier and evicts least recently used images over the size bound. Images that can
+        not be represented in the image format are only held in the in-process tier.
+        '''
+        if not self.cacheDir:
+            return
+        words, address_book = entry
+        mem = Memory()
+        mem.memory[:len(words)] = words
+        mem._head = len(words) - 1
+        tmp = f'{key}.{os.getpid()}.tmp'
+        try:
+            mem.saveToImage(tmp, os.path.join(self.cacheDir, ''), address_book)
+        except MemoryImageError:
+            return
+        os.replace(os.path.join(self.cacheDir, f'{tmp}.mri'), os.path.join(self.cacheDir, f'{key}.mri'))
+        self.__evictDisk()
+
+    def __evictDisk(self):
+        files = []
+        total = 0
+        with os.scandir(self.cacheDir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.mri') and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.maxDiskBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.diskEvictions += 1
+
+    def stats(self) -> dict:
+        '''
+        Cache counters keyed by name, including the number of entries in the in-process tier.
+        '''
+        return {
+            'hits': self.hits,
+            'diskHits': self.diskHits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'diskEvictions': self.diskEvictions,
+            'entries': len(self.__entries)
+        }
+
+    def clear(self):
+        '''
+        Empties the in-process tier, the on-disk tier is kept.
+        '''
+        self.__entries.clear()
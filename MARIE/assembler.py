@@ -7,6 +7,107 @@
 from .memory import Memory
 from .abstraction import instruction_set, keyWords
 
+#Assembler version, change whenever the encoding of a source changes (invalidates cached assemblies)
+ASSEMBLER_VERSION = '2.0'
+
+#Data directives, all other keywords are instructions
+directives = {'HEX': 16, 'DEC': 10}
+keywords = frozenset(keyWords)
+maxKeyword = max(map(len, keyWords))
+
+def lexLine(line: str) -> tuple:
+    '''
+    Lexes a single source line. Strips comments and splits the address label from the statement.
+
+    Whitespace separates the keyword from its operand. For compatibility with sources written for the original
+    assembler, which ignored all whitespace, statements that do not split that way are read with whitespace removed
+    and the longest keyword prefix taken as the keyword ('LOADX' is LOAD X, 'ADDIX' is ADDI X), and whitespace
+    inside labels is ignored ('MY LABEL' is MYLABEL).
+
+    Args:
+        line (str): source line
+
+    Returns:
+        (label, keyword, operand): label and operand are None if not passed, None for blank lines
+
+    Raises:
+        StatementError: if addressing or keyword errors exist
+    '''
+    read = line.partition('/')[0].strip().upper()
+    if not read:
+        return None
+
+    #Split address label from statement
+    label, comma, statement = read.partition(',')
+    if comma:
+        if ',' in statement:
+            raise StatementError('addressing error')
+        label = ''.join(label.split())
+        if not label:
+            raise StatementError('missing address label')
+    else:
+        label, statement = None, label
+
+    #Statement is a keyword followed by an optional operand
+    parts = statement.split()
+    if parts and parts[0] in keywords and len(parts) <= 2:
+        return label, parts[0], parts[1] if len(parts) > 1 else None
+    joined = ''.join(parts)
+    for length in range(min(len(joined), maxKeyword), 0, -1):
+        if joined[:length] in keywords:
+            return label, joined[:length], joined[length:] or None
+    raise StatementError('keyword missing exception')
+
+def encodeStatement(keyword: str, operand: str, address_book: dict) -> int:
+    '''
+    Encodes a lexed statement.
+
+    Args:
+        keyword (str): MARIE instruction or data directive
+        operand (str): operand token, None if not passed
+        address_book (dict): label to address mapping used to resolve operands
+
+    Returns:
+        16-bit integer value containing MARIE style opcode and operand (0xFFFF)
+
+    Raises:
+        StatementError: if the operand can not be interpreted
+    '''
+    if keyword in directives:
+        if operand is None:
+            return 0x0
+        try:
+            return int(operand, directives[keyword])
+        except ValueError:
+            raise StatementError('integer expected')
+    opcode = instruction_set[keyword]
+    if operand is None:
+        return opcode << 12
+    value = address_book[operand] if operand in address_book else checkSkipcond(operand)
+    return opcode << 12 | value
+
+def checkSkipcond(string: str) -> int:
+    '''
+    Helper function used to verify skipcond operands. Accepts a string value and attempts to interpret the value as a hexadecimal integer.
+
+    Args:
+        string (str): string expected to contain the scipcond opperand
+    
+    Returns:
+        MARIE style SkipCond condition value [0x000, 0x400, 0x800]
+    
+    Raises:
+        StatementError: If there is a ValueError thrown during conversion or if operand is outside the accepted skipcond operand inputs [000, 400, 800]
+    '''
+    try:
+        value = int(string, 16)
+    except:
+        raise StatementError('value error')
+    if value in [0x000, 0x400, 0x800]:
+        return value
+    else:
+        raise StatementError('skipcond improper condition passed')
+
 class Assembler:
     
     def __init__(self):
@@ -15,140 +116,96 @@ class Assembler:
         '''
         self.memory = Memory()
         self.address_book = {} # keeps track of specified addresses
+        self.line_book = {} # source line number of each assembled address
         self.instruction_set = instruction_set
         self._itr = 0
-        self._readOffset = 0
+        self._line = 0
     
     def __getOperatingLine(self) -> str:
-        return f'{self._itr + 1 + self._readOffset}'
-        
-    def __nonBlank(self, file):
-        '''
-        Generator function used to return non-blank lines within a read file
-        '''
-        for line in file:
-            read = line.strip().upper()
-            read = read[:read.find('/')] if '/' in read else read
-            if read:
-                yield read
-            else:
-                self._readOffset += 1
-    
-    def __readComponents(self, file):
-        '''
-        Generator function used to iterate a passed file and yield component lists formatted for MARIE command interpretation.
-        '''
-        for line in file:
-            read = line.strip().upper().replace(' ', '')
-            read = read[:read.find('/')] if '/' in read else read
-            if read:
-                read = read.split(',')[1] if ',' in read else read
-                
-                #Read line left to right
-                out = []
-                r = ''
-                while read:
-                    r += read[0]
-                    read = read[1:]
-
-                    if r in keyWords:
-                        out.append(r)
-                        r = ''
-                #Last component expected to be operand
-                if r:
-                    out.append(r)
-                yield out
-            else:
-                self._readOffset += 1
-
-    def __scan(self, line:str):
+        return f'{self._line}'
+
+    def __tokenize(self, lines) -> list:
         '''
-        Initial document scan function focused on building an address book for use during line interpretation and detecting keyword errors.
+        Single pass lexer over source lines. Skips blank lines and builds the address and line books.
 
         Args:
-            line (str): Document line being scanned
-        
+            lines: iterable of source lines
+
+        Returns:
+            tokens (list): (line number, keyword, operand) tuple for each statement, operand is None if not passed
+
         Raises:
-            MarieAssemblyError: if addressig or keyword errors exist
+            MarieAssemblyError: if addressing or keyword errors exist
         '''
-        ln = line
-
-        #Build address book and check for addressing errors
-        if ',' in ln:
-            tmp = ln.split(',')
-
-            # Raise error if line cotains multiple address markers
-            if (len(tmp) > 2):
-                raise MarieAssemblyError(f'addressing error at line {self.__getOperatingLine()}')
-            if not tmp[0]:
-                raise MarieAssemblyError(f'missing address label at line {self.__getOperatingLine()}')
-            ad = tmp[0]
-            ln = tmp[1]
-            self.address_book[ad] = self._itr
-        
-        # Ensure every line contains a keyword
-        if not any(kw in line for kw in keyWords):
-            raise MarieAssemblyError(f'keyword missing exception at line {self.__getOperatingLine()}')
-    
-    def __interpret(self, components:list) -> int:
+        tokens = []
+        for self._line, line in enumerate(lines, 1):
+            try:
+                lexed = lexLine(line)
+            except StatementError as e:
+                raise MarieAssemblyError(f'{e} at line {self.__getOperatingLine()}')
+            if lexed is None:
+                continue
+            label, keyword, operand = lexed
+            if label is not None:
+                self.address_book[label] = len(tokens)
+            self.line_book[len(tokens)] = self._line
+            tokens.append((self._line, keyword, operand))
+        return tokens
+
+    def __interpret(self, keyword: str, operand: str) -> int:
         '''
-        Interprets pre-prossessed lists containing MARIE keywords, integers, and address values. The __readComponents()
-        generator method is used to create these component lists.
+        Encodes a tokenized statement.
 
         Args:
-            component (list): List containing MARIE keywords, integers, and addresses
-        
+            keyword (str): MARIE instruction or data directive
+            operand (str): operand token, None if not passed
+
         Returns:
             16-bit integer value containing MARIE style opcode and operand (0xFFFF)
         '''
-        isInt, isHex = False, False
-        opcode = 0x0
-        operand = 0x0
-        for cmp in components:
-            if isInt:
-                try:
-                    if isHex:
-                        operand = int(cmp,16)
-                        isHex = False
-                    else:
-                        operand = int(cmp)
-                    isInt = False
-                except:
-                    raise MarieAssemblyError(f'integer expected at line {self.__getOperatingLine()}')
-            else:
-                if cmp in keyWords:
-                    if cmp in ['HEX','DEC']:
-                        isInt = True
-                        if cmp == 'HEX':
-                            isHex = True
-                        continue
-                    opcode = self.instruction_set[cmp]
-                    continue
-                operand = self.address_book[cmp] if cmp in self.address_book else self.__checkSkipcond(cmp)
-        return opcode << 12 | operand
-    
-    def __checkSkipcond(self, string: str) -> int:
+        try:
+            return encodeStatement(keyword, operand, self.address_book)
+        except StatementError as e:
+            raise MarieAssemblyError(f'{e} at line {self.__getOperatingLine()}')
+
+    def assembleLines(self, lines) -> bool:
         '''
-        Helper function used to verify skipcond operands. Accepts a string value and attempts to interpret the value as a hexadecimal integer.
+        Attempts to assemble Marie assembly code from an iterable of source lines. Returns True if the Assembly was
+        successful. The assembled programs are inserted into a MemoryABC object in a MARIE readable format.
 
         Args:
-            string (str): string expected to contain the scipcond opperand
-        
+            lines: iterable of source lines, such as an open file or a list of strings
+
         Returns:
-            MARIE style SkipCond condition value [0x000, 0x400, 0x800]
-        
-        Raises:
-            MarieAssemblyError: If there is a ValueError thrown during conversion or if operand is outside the accepted skipcond operand inputs [000, 400, 800]
+            complete (bool): True if the assembly was successful, otherwise False
         '''
+        self._itr = 0
+        self._line = 0
+        complete = False
         try:
-            value = int(string, 16)
-        except:
-            raise MarieAssemblyError(f'value error at line {self.__getOperatingLine()}')
-        if value in [0x000, 0x400, 0x800]:
-            return value
-        else:
-            raise MarieAssemblyError(f'skipcond improper condition passed at line {self.__getOperatingLine()}')
+            #Tokenize document and build address book
+            tokens = self.__tokenize(lines)
 
+            #Interpret document
+            for self._itr, (self._line, keyword, operand) in enumerate(tokens):
+                self.memory.store(self.__interpret(keyword, operand), self._itr)
+            complete = True
+
+        except Exception as e:
+            print(f'{e}')
+        return complete
+
+    def assembleString(self, source: str) -> bool:
+        '''
+        Attempts to assemble Marie assembly code held in a string. Returns True if the Assembly was successful.
+
+        Args:
+            source (str): Marie assembly source
+
+        Returns:
+            complete (bool): True if the assembly was successful, otherwise False
+        '''
+        return self.assembleLines(source.splitlines())
 
     def assembleFile(self, filepath: str) -> bool:
         '''
@@ -161,33 +218,18 @@ class Assembler:
         Returns:
             complete (bool): True if the assembly was successful, otherwise False
         '''
-        self._itr = 0
-        self._readOffset = 0
-        complete = False
         with open(filepath, 'r') as file:
-            try:
-                #Scan document for errors
-                for line in self.__nonBlank(file):
-                    self.__scan(line)
-                    self._itr += 1
-                
-                #Interpret document
-                file.seek(0)
-                self._itr = 0
-                self._readOffset = 0
-                for cmp in self.__readComponents(file):
-                    value = self.__interpret(cmp)
-                    self.memory.store(value,self._itr)
-                    self._itr += 1
-                complete = True
-
-            except Exception as e:
-                print(f'{e}')
-        return complete
+            return self.assembleLines(file)
 
 class MarieAssemblyError(Exception):
     '''
     Marie program assembly exception thrown during assembly errors
     '''
     def __init__(self, message = 'file could not be assembled as passed.'):
-        super().__init__(f'Assembly Error: {message}')
\ No newline at end of file
+        super().__init__(f'Assembly Error: {message}')
+
+class StatementError(Exception):
+    '''
+    Single statement assembly error, raised without line information and reported by callers as a MarieAssemblyError
+    '''
+    pass
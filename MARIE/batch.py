@@ -0,0 +1,272 @@
+# Batch runner for executing many MARIE programs against many input sets.
+# Jobs are spread over a process pool in chunks, programs are assembled once
+# per worker and results stream back as chunks finish.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 5/23/2025
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from io import StringIO
+import json
+import os
+import time
+from .assembler import Assembler
+from .marie import Marie
+from .memory import Memory
+from .runcache import RunCache
+from .sinks import ExpectedSink
+
+class Job():
+    '''
+    Single batch job, one program run against one input set.
+
+    Attributes:
+        program (str): path to a '.mas' source file or a '.mri' binary image
+        inputs (list): input values passed to the program
+        expected (list): expected output values, None if the outputs are not checked
+        maxSteps (int): step limit for the run, None for the runner default
+        timeout (float): wall-clock limit in seconds for the run, None for the runner default
+        id: job identifier reported with the result, default the job's position in the manifest
+    '''
+    def __init__(self, program: str, inputs: list = None, expected: list = None, maxSteps: int = None,
+                 timeout: float = None, id = None):
+        self.program = program
+        self.inputs = list(inputs or [])
+        self.expected = None if expected is None else list(expected)
+        self.maxSteps = maxSteps
+        self.timeout = timeout
+        self.id = id
+
+class JobResult():
+    '''
+    Result of a batch job.
+
+    Attributes:
+        id: job identifier
+        program (str): program path
+        outputs (list): values output by the program
+        expected (list): expected output values, None if not checked
+        passed (bool): True if the run halted without error and matched the expected outputs, None if not checked
+        steps (int): number of instructions executed
+        halted (bool): True if the program halted
+        error (str): error message, None if the run halted normally
+        errorType (str): error class name, None if the run halted normally
+        elapsed (float): run time in seconds
+    '''
+    def __init__(self, id, program: str, outputs: list, expected: list, steps: int, halted: bool,
+                 error: str = None, errorType: str = None, elapsed: float = 0.0):
+        self.id = id
+        self.program = program
+        self.outputs = outputs
+        self.expected = expected
+        self.steps = steps
+        self.halted = halted
+        self.error = error
+        self.errorType = errorType
+        self.elapsed = elapsed
+        if expected is None:
+            self.passed = None
+        else:
+            self.passed = halted and error is None and outputs == expected
+
+    def __repr__(self):
+        return f'JobResult(id={self.id!r}, passed={self.passed}, outputs={self.outputs}, steps={self.steps}, error={self.error!r})'
+
+def loadManifest(filepath: str) -> list:
+    '''
+    Loads batch jobs from a JSON lines manifest, one job object per line with the keys 'program', 'inputs', 'expected',
+    'maxSteps', 'timeout' and 'id'. Relative program paths are resolved against the manifest's directory.
+
+    Args:
+        filepath (str): manifest file path
+
+    Returns:
+        jobs (list): list of Job objects
+    '''
+    base = os.path.dirname(os.path.abspath(filepath))
+    jobs = []
+    with open(filepath, 'r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            entry['program'] = os.path.join(base, entry['program'])
+            jobs.append(Job(**entry))
+    return jobs
+
+#Per-worker program cache, program path to (image words, assembly error)
+_programs = {}
+
+def _loadProgram(program: str) -> tuple:
+    '''
+    Assembles or loads a program once per worker process.
+
+    Returns:
+        (words, error): memory image words up to the program head, or None and an error message
+    '''
+    key = (program, os.path.getmtime(program))
+    if key not in _programs:
+        mem = Memory()
+        error = None
+        if program.endswith('.mri'):
+            mem.loadFromImage(os.path.basename(program)[:-4], os.path.join(os.path.dirname(program), ''))
+        else:
+            assembler = Assembler()
+            log = StringIO()
+            with redirect_stdout(log):
+                complete = assembler.assembleFile(program)
+            if not complete:
+                error = log.getvalue().strip() or 'assembly failed'
+            mem = assembler.memory
+        _programs[key] = (None, error) if error else (mem.memory[:mem._head + 1], None)
+    return _programs[key]
+
+#Per-worker run caches, cache directory to RunCache
+_caches = {}
+
+def _runJob(job: Job, engine, maxSteps: int, timeout: float, detectLoops: bool = False,
+            stopOnMismatch: bool = False, cacheDir: str = None) -> JobResult:
+    '''
+    Runs a single job in the current process.
+    '''
+    start = time.perf_counter()
+    errorType = 'MarieAssemblyError'
+    try:
+        words, error = _loadProgram(job.program)
+    except Exception as e:
+        words, error, errorType = None, f'{e}', type(e).__name__
+    if error:
+        return JobResult(job.id, job.program, [], job.expected, 0, False, error, errorType,
+                         time.perf_counter() - start)
+
+    mem = Memory()
+    mem.memory[:len(words)] = words
+    mem._head = len(words) - 1
+    output = ExpectedSink(job.expected) if stopOnMismatch and job.expected is not None else None
+    maxSteps = maxSteps if job.maxSteps is None else job.maxSteps
+    timeout = timeout if job.timeout is None else job.timeout
+    if cacheDir and output is None and not detectLoops:
+        if cacheDir not in _caches:
+            _caches[cacheDir] = RunCache(cacheDir)
+        result = _caches[cacheDir].run(Marie(mem), job.inputs, maxSteps, engine, timeout)
+    else:
+        result = Marie(mem).run(job.inputs, maxSteps = maxSteps, output = output, engine = engine, timeout = timeout,
+                                detectLoops = detectLoops)
+    error = result.error
+    return JobResult(job.id, job.program, result.outputs, job.expected, result.steps, result.halted,
+                     None if error is None else f'{error}',
+                     None if error is None else type(error).__name__,
+                     time.perf_counter() - start)
+
+def _runChunk(jobs: list, engine, maxSteps: int, timeout: float, detectLoops: bool = False,
+              stopOnMismatch: bool = False, cacheDir: str = None) -> list:
+    '''
+    Worker entry point, runs a chunk of jobs and returns their results.
+    '''
+    return [_runJob(job, engine, maxSteps, timeout, detectLoops, stopOnMismatch, cacheDir) for job in jobs]
+
+def _failChunk(jobs: list, error: Exception) -> list:
+    '''
+    Returns errored results for a chunk of jobs whose worker failed.
+    '''
+    return [JobResult(job.id, job.program, [], job.expected, 0, False, f'{error}', type(error).__name__)
+            for job in jobs]
+
+class BatchRunner():
+    '''
+    Runs batches of jobs over a process pool. Jobs are grouped by program and split into chunks so each worker assembles
+    a program once and reuses it across that program's input sets.
+    '''
+    def __init__(self, workers: int = None, chunkSize: int = 32, engine = None, maxSteps: int = None, timeout: float = None,
+                 detectLoops: bool = False, stopOnMismatch: bool = False, cacheDir: str = None):
+        '''
+        Args:
+            workers (int): number of worker processes, default os.cpu_count(), 0 runs jobs in the calling process
+            chunkSize (int): maximum number of jobs sent to a worker at once
+            engine: optional Engine subclass used for every run (see MARIE.engine)
+            maxSteps (int): default per-job step limit
+            timeout (float): default per-job wall-clock limit in seconds
+            detectLoops (bool): stop jobs whose machine state repeats, see Marie.run()
+            stopOnMismatch (bool): stop jobs with expected outputs at their first wrong output
+            cacheDir (str): run result cache directory shared by the workers, jobs whose program image and inputs were
+                run before are served without executing (see MARIE.runcache), default no cache. Jobs run with loop
+                detection or stopOnMismatch are not cached
+        '''
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunkSize = chunkSize
+        self.engine = engine
+        self.maxSteps = maxSteps
+        self.timeout = timeout
+        self.detectLoops = detectLoops
+        self.stopOnMismatch = stopOnMismatch
+        self.cacheDir = cacheDir
+
+    def __chunks(self, jobs: list) -> list:
+        '''
+        Groups jobs by program and splits them into chunks, programs with fewer jobs than the chunk size share chunks.
+        '''
+        byProgram = {}
+        for job in jobs:
+            byProgram.setdefault(job.program, []).append(job)
+        chunks, current = [], []
+        for group in byProgram.values():
+            for job in group:
+                current.append(job)
+                if len(current) == self.chunkSize:
+                    chunks.append(current)
+                    current = []
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def run(self, jobs):
+        '''
+        Runs a manifest of jobs, yielding results as their chunks finish.
+
+        Args:
+            jobs: iterable of Job objects or job dictionaries (see Job for keys)
+
+        Yields:
+            result (JobResult): result of each job, in completion order. Jobs of a chunk whose worker failed, for example
+                a worker process killed mid-chunk, report the failure as their error
+        '''
+        manifest = []
+        for i, job in enumerate(jobs):
+            if isinstance(job, dict):
+                job = Job(**job)
+            if job.id is None:
+                job.id = i
+            manifest.append(job)
+
+        chunks = self.__chunks(manifest)
+        if self.workers == 0:
+            for chunk in chunks:
+                yield from _runChunk(chunk, self.engine, self.maxSteps, self.timeout, self.detectLoops,
+                                     self.stopOnMismatch, self.cacheDir)
+            return
+
+        args = (self.engine, self.maxSteps, self.timeout, self.detectLoops, self.stopOnMismatch, self.cacheDir)
+        broken = []
+        with ProcessPoolExecutor(max_workers = self.workers) as pool:
+            futures = {pool.submit(_runChunk, chunk, *args): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    broken.append(futures[future])
+                    continue
+                except Exception as e:
+                    results = _failChunk(futures[future], e)
+                yield from results
+
+        #A dying worker breaks the pool and fails every unfinished chunk, rerun those one pool each so only the chunk
+        #that crashed reports errors
+        for chunk in broken:
+            with ProcessPoolExecutor(max_workers = 1) as pool:
+                try:
+                    results = pool.submit(_runChunk, chunk, *args).result()
+                except Exception as e:
+                    results = _failChunk(chunk, e)
+            yield from results
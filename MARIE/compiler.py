@@ -0,0 +1,438 @@
+# Region compiler for the MARIE simple computer. Runs the pre-decoded table and,
+# once a loop header is hot, compiles the basic blocks reachable from it into one
+# Python function that keeps AC, PC and the step count in local variables for as
+# long as control stays inside the region.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 5/9/2025
+from sys import maxsize
+from .engine import PredecodedEngine, _Halt
+
+#Block terminating opcodes (JNS, HALT, SKIPCOND, JUMP, JUMPI)
+terminators = {0x0, 0x7, 0x8, 0x9, 0xC}
+
+#Compiled regions shared by every engine in the process, start address to a list of (addresses, words, leaders,
+#volatile, builder, faults). Exploring a region only reads its own words, so a cached region whose words match memory
+#is the region exploring would find
+_regionCode = {}
+
+#Largest number of cached region builders, the cache is emptied when full
+cacheSize = 256
+
+#Back-edges interpreted at loop headers with no cached region, counted across every engine in the process
+_backEdges = {}
+
+class _Enter(Exception):
+    '''
+    Raised by the table entry of a compiled region header to leave the dispatch loop and run the region
+    '''
+    pass
+
+class Region():
+    '''
+    Compiled region.
+
+    Attributes:
+        start (int): address of the loop header the region is entered at
+        words (dict): address to instruction word of every word compiled into the region
+        volatile (set): addresses written by the region itself, executed from the pre-decoded table instead of compiled
+        function: compiled region function, called with the AC and a step budget and returning
+            (AC, PC, executed count, last instruction word, status)
+    '''
+    def __init__(self, start: int, words: dict, volatile: set, function, alive: list):
+        self.start = start
+        self.words = words
+        self.volatile = volatile
+        self.function = function
+        self.alive = alive
+
+    def __len__(self):
+        return len(self.words)
+
+class CompiledEngine(PredecodedEngine):
+    '''
+    Execution engine compiling hot loops into Python functions. Code runs from the pre-decoded table until a backward
+    JUMP has reached a loop header threshold times, then the basic blocks reachable from the header (ending at JUMP,
+    SKIPCOND, JNS, JUMPI and HALT), called subroutines included, are compiled into one function entered through the
+    header's table entry. Inside the function blocks branch to each other directly and the registers are written back
+    only when control leaves the region.
+
+    Words the region stores into, such as patched instructions, are executed from the table. A store from elsewhere into
+    a compiled word deoptimizes the region, headers deoptimized too often stay on the table.
+
+    Compiling a region costs a millisecond or more, about as much as a thousand compiled loop iterations save, so regions
+    are only compiled once their header has been reached that often by backward jumps, counted across every run in the
+    process. Compiled code is cached per process by region contents and installed after threshold backward jumps, so
+    short programs run at table speed on their first run and compiled on repeated runs (batch jobs, runMany, benchmarks).
+    '''
+    #Backward jumps to a header before a cached region is installed
+    threshold = 2
+    #Backward jumps to a header, across runs in the process, before a region missing from the cache is compiled
+    compileThreshold = 1000
+    #Maximum number of words in a region
+    maxRegion = 256
+    #Deoptimizations before a header is no longer compiled
+    maxDeopts = 4
+
+    def __init__(self, machine):
+        super().__init__(machine)
+        self.regions = {}
+        self.owner = {}
+        self.__countdown = {} # loop header to backward jumps left before its next decision
+        self.__armed = {} # loop header to its countdown when back-edges were last added to _backEdges
+        self.__deopts = {}
+        self.__enterHandler = self.__enter
+
+    def __readInput(self, pc: int) -> int:
+        m = self.machine
+        m.PC = pc
+        m.InReg = m._readInput()
+        return m.InReg
+
+    def __output(self, value: int):
+        m = self.machine
+        m.OutReg = value
+        m._writeOutput(value)
+
+    def __enter(self, operand: int, pc: int) -> int:
+        raise _Enter()
+
+    def drop(self, address: int):
+        '''
+        Deoptimizes every compiled region covering a written address.
+
+        Args:
+            address (int): written memory address
+        '''
+        for start in list(self.owner.get(address, ())):
+            region = self.regions[start]
+            for a in region.words:
+                owners = self.owner.get(a)
+                if owners is not None:
+                    owners.discard(start)
+                    if not owners:
+                        del self.owner[a]
+            region.alive[0] = False
+            self.table[start] = None
+            self.__countdown.pop(start, None)
+            self.__armed.pop(start, None)
+            deopts = self.__deopts.get(start, 0) + 1
+            self.__deopts[start] = deopts
+            self.regions[start] = False if deopts >= self.maxDeopts else None
+
+    def invalidate(self, address: int):
+        self.table[address] = None
+        if address in self.owner:
+            self.drop(address)
+
+    def _jump(self, operand: int, pc: int) -> int:
+        if operand < pc:
+            countdown = self.__countdown
+            left = countdown.get(operand, self.threshold) - 1
+            countdown[operand] = left
+            if not left:
+                self.__hot(operand)
+        return operand
+
+    def __hot(self, start: int):
+        '''
+        Decides what a loop header does once its countdown ends: install a cached region, compile a region once the
+        process has seen compileThreshold back-edges to it, or keep counting.
+        '''
+        self.__countEdges()
+        armed = start in self.__armed
+        if self.regions.get(start) is None and self.compileRegion(start, cachedOnly = not armed) is None \
+                and self.regions.get(start) is None:
+            left = max(self.compileThreshold - _backEdges.get(start, 0), 1)
+            self.__countdown[start] = self.__armed[start] = left
+            return
+        self.__armed.pop(start, None)
+        self.__countdown[start] = maxsize
+
+    def __countEdges(self):
+        '''
+        Adds the back-edges counted down since the last call to the process-wide counts.
+        '''
+        countdown = self.__countdown
+        for start, armed in self.__armed.items():
+            left = countdown[start]
+            _backEdges[start] = _backEdges.get(start, 0) + armed - left
+            self.__armed[start] = left
+
+    def __explore(self, start: int) -> tuple:
+        '''
+        Collects the words reachable from a region start. Words stored into by the region are volatile, assumed to fall
+        through and not followed.
+
+        Returns:
+            (words, leaders, volatile): address to word of the region's words, block start addresses, volatile addresses
+        '''
+        load, size = self.load, len(self.memory)
+        volatile = set()
+        while True:
+            words, leaders = {}, {start}
+            pending = [start]
+            while pending:
+                address = pending.pop()
+                while 0 <= address < size and len(words) < self.maxRegion:
+                    if address in words:
+                        leaders.add(address)
+                        break
+                    word = words[address] = load(address)
+                    inst, operand = (word >> 12) & 0xF, word & 0xFFF
+                    if address in volatile:
+                        leaders.update((address, address + 1))
+                    elif inst > 0xC:
+                        #Executed from the table, which raises the invalid instruction error
+                        leaders.add(address)
+                        break
+                    elif inst == 0x7 or inst == 0xC:
+                        break
+                    elif inst in terminators:
+                        if inst == 0x9:
+                            targets = (operand,)
+                        elif inst == 0x8:
+                            targets = (address + 1, address + 2)
+                        else:
+                            targets = (operand + 1, address + 2)
+                        leaders.update(targets)
+                        pending.extend(targets)
+                        break
+                    address += 1
+            written = {word & 0xFFF for address, word in words.items()
+                       if address not in volatile and (word >> 12) & 0xF in (0x0, 0x2) and word & 0xFFF in words}
+            if written <= volatile:
+                return words, leaders, volatile
+            volatile |= written
+
+    def compileRegion(self, start: int, cachedOnly: bool = False) -> Region:
+        '''
+        Compiles the region entered at a passed loop header and installs it in the header's table entry.
+
+        Args:
+            start (int): address of the loop header
+            cachedOnly (bool): only install a region found in the process cache, default False
+
+        Returns:
+            region (Region): compiled region, None if the address does not start a compilable region or cachedOnly is
+                set and the region is not cached
+        '''
+        if not 0 <= start < len(self.memory):
+            return None
+        load = self.load
+        for addresses, values, leaders, volatile, build, faults in _regionCode.get(start, ()):
+            if [load(address) for address in addresses] == values:
+                words = dict(zip(addresses, values))
+                break
+        else:
+            if cachedOnly:
+                return None
+            _backEdges.pop(start, None)
+            words, leaders, volatile = self.__explore(start)
+            word = words[start]
+            if start in volatile or (word >> 12) & 0xF > 0xC:
+                self.regions[start] = False
+                return None
+            if sum(map(len, _regionCode.values())) >= cacheSize:
+                _regionCode.clear()
+            build, faults = self.__generate(start, words, leaders, volatile)
+            _regionCode.setdefault(start, []).append((list(words), list(words.values()), leaders, volatile, build, faults))
+        word = words[start]
+        alive = [True]
+        function = build(self.load, self.store, self.table, self.owner, self.drop, self.__readInput, self.__output,
+                         self.decode, self, self.__enterHandler, alive, faults, _Halt)
+
+        region = Region(start, words, volatile, function, alive)
+        for address in words:
+            if address not in volatile:
+                self.owner.setdefault(address, set()).add(start)
+        self.regions[start] = region
+        self.table[start] = (self.__enterHandler, start, word)
+        return region
+
+    def __generate(self, start: int, words: dict, leaders: set, volatile: set) -> tuple:
+        '''
+        Generates the builder of a region function.
+
+        Returns:
+            (builder, faults): function building the region function from the engine's callables, and the mapping of
+                source line numbers to (address, index within block, instruction word) used to locate faults
+        '''
+        lines = ['def build(load, store, table, owner, drop, readInput, output, decode, engine, enter, alive, faults, Halt):',
+                 '    def region(ac, budget):',
+                 f'        pc = {start}',
+                 '        n = 0',
+                 '        w = None',
+                 '        try:',
+                 '            while True:']
+        faults = {}
+        indent = ' ' * 16
+        addresses = sorted(words)
+        blocks = []
+        for address in addresses:
+            if not blocks or address in leaders or blocks[-1][-1] + 1 != address or blocks[-1][-1] in volatile \
+                    or (words[blocks[-1][-1]] >> 12) & 0xF in terminators:
+                blocks.append([address])
+            else:
+                blocks[-1].append(address)
+
+        def goto(target: int, following: int) -> list:
+            if target not in leaders or target not in words:
+                return [f'return ac, {target}, n, w, None']
+            if target == following:
+                return [f'pc = {target}']
+            return [f'pc = {target}', 'continue']
+
+        for i, block in enumerate(blocks):
+            following = blocks[i + 1][0] if i + 1 < len(blocks) else None
+            first, size = block[0], len(block)
+            body = [f'if n + {size} > budget:', f'    return ac, {first}, n, w, None']
+            if first in volatile or (words[first] >> 12) & 0xF > 0xC:
+                body.extend([
+                    f'entry = table[{first}]',
+                    f'if entry is None or entry[0] is enter:',
+                    f'    entry = decode(load({first}))',
+                    'engine.ac = ac',
+                    (f'pc = entry[0](entry[1], {first + 1})', (first, 0, None)),
+                    'ac = engine.ac',
+                    'n += 1',
+                    'w = entry[2]',
+                    'if not alive[0]:',
+                    '    return ac, pc, n, w, None',
+                    'continue'])
+            else:
+                for k, address in enumerate(block):
+                    body.extend(self.__translate(address, k, words[address], size, following, goto))
+                last = block[-1]
+                if (words[last] >> 12) & 0xF not in terminators:
+                    body.extend([f'n += {size}', f'w = {words[last]}'])
+                    body.extend(goto(last + 1, following))
+            lines.append(f'{indent}if pc == {first}:')
+            for line in body:
+                if isinstance(line, tuple):
+                    line, fault = line
+                    faults[len(lines) + 1] = fault
+                lines.append(f'{indent}    {line}')
+        lines.extend([
+            f'{indent}return ac, pc, n, w, None',
+            #Only table entries raise Halt, from the single instruction block at pc
+            '        except Halt:',
+            '            return ac, pc + 1, n + 1, load(pc), True',
+            '        except Exception as e:',
+            '            address, k, word = faults[e.__traceback__.tb_lineno]',
+            '            return ac, address, n + k, word, e',
+            '    return region'])
+        namespace = {}
+        exec(compile('\n'.join(lines), f'<marie region 0x{start:03X}>', 'exec'), namespace)
+        return namespace['build'], faults
+
+    def __translate(self, address: int, k: int, word: int, size: int, following: int, goto) -> list:
+        '''
+        Translates a single instruction into lines of Python source. Lines that can raise are (line, fault) tuples.
+
+        Args:
+            address (int): instruction address
+            k (int): instruction index within the block
+            word (int): instruction word
+            size (int): number of instructions in the block
+            following (int): start address of the block emitted after this one, None if last
+            goto: function returning the lines transferring control to an address
+
+        Returns:
+            lines (list): Python source lines, without indentation
+        '''
+        inst = (word >> 12) & 0xF
+        operand = word & 0xFFF
+        nxt = address + 1
+        fault = (address, k, word)
+        if inst == 0x0:
+            return [(f'store({nxt + 1}, {operand})', fault),
+                    f'table[{operand}] = None',
+                    f'n += {size}',
+                    f'w = {word}',
+                    f'if {operand} in owner:',
+                    f'    drop({operand})',
+                    f'    return ac, {operand + 1}, n, w, None'] + goto(operand + 1, following)
+        if inst == 0x1:
+            return [(f'ac = load({operand})', fault)]
+        if inst == 0x2:
+            return [(f'store(ac, {operand})', fault),
+                    f'table[{operand}] = None',
+                    f'if {operand} in owner:',
+                    f'    drop({operand})',
+                    f'    return ac, {nxt}, n + {k + 1}, {word}, None']
+        if inst == 0x3:
+            return [(f'ac += load({operand})', fault)]
+        if inst == 0x4:
+            return [(f'ac -= load({operand})', fault)]
+        if inst == 0x5:
+            return [(f'ac = readInput({nxt})', fault)]
+        if inst == 0x6:
+            return [(f'output(ac)', fault)]
+        if inst == 0x7:
+            return [f'return ac, {nxt}, n + {size}, {word}, True']
+        if inst == 0x8:
+            lines = [f'n += {size}', f'w = {word}']
+            condition = {0x000: 'ac < 0', 0x400: 'ac == 0', 0x800: 'ac > 0'}.get(operand)
+            if condition:
+                lines.append(f'if {condition}:')
+                lines.extend(f'    {line}' for line in goto(nxt + 1, None))
+            return lines + goto(nxt, following)
+        if inst == 0x9:
+            return [f'n += {size}', f'w = {word}'] + goto(operand, following)
+        if inst == 0xA:
+            return ['ac = 0']
+        if inst == 0xB:
+            return [(f'ac += load(load({operand}))', fault)]
+        return [f'n += {size}', f'w = {word}', (f'pc = load({operand})', (address, k, word)), 'continue']
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table, regions = self.table, self.regions
+        decode, load = self.decode, self.load
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps != limit:
+                try:
+                    while steps != limit:
+                        entry = table[pc]
+                        if entry is None:
+                            entry = table[pc] = decode(load(pc))
+                        pc = entry[0](entry[1], pc + 1)
+                        steps += 1
+                except _Enter:
+                    ac, nxt, n, word, status = regions[pc].function(self.ac, maxsize if limit < 0 else limit - steps)
+                    self.ac = ac
+                    if not n and status is None:
+                        #The header block does not fit in the remaining steps, execute single instructions
+                        entry = decode(load(pc))
+                        pc = entry[0](entry[1], pc + 1)
+                        steps += 1
+                        continue
+                    steps += n
+                    pc = nxt
+                    entry = (None, None, word)
+                    if status is True:
+                        self.halted = True
+                        break
+                    if status is not None:
+                        raise status
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self.__countEdges()
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        self.__countEdges()
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
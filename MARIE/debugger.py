@@ -0,0 +1,289 @@
+# Programmatic debugger for the MARIE simple computer. Runs a machine at engine
+# speed until a PC breakpoint, a memory read or write watchpoint or a register
+# condition is hit, without the interactive prompts of Marie.executeStepwise.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 8/1/2025
+from .engine import PredecodedEngine, _Halt
+from .marie import MarieStepLimitError
+
+class _Break(Exception):
+    '''
+    Raised by DebugEngine after writing back the machine state to end the run at a stop
+    '''
+    pass
+
+class DebugEngine(PredecodedEngine):
+    '''
+    Pre-decoded engine stopping at breakpoints, watchpoints and register conditions. Breakpoints are checked against a
+    set before each instruction, the breakpoint a previous run stopped at is passed once so the run can continue from
+    it. Watchpoints are checked only in the LOAD, STORE, ADD, SUBT, ADDI and JNS memory paths and stop the run after
+    the accessing instruction. A stop leaves the machine in the state the fetch/decode loop would and ends Marie.run()
+    with an internal error replaced by Debugger.runUntil().
+    '''
+    def __init__(self, machine, breakpoints: set, reads: set, writes: set, condition = None, resume: int = None):
+        '''
+        Args:
+            machine (Marie): machine whose loaded program is being executed
+            breakpoints (set): PC addresses stopped at before executing
+            reads (set): addresses stopped at after a read
+            writes (set): addresses stopped at after a write
+            condition: optional callable invoked with the machine after each instruction, a true result stops the run.
+                AC, PC and IR are current when it is called
+            resume (int): address of the breakpoint the previous run stopped at, passed if the run starts on it. None
+                if the previous run did not stop at a breakpoint
+        '''
+        super().__init__(machine)
+        self.breakpoints = breakpoints
+        self.reads = reads
+        self.writes = writes
+        self.condition = condition
+        self.resume = resume
+        self.hits = []
+        self.event = None
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table = self.table
+        decode, load = self.decode, self.load
+        breakpoints, hits, condition, resume = self.breakpoints, self.hits, self.condition, self.resume
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps != limit:
+                if pc in breakpoints and (steps or pc != resume):
+                    self.event = ('breakpoint', pc)
+                    break
+                entry = table[pc]
+                if entry is None:
+                    entry = table[pc] = decode(load(pc))
+                pc = entry[0](entry[1], pc + 1)
+                steps += 1
+                if hits:
+                    self.event = hits[0]
+                    break
+                if condition is not None:
+                    m.AC, m.PC, m.IR = self.ac, pc, entry[2]
+                    if condition(m):
+                        self.event = ('condition', None)
+                        break
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        if self.event is not None:
+            raise _Break()
+        return self.halted
+
+    def __read(self, address: int):
+        if address in self.reads:
+            self.hits.append(('read', address))
+
+    def __write(self, address: int):
+        if address in self.writes:
+            self.hits.append(('write', address))
+
+    def _jns(self, operand: int, pc: int) -> int:
+        self.__write(operand)
+        return super()._jns(operand, pc)
+
+    def _load(self, operand: int, pc: int) -> int:
+        self.__read(operand)
+        return super()._load(operand, pc)
+
+    def _store(self, operand: int, pc: int) -> int:
+        self.__write(operand)
+        return super()._store(operand, pc)
+
+    def _add(self, operand: int, pc: int) -> int:
+        self.__read(operand)
+        return super()._add(operand, pc)
+
+    def _subt(self, operand: int, pc: int) -> int:
+        self.__read(operand)
+        return super()._subt(operand, pc)
+
+    def _addi(self, operand: int, pc: int) -> int:
+        self.__read(operand)
+        self.__read(self.load(operand))
+        return super()._addi(operand, pc)
+
+class DebugStop():
+    '''
+    Reason a Debugger.runUntil() call stopped.
+
+    Attributes:
+        reason (str): 'breakpoint', 'read', 'write', 'condition', 'halt', 'steps' or 'error'
+        address (int): breakpoint or watched address, None for other reasons
+        pc (int): PC when the run stopped
+        steps (int): total number of instructions executed
+        outputs (list): values output by the program, in order
+        error (Exception): execution error for the 'error' reason, otherwise None
+    '''
+    def __init__(self, reason: str, address: int, pc: int, steps: int, outputs: list, error: Exception = None):
+        self.reason = reason
+        self.address = address
+        self.pc = pc
+        self.steps = steps
+        self.outputs = outputs
+        self.error = error
+
+    def __repr__(self):
+        address = '' if self.address is None else f', address={self.address}'
+        error = '' if self.error is None else f', error={self.error!r}'
+        return f'DebugStop({self.reason!r}{address}, pc={self.pc}, steps={self.steps}{error})'
+
+class Debugger():
+    '''
+    Non-interactive debugger driving a Marie machine through headless runs. Breakpoints and watchpoints are held in sets
+    and may be given as addresses or as source labels resolved through an Assembler.address_book.
+
+    Attributes:
+        machine (Marie): debugged machine
+        breakpoints (set): breakpoint addresses
+        reads (set): read watchpoint addresses
+        writes (set): write watchpoint addresses
+        last (DebugStop): result of the last runUntil() call, None before the first
+    '''
+    def __init__(self, machine, inputs = None, address_book: dict = None):
+        '''
+        Args:
+            machine (Marie): machine to debug, its loaded program starts at address 0 on the first run
+            inputs: iterable of input values, or a callable returning the next input value, shared by every run
+            address_book (dict): label to address mapping used to resolve labels, as in Assembler.address_book
+        '''
+        self.machine = machine
+        self.address_book = address_book or {}
+        self.breakpoints = set()
+        self.reads = set()
+        self.writes = set()
+        self.last = None
+        if inputs is not None and not callable(inputs):
+            inputs = iter(inputs)
+        self.__inputs = inputs
+        self.__started = False
+
+    def address(self, target) -> int:
+        '''
+        Resolves a breakpoint or watchpoint target.
+
+        Args:
+            target: address, or source label
+
+        Raises:
+            KeyError: if the label is not in the address book
+        '''
+        if isinstance(target, str):
+            label = target.strip().upper()
+            if label not in self.address_book:
+                raise KeyError(f'unknown label {target}')
+            return self.address_book[label]
+        return target
+
+    def breakAt(self, *targets):
+        '''
+        Adds breakpoints at passed addresses or labels.
+        '''
+        self.breakpoints.update(self.address(target) for target in targets)
+
+    def clearBreak(self, *targets):
+        '''
+        Removes breakpoints at passed addresses or labels, every breakpoint if none are passed.
+        '''
+        if not targets:
+            self.breakpoints.clear()
+        self.breakpoints.difference_update(self.address(target) for target in targets)
+
+    def watch(self, target, mode: str = 'w'):
+        '''
+        Adds a watchpoint on an address or label.
+
+        Args:
+            target: address, or source label
+            mode (str): 'r' to stop after reads, 'w' after writes, 'rw' after both
+        '''
+        address = self.address(target)
+        if 'r' in mode:
+            self.reads.add(address)
+        if 'w' in mode:
+            self.writes.add(address)
+
+    def unwatch(self, *targets):
+        '''
+        Removes watchpoints on passed addresses or labels, every watchpoint if none are passed.
+        '''
+        if not targets:
+            self.reads.clear()
+            self.writes.clear()
+        for address in map(self.address, targets):
+            self.reads.discard(address)
+            self.writes.discard(address)
+
+    def runUntil(self, breakpoints = None, watch = None, condition = None, maxSteps: int = None) -> DebugStop:
+        '''
+        Runs the machine at full speed from its current state until a stop. Breakpoints and watchpoints passed here apply
+        to this call only, on top of the debugger's own.
+
+        Args:
+            breakpoints: addresses or labels to stop at before executing
+            watch: addresses or labels to stop at after a write, or a dict of address or label to mode ('r', 'w', 'rw')
+            condition: callable invoked with the machine after each instruction, a true result stops the run
+            maxSteps (int): maximum number of instructions executed by this call, default unlimited
+
+        Returns:
+            stop (DebugStop): reason the run stopped
+        '''
+        points = self.breakpoints | {self.address(target) for target in breakpoints or ()}
+        reads, writes = set(self.reads), set(self.writes)
+        if watch is not None:
+            modes = watch if isinstance(watch, dict) else dict.fromkeys(watch, 'w')
+            for target, mode in modes.items():
+                address = self.address(target)
+                if 'r' in mode:
+                    reads.add(address)
+                if 'w' in mode:
+                    writes.add(address)
+
+        #Only a breakpoint the last run stopped at is passed, stops for other reasons leave breakpoints at the PC armed
+        last = self.last
+        resume = last.address if last is not None and last.reason == 'breakpoint' and last.pc == self.machine.PC else None
+        engines = []
+        def engine(machine):
+            runner = DebugEngine(machine, points, reads, writes, condition, resume)
+            engines.append(runner)
+            return runner
+
+        steps = self.last.steps if self.last is not None else 0
+        limit = None if maxSteps is None else steps + maxSteps
+        result = self.machine.run(self.__inputs, limit, engine = engine, resume = self.__started)
+        self.__started = True
+
+        pc = self.machine.PC
+        if isinstance(result.error, _Break):
+            reason, address = engines[-1].event
+            stop = DebugStop(reason, address, pc, result.steps, result.outputs)
+        elif result.halted and result.error is None:
+            stop = DebugStop('halt', None, pc, result.steps, result.outputs)
+        elif isinstance(result.error, MarieStepLimitError) and limit is not None:
+            stop = DebugStop('steps', None, pc, result.steps, result.outputs)
+        else:
+            stop = DebugStop('error', None, pc, result.steps, result.outputs, result.error)
+        self.last = stop
+        return stop
+
+    def step(self, count: int = 1) -> DebugStop:
+        '''
+        Executes count instructions, stopping early at breakpoints, watchpoints or a halt.
+        '''
+        return self.runUntil(maxSteps = count)
@@ -0,0 +1,275 @@
+# Alternative execution engines for the MARIE simple computer. Engines run a
+# Marie machine's loaded program faster than the stepwise fetch/decode loop
+# while leaving the machine in the exact state the loop would.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 5/2/2025
+from .marie import MarieExecutionError
+from .memory import Memory
+
+class Engine():
+    '''
+    Base execution engine. Engines are created by Marie.run() with the machine being executed and keep the AC and PC
+    in their own state while running, writing the machine registers back when the run stops.
+    '''
+    def __init__(self, machine):
+        '''
+        Args:
+            machine (Marie): machine whose loaded program is being executed
+        '''
+        self.machine = machine
+        self.memory = machine.memory
+        self.load = machine.memory.load
+        self.store = machine.memory.store
+        if type(self.memory) is Memory:
+            # Reads index the backing sequence directly, out of range reads still fault and are replayed through Memory.load
+            self.load = self.memory.memory.__getitem__
+        self.steps = 0
+
+    def run(self, maxSteps: int = None) -> bool:
+        '''
+        Executes the loaded program from the machine's current PC.
+
+        Args:
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+
+        Returns:
+            halted (bool): True if the program halted, False if the step limit was reached
+        '''
+        raise NotImplementedError()
+
+    def _writeBack(self, word: int):
+        '''
+        Sets MAR, MBR and IR to the values left by the last executed instruction.
+
+        Args:
+            word (int): instruction word of the last executed instruction, None if nothing was executed
+        '''
+        if word is None:
+            return
+        m = self.machine
+        m.IR = m.MBR = word
+        m.MAR = word & 0xFFF
+        inst = (word >> 12) & 0xF
+        if inst == 0x3 or inst == 0x4:
+            m.MBR = self.load(m.MAR)
+        elif inst == 0xB:
+            m.MAR = self.load(m.MAR)
+            m.MBR = self.load(m.MAR)
+
+    def _fault(self, address: int, ac: int, word: int, error: Exception):
+        '''
+        Leaves the machine in the state the fetch/decode loop would after the instruction at a passed address failed, then
+        raises the matching error. Failing instructions have no side effects outside of I/O, so they are replayed on the
+        machine itself.
+
+        Args:
+            address (int): address of the failing instruction
+            ac (int): AC value before the failing instruction
+            word (int): instruction word of the last fetched instruction, None if nothing was executed
+            error (Exception): error raised by the engine
+        '''
+        m = self.machine
+        try:
+            self._writeBack(word)
+        except Exception:
+            # word belongs to the failing instruction, its replay below sets MAR, MBR and IR
+            pass
+        m.AC = ac
+        m.PC = address
+        try:
+            inst = (self.load(address) >> 12) & 0xF
+        except Exception:
+            inst = None
+        if inst == 0x5 or inst == 0x6:
+            # I/O sources can not be replayed, reproduce the fetch and re-raise
+            m.MBR = m.IR = self.load(address)
+            m.MAR = m.IR & 0xFFF
+            m.PC = address + 1
+            raise error
+        m.step()
+        raise error
+
+class _Halt(Exception):
+    '''
+    Raised by engine HALT handlers to leave the dispatch loop without a per-step halt check
+    '''
+    pass
+
+#Largest memory given a dense decode table, entries for wider memories are keyed by address
+denseTable = 0x10000
+
+class _SparseTable(dict):
+    '''
+    Decode table of a memory wider than denseTable, holding only the decoded addresses. Missing addresses read as None,
+    negative addresses share the entry of the address they wrap to as list indexing does in the dense table.
+    '''
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    def __missing__(self, address: int):
+        if -self.size <= address < 0:
+            return self.get(address + self.size)
+        return None
+
+    def __setitem__(self, address: int, entry: tuple):
+        if address < 0:
+            address += self.size
+        if entry is None:
+            self.pop(address, None)
+        else:
+            super().__setitem__(address, entry)
+
+class PredecodedEngine(Engine):
+    '''
+    Execution engine working from a table of pre-decoded (handler, operand, word) entries parallel to memory. Words are
+    decoded once on first fetch and only the entries written by STORE and JNS are invalidated, so self-modifying programs
+    stay correct. Handlers take the operand and the incremented PC and return the next PC. Memories wider than
+    denseTable words, such as wide SparseMemory instances, keep only the decoded entries, keyed by address.
+    '''
+    def __init__(self, machine):
+        super().__init__(machine)
+        self.ac = 0x0
+        self.halted = False
+        size = len(self.memory)
+        self.table = [None] * size if size <= denseTable else _SparseTable(size)
+        self.__skipconds = {
+            0x000: self._skipNegative,
+            0x400: self._skipZero,
+            0x800: self._skipPositive
+        }
+        self.__handlers = {
+            0x0: self._jns,
+            0x1: self._load,
+            0x2: self._store,
+            0x3: self._add,
+            0x4: self._subt,
+            0x5: self._input,
+            0x6: self._output,
+            0x7: self._halt,
+            0x8: self._skipcond,
+            0x9: self._jump,
+            0xA: self._clear,
+            0xB: self._addi,
+            0xC: self._jumpi
+        }
+
+    def decode(self, word: int) -> tuple:
+        '''
+        Decodes an instruction word into a table entry.
+
+        Args:
+            word (int): instruction word
+
+        Returns:
+            entry (tuple): (handler, operand, word)
+        '''
+        inst = (word >> 12) & 0xF
+        operand = word & 0xFFF
+        if inst == 0x8:
+            return (self.__skipconds.get(operand, self._skipcond), operand, word)
+        return (self.__handlers.get(inst, self._invalid), operand, word)
+
+    def invalidate(self, address: int):
+        '''
+        Drops the decoded entry for an address after it is written.
+        '''
+        self.table[address] = None
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table = self.table
+        decode, load = self.decode, self.load
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps != limit:
+                entry = table[pc]
+                if entry is None:
+                    entry = table[pc] = decode(load(pc))
+                pc = entry[0](entry[1], pc + 1)
+                steps += 1
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
+
+    def _jns(self, operand: int, pc: int) -> int:
+        self.store(pc + 1, operand)
+        self.invalidate(operand)
+        return operand + 1
+
+    def _load(self, operand: int, pc: int) -> int:
+        self.ac = self.load(operand)
+        return pc
+
+    def _store(self, operand: int, pc: int) -> int:
+        self.store(self.ac, operand)
+        self.invalidate(operand)
+        return pc
+
+    def _add(self, operand: int, pc: int) -> int:
+        self.ac += self.load(operand)
+        return pc
+
+    def _subt(self, operand: int, pc: int) -> int:
+        self.ac -= self.load(operand)
+        return pc
+
+    def _input(self, operand: int, pc: int) -> int:
+        m = self.machine
+        m.PC = pc
+        m.InReg = m._readInput()
+        self.ac = m.InReg
+        return pc
+
+    def _output(self, operand: int, pc: int) -> int:
+        m = self.machine
+        m.OutReg = self.ac
+        m._writeOutput(self.ac)
+        return pc
+
+    def _halt(self, operand: int, pc: int) -> int:
+        raise _Halt()
+
+    def _skipcond(self, operand: int, pc: int) -> int:
+        return pc
+
+    def _skipNegative(self, operand: int, pc: int) -> int:
+        return pc + 1 if self.ac < 0 else pc
+
+    def _skipZero(self, operand: int, pc: int) -> int:
+        return pc + 1 if self.ac == 0 else pc
+
+    def _skipPositive(self, operand: int, pc: int) -> int:
+        return pc + 1 if self.ac > 0 else pc
+
+    def _jump(self, operand: int, pc: int) -> int:
+        return operand
+
+    def _clear(self, operand: int, pc: int) -> int:
+        self.ac = 0x0
+        return pc
+
+    def _addi(self, operand: int, pc: int) -> int:
+        self.ac += self.load(self.load(operand))
+        return pc
+
+    def _jumpi(self, operand: int, pc: int) -> int:
+        return self.load(operand)
+
+    def _invalid(self, operand: int, pc: int) -> int:
+        raise MarieExecutionError(f'critical error, passed instruction outside instruction set (address {pc - 1})')
@@ -0,0 +1,220 @@
+# Superinstruction fusion for the MARIE simple computer. Recognizes common
+# instruction sequences in hot loops and executes each as a single fused
+# handler, cutting dispatches in tight loops.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 7/4/2025
+from .engine import PredecodedEngine, _Halt
+
+#Opcodes fused alongside JNS and JUMPI linkage (LOAD, STORE, ADD, SUBT, CLEAR)
+simple = {0x1, 0x2, 0x3, 0x4, 0xA}
+
+class FusedEngine(PredecodedEngine):
+    '''
+    Pre-decoded engine executing common sequences as fused handlers:
+
+        LOAD X / ADD Y / STORE Z      (ADD or SUBT, STORE or SKIPCOND)
+        JNS S / first instruction of the subroutine at S + 1
+        LOAD, STORE, ADD, SUBT or CLEAR / JUMPI S
+
+    Fusing a loop body costs about as much as a couple of hundred of its iterations save, so code runs from the
+    pre-decoded table until a backward JUMP has reached a loop header threshold times, then the sequences between the
+    header and the JUMP are fused into the table. Fused entries are keyed by the address of their first instruction, a
+    jump landing mid-sequence executes from the table at that address. A write to any address covered by a fused entry
+    drops the entry, and sequences storing into their own later words are never fused. A fused handler that fails is
+    replayed one instruction at a time, so registers and errors match the fetch/decode loop exactly.
+    '''
+    #Backward jumps to a loop header before its body is fused
+    threshold = 256
+
+    def __init__(self, machine):
+        super().__init__(machine)
+        self.covers = {} # address to the starts of the fused entries covering it
+        self.extra = 0 # instructions executed by fused entries beyond their first, in the current dispatch chunk
+        self.__countdown = {} # loop header to backward jumps left before its body is fused
+
+    def invalidate(self, address: int):
+        self.table[address] = None
+        if address in self.covers:
+            for start in self.covers.pop(address):
+                self.table[start] = None
+
+    def _jns(self, operand: int, pc: int) -> int:
+        self.store(pc + 1, operand)
+        self.table[operand] = None
+        if operand in self.covers:
+            self.invalidate(operand)
+        return operand + 1
+
+    def _store(self, operand: int, pc: int) -> int:
+        self.store(self.ac, operand)
+        self.table[operand] = None
+        if operand in self.covers:
+            self.invalidate(operand)
+        return pc
+
+    def _jump(self, operand: int, pc: int) -> int:
+        if operand < pc:
+            countdown = self.__countdown
+            left = countdown.get(operand, self.threshold) - 1
+            countdown[operand] = left
+            if not left:
+                self.fuseLoop(operand, pc - 1)
+        return operand
+
+    def fuseLoop(self, start: int, end: int):
+        '''
+        Installs fused entries for the sequences starting between two addresses in the table.
+
+        Args:
+            start (int): address of the loop header
+            end (int): address of the backward JUMP
+        '''
+        table = self.table
+        for address in range(start, end):
+            entry = table[address]
+            if entry is None or entry[1] is not None:
+                entry = self.fuse(address)
+                if entry:
+                    table[address] = entry
+
+    def fuse(self, address: int):
+        '''
+        Builds the fused entry for a sequence starting at a passed address.
+
+        Args:
+            address (int): address of the first instruction
+
+        Returns:
+            entry (tuple): (handler, None, word) table entry where word is the last instruction word, False if no sequence
+            starts at the address
+        '''
+        size = len(self.memory)
+        if not 0 <= address < size:
+            return False
+        #Every sequence starts with JNS, or with a simple instruction followed by ADD, SUBT or JUMPI
+        first = (self.load(address) >> 12) & 0xF
+        if first != 0x0 and (first not in simple or address + 1 >= size
+                             or (self.load(address + 1) >> 12) & 0xF not in (0x3, 0x4, 0xC)):
+            return False
+        words = [self.load(a) for a in range(address, min(address + 3, size))]
+        ops = [(word >> 12) & 0xF for word in words]
+        operands = [word & 0xFFF for word in words]
+        load, store, invalidate = self.load, self.store, self.invalidate
+        table, covers = self.table, self.covers
+
+        if len(ops) == 3 and ops[0] == 0x1 and ops[1] in (0x3, 0x4) and ops[2] in (0x2, 0x8):
+            x, y, z = operands
+            if ops[2] == 0x2 and ops[1] == 0x3:
+                def handler(operand, pc):
+                    ac = load(x) + load(y)
+                    store(ac, z)
+                    table[z] = None
+                    if z in covers:
+                        invalidate(z)
+                    self.ac = ac
+                    self.extra += 2
+                    return pc + 2
+            elif ops[2] == 0x2:
+                def handler(operand, pc):
+                    ac = load(x) - load(y)
+                    store(ac, z)
+                    table[z] = None
+                    if z in covers:
+                        invalidate(z)
+                    self.ac = ac
+                    self.extra += 2
+                    return pc + 2
+            else:
+                sign = 1 if ops[1] == 0x3 else -1
+                # Sign of the AC that skips, None for conditions that never skip
+                condition = {0x000: -1, 0x400: 0, 0x800: 1}.get(z)
+                def handler(operand, pc):
+                    ac = load(x) + sign * load(y)
+                    self.ac = ac
+                    self.extra += 2
+                    if condition is None:
+                        return pc + 2
+                    return pc + 3 if (ac > 0) - (ac < 0) == condition else pc + 2
+            return self.__register(address, (handler, None, words[2]), (address, address + 1, address + 2))
+
+        if ops[0] == 0x0 and operands[0] + 1 < size:
+            target = operands[0]
+            word = load(target + 1)
+            if (word >> 12) & 0xF in simple:
+                body = self.decode(word)
+                def handler(operand, pc):
+                    store(pc + 1, target)
+                    invalidate(target)
+                    following = body[0](body[1], target + 2)
+                    self.extra += 1
+                    return following
+                return self.__register(address, (handler, None, word), (address, target + 1))
+
+        if len(ops) >= 2 and ops[0] in simple and ops[1] == 0xC:
+            if ops[0] == 0x2 and operands[0] == address + 1:
+                return False
+            first = self.decode(words[0])
+            pointer = operands[1]
+            def handler(operand, pc):
+                first[0](first[1], pc)
+                following = load(pointer)
+                self.extra += 1
+                return following
+            return self.__register(address, (handler, None, words[1]), (address, address + 1))
+        return False
+
+    def __register(self, start: int, entry: tuple, covered: tuple) -> tuple:
+        for address in covered:
+            self.covers.setdefault(address, []).append(start)
+        return entry
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table = self.table
+        decode, load = self.decode, self.load
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps != limit:
+                # A dispatch executes at most 3 instructions, run chunks of dispatches that can not pass the limit
+                stop = -1 if limit < 0 else steps + (limit - steps) // 3
+                if stop == steps:
+                    entry = decode(load(pc))
+                    pc = entry[0](entry[1], pc + 1)
+                    steps += 1
+                    continue
+                self.extra = 0
+                try:
+                    while steps != stop:
+                        entry = table[pc]
+                        if entry is None:
+                            entry = table[pc] = decode(load(pc))
+                        pc = entry[0](entry[1], pc + 1)
+                        steps += 1
+                except _Halt:
+                    raise
+                except Exception:
+                    if entry[1] is not None or not 0 <= pc < len(self.memory) or table[pc] is not entry:
+                        raise
+                    # Fused handlers fail before changing the AC, drop the entry and replay one instruction at a time
+                    # so the failing instruction leaves the stepwise state
+                    table[pc] = None
+                finally:
+                    steps += self.extra
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
@@ -0,0 +1,184 @@
+# Binary memory image format for MARIE programs. Images hold a little-endian
+# 16-bit word payload and optional symbol and signed word sections, written in
+# one buffer write and read back through a memory map.
+#
+# Layout:
+#   header  '<4sHHI' magic (b'MRIE'), format version, flags, word count. Images
+#           with a signed section are version 2 so version 1 readers, which
+#           would drop the sign of negative words, reject them
+#   payload word count little-endian uint16 words
+#   symbols (HAS_SYMBOLS flag) '<I' symbol count, then per symbol '<IH' address,
+#           name length followed by the UTF-8 encoded name
+#   signed  (HAS_SIGNED flag) '<I' count, then '<I' addresses of negative words,
+#           stored in the payload as their two's complement bit pattern
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 5/16/2025
+from array import array
+import mmap
+import struct
+import sys
+
+MAGIC = b'MRIE'
+VERSION = 2
+HAS_SYMBOLS = 0x1
+HAS_SIGNED = 0x2
+
+_header = struct.Struct('<4sHHI')
+_count = struct.Struct('<I')
+_symbol = struct.Struct('<IH')
+
+def packImage(words, symbols: dict = None) -> bytes:
+    '''
+    Packs memory words and an optional symbol table into the binary image format.
+
+    Args:
+        words: sequence of words (min -0x8000, max 0xFFFF), or an array('H') which is packed without conversion
+        symbols (dict): optional label to address mapping, as in Assembler.address_book
+
+    Returns:
+        image (bytes): packed image
+
+    Raises:
+        MemoryImageError: if a word is outside the storable range
+    '''
+    signed = []
+    if not isinstance(words, array) or words.typecode != 'H':
+        words = list(words)
+        for address, word in enumerate(words):
+            if not -0x8000 <= word <= 0xFFFF:
+                raise MemoryImageError(f'word out of range at address 0x{address:04X}')
+            if word < 0:
+                signed.append(address)
+        words = array('H', [w & 0xFFFF for w in words])
+    elif sys.byteorder == 'big':
+        words = words[:]
+    if sys.byteorder == 'big':
+        words.byteswap()
+
+    flags = (HAS_SYMBOLS if symbols else 0) | (HAS_SIGNED if signed else 0)
+    buffer = bytearray(_header.pack(MAGIC, VERSION if signed else 1, flags, len(words)))
+    buffer += words.tobytes()
+    if symbols:
+        buffer += _count.pack(len(symbols))
+        for name, address in symbols.items():
+            encoded = name.encode('utf-8')
+            buffer += _symbol.pack(address, len(encoded))
+            buffer += encoded
+    if signed:
+        buffer += _count.pack(len(signed))
+        buffer += struct.pack(f'<{len(signed)}I', *signed)
+    return bytes(buffer)
+
+def writeImage(filepath: str, words, symbols: dict = None):
+    '''
+    Writes memory words and an optional symbol table to a binary image file in a single write.
+
+    Args:
+        filepath (str): target image file path
+        words: sequence of 16-bit words, or an array('H')
+        symbols (dict): optional label to address mapping
+    '''
+    image = packImage(words, symbols)
+    with open(filepath, 'wb') as file:
+        file.write(image)
+
+class MemoryImage():
+    '''
+    Memory mapped binary image. The payload is exposed without copying, close the image (or use it as a context
+    manager) once the words have been copied out.
+
+    Attributes:
+        count (int): number of words in the image
+        payload (memoryview): raw little-endian word bytes
+        symbols (dict): label to address mapping, empty if the image has no symbol section
+        signed (list): addresses of words saved as negative values, empty if the image has no signed section
+    '''
+    def __init__(self, filepath: str):
+        '''
+        Args:
+            filepath (str): image file path
+
+        Raises:
+            MemoryImageError: if the file is not a valid image
+        '''
+        with open(filepath, 'rb') as file:
+            try:
+                self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise MemoryImageError(f'empty image file ({filepath})')
+        self.__view = memoryview(self.__map)
+        try:
+            if len(self.__view) < _header.size:
+                raise MemoryImageError(f'truncated image header ({filepath})')
+            magic, version, flags, count = _header.unpack_from(self.__view)
+            if magic != MAGIC:
+                raise MemoryImageError(f'not a MARIE image ({filepath})')
+            if version > VERSION:
+                raise MemoryImageError(f'unsupported image version {version} ({filepath})')
+            end = _header.size + 2 * count
+            if len(self.__view) < end:
+                raise MemoryImageError(f'truncated image payload ({filepath})')
+            self.count = count
+            self.payload = self.__view[_header.size:end]
+            self.symbols = {}
+            self.signed = []
+            offset = end
+            if flags & HAS_SYMBOLS:
+                offset = self.__readSymbols(offset)
+            if flags & HAS_SIGNED:
+                (count,) = _count.unpack_from(self.__view, offset)
+                self.signed = list(struct.unpack_from(f'<{count}I', self.__view, offset + _count.size))
+        except (MemoryImageError, struct.error, UnicodeDecodeError) as e:
+            self.close()
+            if isinstance(e, MemoryImageError):
+                raise
+            raise MemoryImageError(f'corrupt symbol or signed section ({filepath})')
+
+    def __readSymbols(self, offset: int) -> int:
+        symbols = self.symbols
+        (count,) = _count.unpack_from(self.__view, offset)
+        offset += _count.size
+        for _ in range(count):
+            address, length = _symbol.unpack_from(self.__view, offset)
+            offset += _symbol.size
+            name = bytes(self.__view[offset:offset + length]).decode('utf-8')
+            if len(name.encode('utf-8')) != length:
+                raise MemoryImageError('truncated symbol section')
+            symbols[name] = address
+            offset += length
+        return offset
+
+    def words(self) -> array:
+        '''
+        Returns the payload as a native order array('H').
+        '''
+        words = array('H')
+        words.frombytes(self.payload)
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return words
+
+    def close(self):
+        '''
+        Releases the payload view and the memory map.
+        '''
+        if getattr(self, 'payload', None) is not None:
+            self.payload.release()
+            self.payload = None
+        self.__view.release()
+        self.__map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class MemoryImageError(Exception):
+    '''
+    Binary image exception thrown when an image file can not be read
+    '''
+    def __init__(self, message = 'image could not be read.'):
+        super().__init__(f'Image Error: {message}')
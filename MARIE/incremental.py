@@ -0,0 +1,225 @@
+# Incremental assembler session for editing MARIE programs live. Keeps per-line
+# tokens, label definitions and label uses so an edit re-encodes only the edited
+# line and the instructions referring to labels whose addresses moved, patching
+# the session's memory in place.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 6/13/2025
+from .assembler import lexLine, encodeStatement, StatementError
+from .memory import Memory, MemoryError
+
+class SourceLine():
+    '''
+    Lexed source line.
+
+    Attributes:
+        text (str): line text
+        label (str): address label defined on the line, None if not defined
+        keyword (str): instruction or data directive, None for blank lines
+        operand (str): operand token, None if not passed
+        address (int): memory address of the statement, None for blank lines
+        error (str): assembly error without line information, None if the line assembles
+    '''
+    def __init__(self, text: str):
+        self.text = text
+        self.label = self.keyword = self.operand = None
+        self.address = None
+        self.error = None
+        self.statement = True
+        try:
+            lexed = lexLine(text)
+        except StatementError as e:
+            #Erroneous lines keep their address so later statements do not move while a line is being typed
+            self.error = f'{e}'
+            return
+        if lexed is None:
+            self.statement = False
+        else:
+            self.label, self.keyword, self.operand = lexed
+
+class AssemblySession():
+    '''
+    Incremental assembly session over an editable source. Lines are indexed from 0. Replacing a line re-encodes that
+    line and, when it defines a label, the instructions using the label. Inserting or deleting a statement shifts the
+    following memory words and re-encodes only the instructions using labels that moved.
+
+    Lines with errors keep their address and hold 0x0 in memory, the image matches the assembler's output once
+    errors is empty.
+
+    Attributes:
+        lines (list): SourceLine for each source line
+        memory (Memory): assembled memory image, patched in place on each edit
+        address_book (dict): label to address mapping
+    '''
+    def __init__(self, source: str = '', memory: Memory = None):
+        '''
+        Args:
+            source (str): initial Marie assembly source
+            memory (Memory): memory patched by the session, default a new Memory
+        '''
+        self.memory = Memory() if memory is None else memory
+        self.address_book = {}
+        self.lines = []
+        self.__definitions = {} # label to defining lines
+        self.__uses = {} # label to lines using it as an operand
+        self.__count = 0 # number of statements
+        for text in source.split('\n'):
+            line = SourceLine(text)
+            if line.statement:
+                line.address = self.__count
+                self.__count += 1
+            self.lines.append(line)
+            self.__register(line)
+        self.__resolve({label for label in self.__definitions})
+        for line in self.lines:
+            self.__encode(line)
+        self.memory._head = max(self.__count - 1, 0)
+
+    @property
+    def source(self) -> str:
+        '''Current source text'''
+        return '\n'.join(line.text for line in self.lines)
+
+    @property
+    def errors(self) -> list:
+        '''
+        Current assembly errors as (line number, message) tuples, line numbers start at 1.
+        '''
+        return [(i + 1, f'Assembly Error: {line.error} at line {i + 1}') for i, line in enumerate(self.lines) if line.error]
+
+    def __register(self, line: SourceLine):
+        if line.label is not None:
+            self.__definitions.setdefault(line.label, []).append(line)
+        if line.operand is not None:
+            self.__uses.setdefault(line.operand, set()).add(line)
+
+    def __unregister(self, line: SourceLine):
+        if line.label is not None:
+            defs = self.__definitions[line.label]
+            defs.remove(line)
+            if not defs:
+                del self.__definitions[line.label]
+        if line.operand is not None:
+            users = self.__uses[line.operand]
+            users.discard(line)
+            if not users:
+                del self.__uses[line.operand]
+
+    def __resolve(self, labels) -> set:
+        '''
+        Updates the address book for a set of labels, the last definition of a label wins as in the assembler.
+
+        Returns:
+            moved (set): labels whose address changed
+        '''
+        moved = set()
+        for label in labels:
+            defs = self.__definitions.get(label)
+            address = max(line.address for line in defs) if defs else None
+            if self.address_book.get(label) != address:
+                moved.add(label)
+                if address is None:
+                    del self.address_book[label]
+                else:
+                    self.address_book[label] = address
+        return moved
+
+    def __encode(self, line: SourceLine):
+        '''
+        Encodes a statement line into memory, recording any error on the line.
+        '''
+        if line.address is None:
+            return
+        if line.keyword is None:
+            #Lexing error, keep the address reserved
+            self.memory.store(0x0, line.address)
+            return
+        line.error = None
+        try:
+            self.memory.store(encodeStatement(line.keyword, line.operand, self.address_book), line.address)
+        except StatementError as e:
+            line.error = f'{e}'
+            self.memory.store(0x0, line.address)
+        except Exception as e:
+            line.error = f'{e}'
+            self.memory.store(0x0, line.address)
+
+    def __reencodeUsers(self, labels: set, skip: SourceLine = None):
+        for label in labels:
+            for line in self.__uses.get(label, ()):
+                if line is not skip:
+                    self.__encode(line)
+
+    def __shift(self, index: int, delta: int) -> set:
+        '''
+        Moves the statements after a line by delta addresses, shifting their memory words.
+
+        Returns:
+            labels (set): labels defined on the moved lines
+        '''
+        if self.__count + delta > len(self.memory):
+            raise MemoryError('program exceeds memory size')
+        load, store = self.memory.load, self.memory.store
+        labels = set()
+        for line in self.lines[index + 1:]:
+            if line.address is not None:
+                line.address += delta
+                if line.label is not None:
+                    labels.add(line.label)
+        start = sum(1 for line in self.lines[:index] if line.address is not None)
+        #Move the words through the memory interface, backing storage may be a copy or a typed array
+        words = [load(address) for address in range(start - min(delta, 0), self.__count)]
+        for offset, word in enumerate(words):
+            store(word, start + max(delta, 0) + offset)
+        for address in range(self.__count + delta, self.__count):
+            store(0x0, address)
+        self.__count += delta
+        self.memory._head = max(self.__count - 1, 0)
+        return labels
+
+    def setLine(self, index: int, text: str):
+        '''
+        Replaces the text of a line.
+
+        Args:
+            index (int): line index
+            text (str): new line text
+        '''
+        old = self.lines[index]
+        line = SourceLine(text)
+        changed = {label for label in (old.label, line.label) if label is not None}
+        self.__unregister(old)
+        self.lines[index] = line
+        if old.statement == line.statement:
+            line.address = old.address
+        elif line.statement:
+            line.address = sum(1 for l in self.lines[:index] if l.address is not None)
+            changed |= self.__shift(index, 1)
+        else:
+            changed |= self.__shift(index, -1)
+        self.__register(line)
+        moved = self.__resolve(changed)
+        self.__encode(line)
+        self.__reencodeUsers(moved, line)
+
+    def insertLine(self, index: int, text: str):
+        '''
+        Inserts a line before the line at a passed index.
+
+        Args:
+            index (int): index of the inserted line, len(lines) appends
+            text (str): line text
+        '''
+        self.lines.insert(index, SourceLine(''))
+        self.setLine(index, text)
+
+    def deleteLine(self, index: int):
+        '''
+        Deletes a line.
+
+        Args:
+            index (int): line index
+        '''
+        self.setLine(index, '')
+        del self.lines[index]
@@ -0,0 +1,269 @@
+# Relocatable object modules and a linker for multi-module MARIE programs. Each
+# source file assembles once into an object holding code words relative to
+# address 0, its exported symbols, relocation entries and imported symbols. The
+# linker places objects one after another and patches them into one image.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 7/18/2025
+import hashlib
+import json
+import os
+from .assembler import lexLine, directives, encodeStatement, checkSkipcond, StatementError, MarieAssemblyError, \
+    ASSEMBLER_VERSION
+from .abstraction import instruction_set
+from .asmcache import normalizeSource
+from .memory import Memory
+
+class ObjectModule():
+    '''
+    Relocatable object module.
+
+    Attributes:
+        name (str): module name, used to qualify symbols (upper case)
+        words (list): code and data words assembled relative to address 0
+        exports (dict): exported label to offset mapping
+        relocations (list): offsets of instruction words whose operand is a module address
+        imports (list): (offset, symbol) tuples for instruction words whose operand is an imported symbol
+    '''
+    def __init__(self, name: str, words: list, exports: dict, relocations: list, imports: list):
+        self.name = name.upper()
+        self.words = words
+        self.exports = exports
+        self.relocations = relocations
+        self.imports = imports
+
+    def __len__(self):
+        return len(self.words)
+
+    def __repr__(self):
+        return f'ObjectModule({self.name!r}, {len(self.words)} words, {len(self.exports)} exports, {len(self.imports)} imports)'
+
+    def saveToFile(self, fileName: str, fileDir: str = './'):
+        '''
+        Saves the object as a '.mro' file.
+
+        Args:
+            fileName (str): name of object file, do not include '.mro' extension
+            fileDir (str): target output file directory, default same directory ('./')
+        '''
+        data = {
+            'version': ASSEMBLER_VERSION,
+            'name': self.name,
+            'words': self.words,
+            'exports': self.exports,
+            'relocations': self.relocations,
+            'imports': self.imports
+        }
+        with open(f'{fileDir}{fileName}.mro', 'w') as file:
+            json.dump(data, file, separators = (',', ':'))
+
+    @staticmethod
+    def loadFromFile(fileName: str, fileDir: str = './') -> 'ObjectModule':
+        '''
+        Loads an object from a '.mro' file.
+
+        Args:
+            fileName (str): name of object file, do not include '.mro' extension
+            fileDir (str): file location directory, default same directory ('./')
+
+        Raises:
+            MarieLinkError: if the object was written by a different assembler version
+        '''
+        with open(f'{fileDir}{fileName}.mro', 'r') as file:
+            data = json.load(file)
+        if data.get('version') != ASSEMBLER_VERSION:
+            raise MarieLinkError(f'object {fileName} was assembled by version {data.get("version")}')
+        return ObjectModule(data['name'], data['words'], data['exports'], data['relocations'],
+                            [tuple(entry) for entry in data['imports']])
+
+def assembleObject(lines, name: str, exports = None) -> ObjectModule:
+    '''
+    Assembles Marie assembly source into a relocatable object. Operands naming a label of the module are relocated,
+    operands naming no label of the module (and no SKIPCOND condition) are imported.
+
+    Args:
+        lines: iterable of source lines
+        name (str): module name
+        exports: labels exported by the module, default every label
+
+    Returns:
+        module (ObjectModule): assembled object
+
+    Raises:
+        MarieAssemblyError: if the source can not be assembled
+    '''
+    statements = []
+    labels = {}
+    for number, line in enumerate(lines, 1):
+        try:
+            lexed = lexLine(line)
+        except StatementError as e:
+            raise MarieAssemblyError(f'{e} at line {number}')
+        if lexed is None:
+            continue
+        label, keyword, operand = lexed
+        if label is not None:
+            labels[label] = len(statements)
+        statements.append((number, keyword, operand))
+
+    words, relocations, imports = [], [], []
+    for offset, (number, keyword, operand) in enumerate(statements):
+        if keyword in directives or operand is None:
+            try:
+                words.append(encodeStatement(keyword, operand, labels))
+            except StatementError as e:
+                raise MarieAssemblyError(f'{e} at line {number}')
+            continue
+        opcode = instruction_set[keyword] << 12
+        if operand in labels:
+            words.append(opcode | labels[operand])
+            relocations.append(offset)
+            continue
+        try:
+            words.append(opcode | checkSkipcond(operand))
+        except StatementError:
+            words.append(opcode)
+            imports.append((offset, operand))
+    if len(words) > 4096:
+        raise MarieAssemblyError(f'module exceeds memory size ({len(words)} words)')
+
+    if exports is None:
+        exported = dict(labels)
+    else:
+        exported = {}
+        for label in exports:
+            if label.upper() not in labels:
+                raise MarieAssemblyError(f'exported label {label} is not defined')
+            exported[label.upper()] = labels[label.upper()]
+    return ObjectModule(name, words, exported, relocations, imports)
+
+#Per-process object cache, source path to (modification time, object)
+_objects = {}
+
+def loadObject(filepath: str, cacheDir: str = None) -> ObjectModule:
+    '''
+    Returns the object of a '.mas' source file, named after the file. Objects are assembled once per process and, when
+    a cache directory is passed, stored there as '.mro' files keyed on a hash of the normalized source and the assembler
+    version so later builds skip assembly.
+
+    Args:
+        filepath (str): source file path
+        cacheDir (str): optional on-disk object cache directory
+    '''
+    mtime = os.path.getmtime(filepath)
+    cached = _objects.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    with open(filepath, 'r') as file:
+        lines = file.read().splitlines()
+    module = None
+    if cacheDir:
+        normalized = normalizeSource(lines)
+        key = hashlib.sha256(f'{ASSEMBLER_VERSION}\0{name.upper()}\0{normalized}'.encode('utf-8')).hexdigest()
+        directory = os.path.join(cacheDir, '')
+        try:
+            module = ObjectModule.loadFromFile(key, directory)
+        except (OSError, ValueError, KeyError, MarieLinkError):
+            module = None
+    if module is None:
+        module = assembleObject(lines, name)
+        if cacheDir:
+            os.makedirs(cacheDir, exist_ok = True)
+            module.saveToFile(key, directory)
+    _objects[filepath] = (mtime, module)
+    return module
+
+class Linker():
+    '''
+    Links object modules into a single memory image. Modules are placed in the order they are added, the first module
+    starts at address 0 and holds the program entry point. Imports resolve against the exports of the other modules,
+    either by plain label when exactly one module exports it, or qualified with the module name as MODULE.LABEL.
+
+    Attributes:
+        modules (list): added object modules
+        bases (dict): module name to base address, set by link()
+        symbols (dict): qualified MODULE.LABEL to address mapping of every export, set by link()
+    '''
+    def __init__(self):
+        self.modules = []
+        self.bases = {}
+        self.symbols = {}
+
+    def addObject(self, module: ObjectModule):
+        '''
+        Adds an object module to the link.
+
+        Raises:
+            MarieLinkError: if a module with the same name was already added
+        '''
+        if any(m.name == module.name for m in self.modules):
+            raise MarieLinkError(f'duplicate module {module.name}')
+        self.modules.append(module)
+
+    def addFile(self, filepath: str, cacheDir: str = None):
+        '''
+        Adds the object of a '.mas' source file, assembling it only if it is not cached (see loadObject()).
+        '''
+        self.addObject(loadObject(filepath, cacheDir))
+
+    def link(self, memory: Memory = None) -> Memory:
+        '''
+        Places, relocates and resolves every added module.
+
+        Args:
+            memory (Memory): memory receiving the image, default a new Memory
+
+        Returns:
+            memory (Memory): linked image
+
+        Raises:
+            MarieLinkError: if a symbol is undefined or ambiguous, or the image exceeds memory size
+        '''
+        memory = Memory() if memory is None else memory
+        self.bases, self.symbols = {}, {}
+        exporters = {}
+        base = 0
+        for module in self.modules:
+            self.bases[module.name] = base
+            for label, offset in module.exports.items():
+                self.symbols[f'{module.name}.{label}'] = base + offset
+                exporters.setdefault(label, []).append(module.name)
+            base += len(module)
+        if base > len(memory):
+            raise MarieLinkError(f'image exceeds memory size ({base} words)')
+
+        for module in self.modules:
+            base = self.bases[module.name]
+            words = list(module.words)
+            for offset in module.relocations:
+                words[offset] = self.__patch(words[offset], (words[offset] & 0xFFF) + base, module, offset)
+            for offset, symbol in module.imports:
+                words[offset] = self.__patch(words[offset], self.__resolve(symbol, module, exporters), module, offset)
+            for offset, word in enumerate(words):
+                memory.store(word, base + offset)
+        return memory
+
+    def __resolve(self, symbol: str, module: ObjectModule, exporters: dict) -> int:
+        if symbol in self.symbols:
+            return self.symbols[symbol]
+        names = [name for name in exporters.get(symbol, ()) if name != module.name]
+        if not names:
+            raise MarieLinkError(f'undefined symbol {symbol} in module {module.name}')
+        if len(names) > 1:
+            raise MarieLinkError(f'ambiguous symbol {symbol} in module {module.name} (exported by {", ".join(names)})')
+        return self.symbols[f'{names[0]}.{symbol}']
+
+    def __patch(self, word: int, address: int, module: ObjectModule, offset: int) -> int:
+        if address > 0xFFF:
+            raise MarieLinkError(f'address out of range in module {module.name} at offset {offset}')
+        return (word & 0xF000) | address
+
+class MarieLinkError(Exception):
+    '''
+    Marie link exception thrown when object modules can not be linked
+    '''
+    def __init__(self, message = 'modules could not be linked.'):
+        super().__init__(f'Link Error: {message}')
@@ -6,9 +6,17 @@
 # Date: 4/18/2025
 from .abstraction import MemoryABC
 from .memory import Memory
+from .render import StepRenderer
+from collections import deque
+import asyncio
+import inspect
 import os
+import time
 
 class Marie():
+    #Steps executed between wall-clock deadline checks
+    timeoutInterval = 10000
+
     def __init__(self, mem: MemoryABC = Memory()):
         self.AC = 0x0
         self.MAR = 0x0
@@ -20,6 +28,11 @@ class Marie():
         self.memory = mem
         self.__exit = False
         self.__debugText = False
+        self.__headless = False
+        self.__inputSource = None
+        self.__outputCallback = None
+        self.__detector = None
+        self.__steps = 0
         self.__outputs = []
         self.__control = {
             0x0: self.__jns,
@@ -52,6 +65,21 @@ class Marie():
 
         return out
 
+    @property
+    def registers(self) -> dict:
+        '''
+        Snapshot of the current register values keyed by register name.
+        '''
+        return {
+            'AC': self.AC,
+            'MAR': self.MAR,
+            'MBR': self.MBR,
+            'PC': self.PC,
+            'IR': self.IR,
+            'InReg': self.InReg,
+            'OutReg': self.OutReg
+        }
+
     def __initialize(self):
         self.AC = 0x0
         self.MAR = 0x0
@@ -61,8 +89,62 @@ class Marie():
         self.InReg = 0x0
         self.OutReg = 0x0
         self.__exit = False
+        self.__steps = 0
         self.__outputs = []
     
+    def snapshot(self) -> 'MarieSnapshot':
+        '''
+        Captures the registers, memory, outputs and step count of the machine. Memory snapshots are copy-on-write on
+        PagedMemory and full copies otherwise.
+
+        Returns:
+            snapshot (MarieSnapshot): machine state which can be passed to restore()
+        '''
+        return MarieSnapshot(self.registers, self.memory.snapshot(), self.__outputs.copy(), self.__steps, self.__exit)
+
+    def restore(self, snapshot: 'MarieSnapshot'):
+        '''
+        Restores the machine state saved by snapshot().
+
+        Args:
+            snapshot (MarieSnapshot): snapshot taken from this machine
+        '''
+        for name, value in snapshot.registers.items():
+            setattr(self, name, value)
+        self.memory.restore(snapshot.memory)
+        self.__outputs = snapshot.outputs.copy()
+        self.__steps = snapshot.steps
+        self.__exit = snapshot.halted
+
+    def _rewind(self, steps: int, outputs: int, values: list, halted: bool = False):
+        '''
+        Sets the step count and drops the outputs past a passed count, then appends the values output after it, once the
+        registers and memory were set to another recorded step (see MARIE.reverse).
+
+        Args:
+            steps (int): step count of the recorded state
+            outputs (int): number of current outputs kept
+            values (list): values output after the kept outputs and before the recorded state
+            halted (bool): True if the machine had halted at the recorded state
+        '''
+        while len(self.__outputs) > outputs:
+            self.__outputs.pop()
+        self.__outputs.extend(values)
+        self.__steps = steps
+        self.__exit = halted
+
+    def fork(self) -> 'Marie':
+        '''
+        Returns an independent machine in the same state, with a forked copy of the memory (see Memory.fork()).
+        '''
+        machine = Marie(self.memory.fork())
+        for name, value in self.registers.items():
+            setattr(machine, name, value)
+        machine.__outputs = self.__outputs.copy()
+        machine.__steps = self.__steps
+        machine.__exit = self.__exit
+        return machine
+
     def __displayOutput(self):
         isHex = True if input('Display output as hexadecimal values (Y/N)?').upper().startswith('Y') else False
         print('\nOutput:')
@@ -72,6 +154,49 @@ class Marie():
             else:
                 print(f'\t{o}')
 
+    def __inputProvider(self, inputs):
+        '''
+        Normalizes the inputs passed to run() into a callable returning the next input value.
+
+        Args:
+            inputs: iterable of integer values, or a callable returning the next value (None or StopIteration when exhausted)
+        '''
+        if inputs is None:
+            inputs = ()
+        if callable(inputs):
+            return inputs
+        itr = iter(inputs)
+        return lambda: next(itr)
+
+    def _readInput(self) -> int:
+        '''
+        Reads the next value from the headless input source.
+
+        Returns:
+            value (int): next input value
+
+        Raises:
+            MarieInputError: if the input source is exhausted or the value is outside the input range (max 0xFFF)
+        '''
+        try:
+            value = self.__inputSource()
+        except StopIteration:
+            value = None
+        if value is None:
+            raise MarieInputError(f'input requested but no input values remain (address {self.PC - 1})', exhausted = True)
+        value = int(value)
+        if value > 0xFFF:
+            raise MarieInputError(f'input value out of range (0x{value:X} > 0xFFF)')
+        return value
+
+    def _writeOutput(self, value: int):
+        '''
+        Pushes an output value to the outputs list and, when set, the headless output callback.
+        '''
+        self.__outputs.append(value)
+        if self.__outputCallback:
+            self.__outputCallback(value)
+
     def __fetch(self):
         self.MAR = self.PC
         self.MBR = self.memory.load(self.MAR)
@@ -101,7 +226,7 @@ class Marie():
             self.MBR = self.memory.load(self.MAR)
             self.AC += self.MBR
         except Exception as e:
-            raise MarieExecutionError('f{e}')
+            raise MarieExecutionError(f'{e}')
         if self.__debugText:
             print('ADD:')
             print(f'\tMBR \u2190 M[MAR] (0x{self.MBR:03X})')
@@ -112,7 +237,7 @@ class Marie():
             self.MBR = self.memory.load(self.MAR)
             self.AC -= self.MBR
         except Exception as e:
-            raise MarieExecutionError('f{e}')
+            raise MarieExecutionError(f'{e}')
         if self.__debugText:
             print('SUBT:')
             print(f'\tMBR \u2190 M[MAR] (0x{self.MBR:03X})')
@@ -126,7 +251,7 @@ class Marie():
             self.MBR = self.memory.load(self.MAR)
             self.AC += self.MBR
         except Exception as e:
-            raise MarieExecutionError('f{e}')
+            raise MarieExecutionError(f'{e}')
         if self.__debugText:
             print('ADDI:')
             print(f'\tMBR \u2190 M[MAR] (0x{self.MAR:03X})')
@@ -144,7 +269,7 @@ class Marie():
         try:
             self.AC = self.memory.load(self.MAR)
         except Exception as e:
-            raise MarieExecutionError('f{e}')
+            raise MarieExecutionError(f'{e}')
         if self.__debugText:
             print('LOAD:')
             print(f'\tAC \u2190 M[MAR] ({self.AC:03X})')
@@ -153,12 +278,20 @@ class Marie():
         try:
             self.memory.store(self.AC , self.MAR)
         except Exception as e:
-            raise MarieExecutionError('f{e}')
+            raise MarieExecutionError(f'{e}')
         if self.__debugText:
             print('STORE:')
             print(f'\tM[MAR] \u2190 AC ({self.AC:03X})')
     
     def __input(self):
+        if self.__headless:
+            self.InReg = self._readInput()
+            self.AC = self.InReg
+            if self.__debugText:
+                print('INPUT:')
+                print('\tInReg \u2190 Input source')
+                print(f'\tAC \u2190 InReg ({self.InReg:03X})')
+            return
         print('User input requested:')
         self.InReg = 0x0
         while True:
@@ -183,7 +316,7 @@ class Marie():
     
     def __output(self):
         self.OutReg = self.AC
-        self.__outputs.append(self.OutReg)
+        self._writeOutput(self.OutReg)
         if self.__debugText:
             print('OUTPUT:')
             print('\tOutReg \u2190 AC')
@@ -236,31 +369,403 @@ class Marie():
         '''
         os.system('cls' if os.name == 'nt' else 'clear')
 
-    def execute(self):
+    def execute(self, maxSteps: int = None, timeout: float = None, detectLoops: bool = False):
+        '''
+        Interactive program execution, prompting for inputs and displaying the outputs once the program stops.
+
+        Args:
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+            timeout (float): wall-clock limit in seconds, default unlimited
+            detectLoops (bool): stop as soon as the machine state repeats, see run()
+        '''
         self.__debugText = False
         self.__initialize()
         self.__clearTerm()
         try:
-            while not self.__exit:
-                self.__fetch()
-                self.__decode()
+            self.__execute(None, maxSteps, timeout, detectLoops = detectLoops)
         except Exception as e:
             print(f'{e}')
         self.__clearTerm()
         self.__displayOutput()
     
-    def executeStepwise(self):
+    def step(self) -> bool:
+        '''
+        Executes a single fetch/decode cycle without debug text.
+
+        Returns:
+            halted (bool): True if the executed instruction halted the program
+        '''
+        self.__fetch()
+        self.__decode()
+        return self.__exit
+
+    def run(self, inputs = None, maxSteps: int = None, output = None, engine = None, timeout: float = None,
+            resume: bool = False, checkInterval: int = None, detectLoops: bool = False,
+            outputLimit: int = None) -> 'RunResult':
+        '''
+        Headless program execution. Runs the loaded program without touching the terminal, reading INPUT values from
+        the passed input source and collecting OUTPUT values. Errors are captured in the returned result rather than printed.
+
+        Args:
+            inputs: iterable of input values, or a callable returning the next input value (None when exhausted)
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+            output: optional callable invoked with each value as it is output, such as an OutputSink (see MARIE.sinks);
+                exceptions raised by the callable stop the run
+            engine: optional Engine subclass used in place of the default fetch/decode loop (see MARIE.engine)
+            timeout (float): wall-clock limit in seconds, checked every checkInterval steps, default unlimited
+            resume (bool): continue from the current machine state, such as a restored snapshot or a fork, instead of
+                resetting the registers; outputs and the step count carry on from that state
+            checkInterval (int): steps executed between wall-clock deadline checks, default Marie.timeoutInterval
+            detectLoops (bool): stop with a MarieLoopError as soon as the machine state (PC, AC and memory) repeats at a
+                backward jump without an INPUT in between, such programs can never halt. Loop detection runs on the
+                default fetch/decode loop, the engine argument is ignored
+            outputLimit (int): keep only the last outputLimit values in the result outputs (ring buffer), default all
+
+        Returns:
+            result (RunResult): outputs, final registers, executed step count and any execution error
+        '''
+        self.__debugText = False
+        if not resume:
+            self.__initialize()
+        if outputLimit is not None:
+            self.__outputs = deque(self.__outputs, maxlen = outputLimit)
+        self.__headless = True
+        self.__inputSource = self.__inputProvider(inputs)
+        self.__outputCallback = output
+        error = None
+        try:
+            self.__execute(engine, maxSteps, timeout, checkInterval, detectLoops)
+        except Exception as e:
+            error = e
+        finally:
+            self.__headless = False
+            self.__inputSource = None
+            self.__outputCallback = None
+        return RunResult(list(self.__outputs), self.registers, self.__steps, self.__exit, error)
+
+    def stream(self, inputs = None, maxSteps: int = None, engine = None, timeout: float = None,
+               interval: int = 1000):
+        '''
+        Headless program execution as a generator yielding each OUTPUT value shortly after it is output, checked every
+        interval instructions. Output values are not kept by the machine, so long running programs use constant memory.
+        The generator returns the run's RunResult, with empty outputs, once the program stops:
+
+            result = yield from machine.stream(inputs)
+
+        Args:
+            inputs: iterable of input values, or a callable returning the next input value (None when exhausted)
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+            engine: optional Engine subclass used in place of the default fetch/decode loop (see MARIE.engine)
+            timeout (float): limit in seconds on time spent executing, time the consumer holds the generator is not
+                counted, default unlimited
+            interval (int): instructions executed between yields
+
+        Yields:
+            value (int): output values, in order
+        '''
+        self.__debugText = False
+        self.__initialize()
+        self.__outputs = deque(maxlen = 0)
+        self.__headless = True
+        self.__inputSource = self.__inputProvider(inputs)
+        emitted = []
+        self.__outputCallback = emitted.append
+        error = None
+        try:
+            for _ in self.__slices(engine, maxSteps, timeout, interval, paused = True):
+                yield from emitted
+                emitted.clear()
+        except Exception as e:
+            error = e
+        finally:
+            self.__headless = False
+            self.__inputSource = None
+            self.__outputCallback = None
+        yield from emitted
+        return RunResult([], self.registers, self.__steps, self.__exit, error)
+
+    async def runAsync(self, inputs = None, maxSteps: int = None, output = None, engine = None, timeout: float = None,
+                       yieldInterval: int = 1000, detectLoops: bool = False) -> 'RunResult':
+        '''
+        Headless program execution on an asyncio event loop. INPUT awaits the input source and OUTPUT values are pushed
+        to the output target, the machine yields to the event loop every yieldInterval instructions so many machines can
+        share one loop. Errors are captured in the returned result as in run().
+
+        Args:
+            inputs: asyncio.Queue, async iterable, callable returning a value or an awaitable value (None when exhausted),
+                or an iterable of input values
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+            output: optional asyncio.Queue, or callable invoked with each value (awaited if it returns an awaitable);
+                values are pushed after each slice of instructions
+            engine: optional Engine subclass used in place of the default fetch/decode loop (see MARIE.engine)
+            timeout (float): limit in seconds on time spent executing, time spent awaiting inputs or suspended on the
+                event loop is not counted, default unlimited
+            yieldInterval (int): instructions executed between yields to the event loop
+            detectLoops (bool): stop as soon as the machine state repeats, see run()
+
+        Returns:
+            result (RunResult): outputs, final registers, executed step count and any execution error
+        '''
+        self.__debugText = False
+        self.__initialize()
+        self.__headless = True
+        ready = []
+        emitted = []
+        def source():
+            if not ready:
+                raise _InputPending()
+            return ready.pop()
+        self.__inputSource = source
+        self.__outputCallback = emitted.append
+        nextInput = self.__asyncInputProvider(inputs)
+        error = None
+        try:
+            for waiting in self.__slices(engine, maxSteps, timeout, yieldInterval, detectLoops, paused = True):
+                await self.__pushOutputs(emitted, output)
+                if waiting:
+                    ready.append(await nextInput())
+                else:
+                    await asyncio.sleep(0)
+        except Exception as e:
+            error = e
+        finally:
+            self.__headless = False
+            self.__inputSource = None
+            self.__outputCallback = None
+        try:
+            await self.__pushOutputs(emitted, output)
+        except Exception as e:
+            error = error or e
+        return RunResult(list(self.__outputs), self.registers, self.__steps, self.__exit, error)
+
+    def __asyncInputProvider(self, inputs):
+        '''
+        Normalizes the inputs passed to runAsync() into a coroutine function returning the next input value, None when
+        exhausted.
+        '''
+        if isinstance(inputs, asyncio.Queue):
+            return inputs.get
+        if hasattr(inputs, '__aiter__'):
+            itr = inputs.__aiter__()
+            async def nextValue():
+                try:
+                    return await itr.__anext__()
+                except StopAsyncIteration:
+                    return None
+            return nextValue
+        provider = self.__inputProvider(inputs)
+        async def nextValue():
+            try:
+                value = provider()
+            except StopIteration:
+                return None
+            if inspect.isawaitable(value):
+                value = await value
+            return value
+        return nextValue
+
+    async def __pushOutputs(self, emitted: list, output):
+        '''
+        Pushes and clears the values output during the last slice.
+        '''
+        values = emitted[:]
+        emitted.clear()
+        if output is None:
+            return
+        for value in values:
+            if isinstance(output, asyncio.Queue):
+                await output.put(value)
+            else:
+                result = output(value)
+                if inspect.isawaitable(result):
+                    await result
+
+    def __execute(self, engine = None, maxSteps: int = None, timeout: float = None, checkInterval: int = None,
+                  detectLoops: bool = False):
+        '''
+        Executes the loaded program in slices on the default loop or an alternative engine, enforcing the step limit and
+        wall-clock deadline between slices.
+
+        Raises:
+            MarieStepLimitError: if maxSteps instructions are executed without halting
+            MarieTimeoutError: if the deadline passes before the program halts
+            MarieLoopError: if loop detection is enabled and the machine state repeats
+        '''
+        for _ in self.__slices(engine, maxSteps, timeout, checkInterval, detectLoops):
+            pass
+
+    def __slices(self, engine = None, maxSteps: int = None, timeout: float = None, checkInterval: int = None,
+                 detectLoops: bool = False, paused: bool = False):
+        '''
+        Generator executing the loaded program in slices of at most checkInterval steps, yielding between slices. Slices
+        only end early for the deadline check unless paused is set, in which case every slice ends after checkInterval
+        steps or at an INPUT with no value ready (see runAsync()). Time spent suspended does not count towards the
+        deadline.
+
+        Yields:
+            waiting (bool): True if the program is waiting on an input value, PC is left at the INPUT instruction
+
+        Raises:
+            MarieStepLimitError: if maxSteps instructions are executed without halting
+            MarieTimeoutError: if the deadline passes before the program halts
+            MarieLoopError: if loop detection is enabled and the machine state repeats
+        '''
+        if self.__exit:
+            return
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        interval = self.timeoutInterval if checkInterval is None else checkInterval
+        if detectLoops:
+            runner = None
+            self.__detector = _LoopDetector(self.memory)
+            execute = self.__detectCycle
+        elif engine is None:
+            runner = None
+            execute = self.__cycle
+        else:
+            runner = engine(self)
+            execute = runner.run
+        base = self.__steps
+        try:
+            while True:
+                budget = None if maxSteps is None else maxSteps - self.__steps
+                if deadline is not None or paused:
+                    budget = interval if budget is None else min(budget, interval)
+                waiting = False
+                try:
+                    self.__exit = execute(budget)
+                except _InputPending:
+                    # The INPUT was fetched but not executed, rewind so it is fetched again once a value is ready
+                    self.PC -= 1
+                    waiting = True
+                if runner:
+                    self.__steps = base + runner.steps
+                if self.__exit:
+                    return
+                if maxSteps is not None and self.__steps >= maxSteps:
+                    raise MarieStepLimitError(f'step limit reached ({maxSteps} steps, address {self.PC})')
+                if deadline is not None and time.perf_counter() >= deadline:
+                    raise MarieTimeoutError(f'time limit reached ({timeout}s, {self.__steps} steps, address {self.PC})')
+                suspended = time.perf_counter()
+                yield waiting
+                if deadline is not None:
+                    deadline += time.perf_counter() - suspended
+        finally:
+            if runner:
+                self.__steps = base + runner.steps
+
+    def __cycle(self, maxSteps: int = None) -> bool:
+        '''
+        Headless fetch/decode loop, executes until the program halts or maxSteps instructions have been executed.
+
+        Returns:
+            halted (bool): True if the program halted
+        '''
+        fetch, decode = self.__fetch, self.__decode
+        steps = 0
+        try:
+            while not self.__exit:
+                if steps == maxSteps:
+                    break
+                fetch()
+                decode()
+                steps += 1
+        finally:
+            self.__steps += steps
+        return self.__exit
+
+    def __detectCycle(self, maxSteps: int = None) -> bool:
+        '''
+        Fetch/decode loop checking the machine state for repeats at every backward jump, executes until the program
+        halts or maxSteps instructions have been executed.
+
+        Returns:
+            halted (bool): True if the program halted
+
+        Raises:
+            MarieLoopError: if the machine state repeats
+        '''
+        fetch, decode = self.__fetch, self.__decode
+        detector = self.__detector
+        steps = 0
+        try:
+            while not self.__exit:
+                if steps == maxSteps:
+                    break
+                address = self.PC
+                fetch()
+                inst = (self.IR >> 12) & 0xF
+                if inst == 0x2 or inst == 0x0:
+                    detector.write(self.IR & 0xFFF)
+                decode()
+                steps += 1
+                if inst == 0x5:
+                    detector.reset()
+                elif self.PC <= address and detector.backEdge(address, self.PC, self.AC):
+                    start, end = detector.range
+                    raise MarieLoopError(f'infinite loop detected (addresses 0x{start:03X} - 0x{end:03X}, '
+                                         f'{self.__steps + steps} steps)', start, end)
+        finally:
+            self.__steps += steps
+        return self.__exit
+
+    def runMany(self, inputSets: list, maxSteps: int = None, engine = None, timeout: float = None) -> list:
+        '''
+        Runs the loaded program once per input set. The input-independent prefix, everything executed before the first
+        INPUT, runs once and each input set continues from a fork of the machine at that INPUT. Results match separate
+        run() calls. The machine is left at the end of the shared prefix.
+
+        Args:
+            inputSets (list): one iterable of input values per run
+            maxSteps (int): maximum number of instructions executed per run, including the prefix, default unlimited
+            engine: optional Engine subclass used in place of the default fetch/decode loop
+            timeout (float): wall-clock limit in seconds for the prefix and for each forked run
+
+        Returns:
+            results (list): RunResult for each input set, in order
+        '''
+        prefix = self.run((), maxSteps, engine = engine, timeout = timeout)
+        if not isinstance(prefix.error, MarieInputError) or not prefix.error.exhausted:
+            # The program finished or failed without reading input, every input set gives the same result
+            return [RunResult(prefix.outputs[:], dict(prefix.registers), prefix.steps, prefix.halted, prefix.error)
+                    for _ in inputSets]
+
+        # Rewind to the INPUT instruction, the forked runs fetch it again
+        self.PC -= 1
+        return [self.fork().run(inputs, maxSteps, engine = engine, timeout = timeout, resume = True)
+                for inputs in inputSets]
+
+    def executeStepwise(self, renderer = None, incremental: bool = True):
+        '''
+        Educational stepwise execution, printing the register transfers of each instruction and the machine state.
+
+        Args:
+            renderer (StepRenderer): renderer drawing the machine state, default a new StepRenderer
+            incremental (bool): redraw only the changed registers and memory rows, False clears and reprints the
+                terminal after every instruction
+        '''
         self.__debugText = True
         self.__exit = False
         self.PC = 0x0
-        self.__clearTerm()
+        if incremental and renderer is None:
+            renderer = StepRenderer()
+        if incremental:
+            renderer.reset()
+            renderer.render(self)
+        else:
+            self.__clearTerm()
         try:
             while not self.__exit:
+                if incremental:
+                    renderer.clearText()
                 self.__fetch()
                 self.__decode()
-                print(self)
+                if incremental:
+                    renderer.render(self)
+                else:
+                    print(self)
                 input('Enter to continue...')
-                self.__clearTerm()
+                if not incremental:
+                    self.__clearTerm()
         except Exception as e:
             print(f'{e}')
         self.__displayOutput()
@@ -270,4 +775,156 @@ class MarieExecutionError(Exception):
     Marie execution error, triggered where errors arrise in program execution
     '''
     def __init__(self, message = 'something whent wrong during program execution, check source program.'):
-        super().__init__(f'Execution Error: {message}')
\ No newline at end of file
+        super().__init__(f'Execution Error: {message}')
+
+class MarieInputError(MarieExecutionError):
+    '''
+    Headless input error, triggered when the input source is exhausted or passes an out of range value
+
+    Attributes:
+        exhausted (bool): True if the input source had no values left
+    '''
+    def __init__(self, message = 'input could not be read from the input source.', exhausted: bool = False):
+        super().__init__(message)
+        self.exhausted = exhausted
+
+class MarieStepLimitError(MarieExecutionError):
+    '''
+    Headless execution error, triggered when a program exceeds its step limit without halting
+    '''
+    def __init__(self, message = 'step limit reached before the program halted.'):
+        super().__init__(message)
+
+class MarieTimeoutError(MarieExecutionError):
+    '''
+    Headless execution error, triggered when a program runs past its wall-clock deadline without halting
+    '''
+    def __init__(self, message = 'time limit reached before the program halted.'):
+        super().__init__(message)
+
+class MarieOutputError(MarieExecutionError):
+    '''
+    Headless execution error, triggered by an output sink when the program's outputs diverge from the expected outputs
+
+    Attributes:
+        index (int): index of the first diverging output
+    '''
+    def __init__(self, message = 'program output diverged from the expected output.', index: int = None):
+        super().__init__(message)
+        self.index = index
+
+class MarieLoopError(MarieExecutionError):
+    '''
+    Headless execution error, triggered when loop detection finds a repeated machine state
+
+    Attributes:
+        start (int): lowest address of the detected loop
+        end (int): highest address of the detected loop
+    '''
+    def __init__(self, message = 'infinite loop detected.', start: int = None, end: int = None):
+        super().__init__(message)
+        self.start = start
+        self.end = end
+
+class _LoopDetector():
+    '''
+    Exact repeated state detector using Brent's cycle finding over backward jumps. A reference state (PC, AC and the
+    previous value of every address written since) is kept and replaced after each power of two back-edges, so a
+    repeating program is caught within a few periods of its loop while each check only compares the written addresses.
+    '''
+    def __init__(self, memory: MemoryABC):
+        self.memory = memory
+        self.reset()
+
+    def reset(self):
+        '''
+        Drops the reference state, used after INPUT as later states depend on the input source.
+        '''
+        self.reference = None
+        self.saved = {}
+        self.power = 1
+        self.count = 0
+        self.range = None
+
+    def write(self, address: int):
+        '''
+        Records the reference value of an address before it is first written.
+        '''
+        if address not in self.saved:
+            try:
+                self.saved[address] = self.memory.load(address)
+            except Exception:
+                pass
+
+    def backEdge(self, source: int, target: int, ac: int) -> bool:
+        '''
+        Checks the state after a backward jump against the reference state.
+
+        Returns:
+            repeated (bool): True if the machine state equals the reference state
+        '''
+        load = self.memory.load
+        if self.range is None:
+            self.range = (target, source)
+        else:
+            self.range = (min(self.range[0], target), max(self.range[1], source))
+        if self.reference == (target, ac) and all(load(a) == v for a, v in self.saved.items()):
+            return True
+        self.count += 1
+        if self.count == self.power:
+            self.reference = (target, ac)
+            self.saved = {}
+            self.range = None
+            self.power <<= 1
+            self.count = 0
+        return False
+
+class _InputPending(Exception):
+    '''
+    Raised by the runAsync() input source when no input value is ready, ending the current slice at the INPUT
+    '''
+    pass
+
+class MarieSnapshot():
+    '''
+    Saved Marie machine state, see Marie.snapshot().
+
+    Attributes:
+        registers (dict): register values keyed by register name
+        memory: memory snapshot, see Memory.snapshot()
+        outputs (list): values output before the snapshot
+        steps (int): number of instructions executed before the snapshot
+        halted (bool): True if the machine had halted
+    '''
+    def __init__(self, registers: dict, memory, outputs: list, steps: int, halted: bool):
+        self.registers = registers
+        self.memory = memory
+        self.outputs = outputs
+        self.steps = steps
+        self.halted = halted
+
+class RunResult():
+    '''
+    Result of a headless Marie run.
+
+    Attributes:
+        outputs (list): values output by the program, in order
+        registers (dict): final register values keyed by register name
+        steps (int): number of instructions executed
+        halted (bool): True if the program reached a HALT instruction
+        error (Exception): execution error that stopped the program, None if the run halted normally
+    '''
+    def __init__(self, outputs: list, registers: dict, steps: int, halted: bool, error: Exception = None):
+        self.outputs = outputs
+        self.registers = registers
+        self.steps = steps
+        self.halted = halted
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        '''True if the program halted without error'''
+        return self.halted and self.error is None
+
+    def __repr__(self):
+        return f'RunResult(outputs={self.outputs}, steps={self.steps}, halted={self.halted}, error={self.error!r})'
@@ -4,6 +4,9 @@
 # Professor: Abdulbast Abushgra
 # Date: 4/4/2025
 from .abstraction import MemoryABC
+from .image import MemoryImage, writeImage
+from array import array
+import sys
 
 class Memory(MemoryABC):
     '''
@@ -24,6 +27,7 @@ class Memory(MemoryABC):
         string += '\n'
 
         # Generate memory matrix up to head value
+        words = self.flatWords()
         row = 0
         clm = 0
         for address in range(0, self._head + 1):
@@ -33,7 +37,7 @@ class Memory(MemoryABC):
                 string += '\n'
             if clm == 0:
                 string += f'0x{row:03X}'.ljust(width-1) + '|'
-            string += f'0x{self.memory[address]:04X}'.ljust(width)
+            string += f'0x{words[address]:04X}'.ljust(width)
             clm += 1
         
         #Fill in unfinished row with 0s
@@ -43,6 +47,9 @@ class Memory(MemoryABC):
 
         return string
     
+    def __len__(self):
+        return len(self.memory)
+
     # def __setattr__(self, key, value):
     #     self.store(value, key)
     
@@ -102,12 +109,7 @@ class Memory(MemoryABC):
             fileDire (str): target output file directory, default same directory ('./')
         '''
         #convert to save format
-        string = ''
-        for i in range(0, self._head + 1):
-            if i == self._head:
-                string += f'{self.memory[i]:04X}'
-            else:
-                string += f'{self.memory[i]:04X}\n'
+        string = '\n'.join(f'{word:04X}' for word in self.flatWords()[:self._head + 1])
     
         #Save to target directory
         with open(f'{fileDir}{fileName}.mre', 'w') as file:
@@ -128,6 +130,693 @@ class Memory(MemoryABC):
                 self.memory[self._head] = int(read, 16)
                 self._head += 1
 
+    def saveToImage(self, fileName: str, fileDir: str = './', symbols: dict = None):
+        '''
+        Saves data stored within the memory as a binary '.mri' image.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            symbols (dict): optional label to address mapping saved with the image, as in Assembler.address_book
+        '''
+        writeImage(f'{fileDir}{fileName}.mri', self.flatWords()[:self._head + 1], symbols)
+
+    def loadFromImage(self, fileName: str, fileDir: str = './') -> dict:
+        '''
+        Loads data into the memory from a binary '.mri' image.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): file location directory, default same directory ('./')
+
+        Returns:
+            symbols (dict): label to address mapping saved with the image, empty if the image has no symbols
+
+        Raises:
+            MemoryError: if the image holds more words than the memory
+            MemoryImageError: if the file is not a valid image
+        '''
+        with MemoryImage(f'{fileDir}{fileName}.mri') as image:
+            if image.count > len(self):
+                raise MemoryError(f'image exceeds memory size ({image.count} words)')
+            self._copyImage(image)
+            self._head = max(image.count - 1, 0)
+            return image.symbols
+
+    def _copyImage(self, image: MemoryImage):
+        '''
+        Copies the words of an open image into the start of memory.
+        '''
+        words = image.words().tolist()
+        for address in image.signed:
+            words[address] -= 0x10000
+        self.memory[:image.count] = words
+
+    def flatWords(self) -> list:
+        '''
+        Returns a copy of every word, in address order. Writes to the copy do not reach the memory, write through
+        store().
+        '''
+        return self.memory[:]
+
+    def snapshot(self) -> tuple:
+        '''
+        Returns a snapshot of the memory contents which can be passed to restore(). Snapshots copy every word, see
+        PagedMemory for copy-on-write snapshots.
+        '''
+        return (self.memory[:], self._head)
+
+    def restore(self, snapshot: tuple):
+        '''
+        Restores the memory contents saved by snapshot().
+
+        Args:
+            snapshot: snapshot returned by this memory's snapshot()
+        '''
+        words, self._head = snapshot
+        self.memory[:] = words
+
+    def fork(self) -> 'Memory':
+        '''
+        Returns an independent memory holding the same contents.
+        '''
+        mem = type(self).__new__(type(self))
+        mem.memory = self.memory[:]
+        mem._head = self._head
+        return mem
+
+class ArrayMemory(Memory):
+    '''
+    Compact simulated memory with 4096 words backed by an unsigned 16-bit array (8 KiB per image). Supports zero-copy
+    memoryview slices, bulk range loads and stores, and fast clear and copy.
+
+    Stored values follow the Memory rules (max 0xFFFF) and load back exactly as stored. The array holds the low 16 bits
+    of every word, words holding negative values are also kept in a small address to value table, the way '.mri'
+    images keep a signed section, so views and range loads show them as their two's complement bit pattern.
+    '''
+    def __init__(self):
+        '''Initializes memory array of size 4096'''
+        self.memory = array('H', bytes(2 * 4096))
+        self._negative = {} #address to value of words holding negative values
+        self._head = 0 #program head marker
+
+    def __checkRange(self, address: int, count: int = 1):
+        '''
+        Utility method used to verify address bounds for a range of words
+
+        Raises:
+            MemoryError: if part of the range is outside memory range (4096)
+        '''
+        if address < 0 or address + count > len(self.memory):
+            raise MemoryError(f'address out of bounds error (0x{address + count - 1:04X})')
+
+    def __forget(self, address: int, count: int):
+        '''
+        Drops the negative values recorded for a range of words being overwritten.
+        '''
+        if self._negative:
+            for key in [key for key in self._negative if address <= key < address + count]:
+                del self._negative[key]
+
+    def store(self, value: int, address: int):
+        '''
+        Stores a passed integer value at a target address within the memory
+
+        Args:
+            value (int): integer value being stored within the target address
+            address (int): target memory address to store within
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096) or if passed value exceeds maximum storage size (0xFFFF)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        if value > 0xFFFF:
+            raise MemoryError(f'storage bound error (max 0xFFFF)')
+        if -4096 <= address < 0:
+            # Negative addresses wrap as list indices do in Memory
+            address += 4096
+        if value < 0:
+            self.memory[address] = value & 0xFFFF
+            self._negative[address] = value
+        else:
+            self.memory[address] = value
+            if self._negative:
+                self._negative.pop(address, None)
+
+        # Update head value as needed
+        if self._head < address:
+            self._head = address
+
+    def load(self, address: int) -> int:
+        '''
+        Returns value stored in memory at a specified address
+
+        Args:
+            address (int): target memory address to read
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        value = self.memory[address]
+        if self._negative:
+            if -4096 <= address < 0:
+                address += 4096
+            negative = self._negative.get(address)
+            # Words rewritten through a view no longer hold the recorded bit pattern
+            if negative is not None and negative & 0xFFFF == value:
+                return negative
+        return value
+
+    def flatWords(self) -> list:
+        '''
+        Returns a copy of every word, in address order. Writes to the copy do not reach the memory, write through
+        store().
+        '''
+        words = self.memory.tolist()
+        for address, value in self._negative.items():
+            if value & 0xFFFF == words[address]:
+                words[address] = value
+        return words
+
+    def view(self, start: int = 0, stop: int = None) -> memoryview:
+        '''
+        Returns a zero-copy memoryview over a range of 16-bit words, negative words show as their two's complement bit
+        pattern. Writes through the view bypass the head marker and store unsigned values.
+
+        Args:
+            start (int): first address of the view, default 0
+            stop (int): address after the last address of the view, default end of memory
+        '''
+        return memoryview(self.memory)[start:stop]
+
+    def loadRange(self, address: int, count: int) -> array:
+        '''
+        Returns a copy of a range of 16-bit words, negative words as their two's complement bit pattern (see load()).
+
+        Args:
+            address (int): first address to read
+            count (int): number of words to read
+
+        Raises:
+            MemoryError: if part of the range is outside memory range (4096)
+        '''
+        self.__checkRange(address, count)
+        return self.memory[address:address + count]
+
+    def storeRange(self, values, address: int = 0):
+        '''
+        Stores a sequence of words starting at a target address.
+
+        Args:
+            values: sequence of integer values, or an array('H') of unsigned words which is copied without conversion
+            address (int): first address to store within, default 0
+
+        Raises:
+            MemoryError: if part of the range is outside memory range (4096) or if a value exceeds maximum storage size (0xFFFF)
+        '''
+        negative = None
+        if not isinstance(values, array) or values.typecode != 'H':
+            values = list(values)
+            if any(v > 0xFFFF for v in values):
+                raise MemoryError(f'storage bound error (max 0xFFFF)')
+            negative = {address + offset: v for offset, v in enumerate(values) if v < 0}
+            values = array('H', [v & 0xFFFF for v in values])
+        self.__checkRange(address, len(values))
+        self.memory[address:address + len(values)] = values
+        self.__forget(address, len(values))
+        if negative:
+            self._negative.update(negative)
+
+        # Update head value as needed
+        if values and self._head < address + len(values) - 1:
+            self._head = address + len(values) - 1
+
+    def clear(self):
+        '''
+        Zeroes every word in place and resets the head marker. Existing views remain valid.
+        '''
+        view = memoryview(self.memory).cast('B')
+        view[:] = bytes(len(view))
+        self._negative.clear()
+        self._head = 0
+
+    def copy(self) -> 'ArrayMemory':
+        '''
+        Returns an independent copy of the memory.
+        '''
+        mem = type(self).__new__(type(self))
+        mem.memory = self.memory[:]
+        mem._negative = dict(self._negative)
+        mem._head = self._head
+        return mem
+
+    def __copy__(self):
+        return self.copy()
+
+    def fork(self) -> 'ArrayMemory':
+        '''
+        Returns an independent memory holding the same contents.
+        '''
+        return self.copy()
+
+    def snapshot(self) -> tuple:
+        '''
+        Returns a snapshot of the memory contents which can be passed to restore().
+        '''
+        return (self.memory[:], dict(self._negative), self._head)
+
+    def restore(self, snapshot: tuple):
+        '''
+        Restores the memory contents saved by snapshot().
+
+        Args:
+            snapshot: snapshot returned by this memory's snapshot()
+        '''
+        words, negative, self._head = snapshot
+        self.memory[:] = words
+        self._negative = dict(negative)
+
+    def saveToImage(self, fileName: str, fileDir: str = './', symbols: dict = None):
+        '''
+        Saves data stored within the memory as a binary '.mri' image.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            symbols (dict): optional label to address mapping saved with the image, as in Assembler.address_book
+        '''
+        # Without negative words the array is packed without conversion
+        words = self.flatWords() if self._negative else self.memory
+        writeImage(f'{fileDir}{fileName}.mri', words[:self._head + 1], symbols)
+
+    def _copyImage(self, image: MemoryImage):
+        if sys.byteorder == 'little':
+            # Copy the mapped payload straight into the backing array
+            memoryview(self.memory).cast('B')[:2 * image.count] = image.payload
+        else:
+            self.memory[:image.count] = image.words()
+        self.__forget(0, image.count)
+        for address in image.signed:
+            self._negative[address] = self.memory[address] - 0x10000
+
+    def loadFromFile(self, fileName: str, fileDir: str = './'):
+        '''
+        Loads data into the memory from a '.mre' file.
+
+        Args:
+            fileName (str): name of memory file, do not include '.mre' extension
+            fileDire (str): file location directory, default same directory ('./')
+        '''
+        with open(f'{fileDir}{fileName}.mre','r') as file:
+            values = [int(line.strip(), 16) for line in file]
+        self.storeRange(values, 0)
+        self._head = len(values)
+
+class PagedMemory(Memory):
+    '''
+    Copy-on-write simulated memory with 4096 words split into 16 pages of 256 words. Snapshots and forks share every
+    page and a page is only copied the first time it is written afterwards, so a snapshot or fork costs O(pages) and
+    later writes copy only the pages they touch.
+
+    Words live only in the pages, there is no flat memory attribute. flatWords() returns a copy, write through store().
+    '''
+    pageBits = 8
+    pageSize = 1 << pageBits
+    pageMask = pageSize - 1
+    pageCount = 4096 >> pageBits
+
+    #Shared zero page, never written
+    __zero = (0x0,) * pageSize
+
+    def __init__(self):
+        '''Initializes 16 shared zero pages'''
+        self.pages = [self.__zero] * self.pageCount
+        self._owned = [False] * self.pageCount # pages private to this memory, safe to write in place
+        self._head = 0 #program head marker
+
+    def flatWords(self) -> list:
+        '''
+        Returns a copy of every word, in address order. Writes to the copy do not reach the memory, write through
+        store().
+        '''
+        words = []
+        for page in self.pages:
+            words += page
+        return words
+
+    def __len__(self):
+        return self.pageCount << self.pageBits
+
+    def store(self, value: int, address: int):
+        '''
+        Stores a passed integer value at a target address within the memory, copying the page first if it is shared
+
+        Args:
+            value (int): integer value being stored within the target address
+            address (int): target memory address to store within
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096) or if passed value exceeds maximum storage size (0xFFFF)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        if value > 0xFFFF:
+            raise MemoryError(f'storage bound error (max 0xFFFF)')
+        index = address >> self.pageBits
+        if not self._owned[index]:
+            self.pages[index] = list(self.pages[index])
+            self._owned[index] = True
+        self.pages[index][address & self.pageMask] = value
+
+        # Update head value as needed
+        if self._head < address:
+            self._head = address
+
+    def load(self, address: int) -> int:
+        '''
+        Returns value stored in memory at a specified address
+
+        Args:
+            address (int): target memory address to read
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        return self.pages[address >> self.pageBits][address & self.pageMask]
+
+    def __setWords(self, words: list):
+        '''
+        Replaces the words from address 0 onwards, pages past the passed words are kept.
+        '''
+        size = self.pageSize
+        for index in range(0, min(len(words), len(self)), size):
+            page = self.pages[index >> self.pageBits]
+            chunk = words[index:index + size]
+            self.pages[index >> self.pageBits] = chunk + list(page[len(chunk):])
+            self._owned[index >> self.pageBits] = True
+
+    def _copyImage(self, image: MemoryImage):
+        words = image.words().tolist()
+        for address in image.signed:
+            words[address] -= 0x10000
+        self.__setWords(words)
+
+    def loadFromFile(self, fileName: str, fileDir: str = './'):
+        '''
+        Loads data into the memory from a '.mre' file.
+
+        Args:
+            fileName (str): name of memory file, do not include '.mre' extension
+            fileDire (str): file location directory, default same directory ('./')
+        '''
+        with open(f'{fileDir}{fileName}.mre','r') as file:
+            words = [int(line.strip(), 16) for line in file]
+        self.__setWords(words)
+        self._head = len(words)
+
+    def snapshot(self) -> tuple:
+        '''
+        Returns a copy-on-write snapshot of the memory contents which can be passed to restore(). Pages are shared with
+        the snapshot until written.
+        '''
+        self._owned = [False] * self.pageCount
+        return (tuple(self.pages), self._head)
+
+    def restore(self, snapshot: tuple):
+        '''
+        Restores the memory contents saved by snapshot(), sharing the snapshot's pages until written.
+
+        Args:
+            snapshot: snapshot returned by this memory's snapshot()
+        '''
+        pages, self._head = snapshot
+        self.pages = list(pages)
+        self._owned = [False] * self.pageCount
+
+    def fork(self) -> 'PagedMemory':
+        '''
+        Returns an independent memory sharing every page with this memory until either side writes it.
+        '''
+        mem = PagedMemory.__new__(PagedMemory)
+        mem.pages = self.pages[:]
+        mem._owned = [False] * self.pageCount
+        self._owned = [False] * self.pageCount
+        mem._head = self._head
+        return mem
+
+    def __copy__(self):
+        return self.fork()
+
+    @property
+    def pagesOwned(self) -> int:
+        '''Number of pages copied since the last snapshot or fork'''
+        return sum(self._owned)
+
+class SparseMemory(MemoryABC):
+    '''
+    Sparse simulated memory with a configurable address width, for extended address MARIE variants. The address space
+    is split into pages allocated on first write, unallocated pages read as 0. Every write sets the dirty bit of its
+    page until clean() is called. Dumps and saved files only hold allocated pages.
+
+    Instruction operands stay 12 bits wide, addresses past 0xFFF are reached through words loaded by JUMPI, ADDI or
+    the PC. Stored values are bounded as in Memory (max 0xFFFF).
+    '''
+    def __init__(self, addressBits: int = 12, pageBits: int = 8):
+        '''
+        Args:
+            addressBits (int): address width in bits, default 12 (4096 words)
+            pageBits (int): page width in bits, default 8 (256 words)
+
+        Raises:
+            MemoryError: if the page width is not between 1 and the address width
+        '''
+        if not 0 < pageBits <= addressBits:
+            raise MemoryError(f'page width out of range ({pageBits} bits for {addressBits} bit addresses)')
+        self.addressBits = addressBits
+        self.pageBits = pageBits
+        self.pageSize = 1 << pageBits
+        self.pageMask = self.pageSize - 1
+        self.pages = {} #page index to words, allocated on first write
+        self.dirty = set() #indices of pages written since the last clean()
+        self._head = 0 #program head marker
+        self.__size = 1 << addressBits
+        self.__digits = (addressBits + 3) // 4
+
+    def __str__(self):
+        width = 9
+        string: str = ''.ljust(width - 1) + '|'
+
+        #Create top row with column labels
+        for i in range(0, 16):
+            string += f'0x{i:X}'.ljust(width)
+
+        #Generate memory matrix of allocated pages only
+        for base, words in self.populated():
+            for row in range(0, len(words), 16):
+                string += '\n' + f'0x{base + row:0{self.__digits}X}'.ljust(width - 1) + '|'
+                string += ''.join(f'0x{word:04X}'.ljust(width) for word in words[row:row + 16])
+        return string
+
+    def __len__(self):
+        return self.__size
+
+    def __checkAddressBounds(self, address: int) -> int:
+        '''
+        Utility method used to verify address bounds. Negative addresses wrap from the top of memory as in Memory.
+
+        Returns:
+            address (int): address within memory range
+
+        Raises:
+            MemoryError: if passed address is outside memory range
+        '''
+        if not -self.__size <= address < self.__size:
+            raise MemoryError(f'address out of bounds error (0x{address:0{self.__digits}X})')
+        return address & (self.__size - 1)
+
+    def store(self, value: int, address: int):
+        '''
+        Stores a passed integer value at a target address within the memory, allocating its page on first write
+
+        Args:
+            value (int): integer value being stored within the target address
+            address (int): target memory address to store within
+
+        Raises:
+            MemoryError: if passed address is outside memory range or if passed value exceeds maximum storage size (0xFFFF)
+        '''
+        address = self.__checkAddressBounds(address)
+        if value > 0xFFFF:
+            raise MemoryError(f'storage bound error (max 0xFFFF)')
+        index = address >> self.pageBits
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = [0x0] * self.pageSize
+        page[address & self.pageMask] = value
+        self.dirty.add(index)
+
+        # Update head value as needed
+        if self._head < address:
+            self._head = address
+
+    def load(self, address: int) -> int:
+        '''
+        Returns value stored in memory at a specified address, 0 if its page is not allocated
+
+        Args:
+            address (int): target memory address to read
+
+        Raises:
+            MemoryError: if passed address is outside memory range
+        '''
+        address = self.__checkAddressBounds(address)
+        page = self.pages.get(address >> self.pageBits)
+        return 0x0 if page is None else page[address & self.pageMask]
+
+    def populated(self) -> list:
+        '''
+        Returns the allocated pages in address order.
+
+        Returns:
+            pages (list): (base address, words) tuple for each allocated page
+        '''
+        return [(index << self.pageBits, self.pages[index]) for index in sorted(self.pages)]
+
+    def clean(self):
+        '''
+        Clears every page dirty bit.
+        '''
+        self.dirty.clear()
+
+    def dirtyPages(self) -> list:
+        '''
+        Returns the base addresses of the pages written since the last clean(), in address order.
+        '''
+        return [index << self.pageBits for index in sorted(self.dirty)]
+
+    def saveToFile(self, fileName: str, fileDir: str = './', dirtyOnly: bool = False):
+        '''
+        Saves allocated pages as a '.mre' file. Each page is written as an '@' line holding its base address followed by
+        its words up to the last non-zero word, files without '@' lines load from address 0 as dense '.mre' files do.
+
+        Args:
+            fileName (str): name of memory file, do not include '.mre' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            dirtyOnly (bool): only save pages written since the last clean()
+        '''
+        lines = []
+        for base, words in self.populated():
+            if dirtyOnly and base >> self.pageBits not in self.dirty:
+                continue
+            end = len(words)
+            while end and not words[end - 1]:
+                end -= 1
+            lines.append(f'@{base:0{self.__digits}X}')
+            lines += (f'{word:04X}' for word in words[:end])
+
+        #Save to target directory
+        with open(f'{fileDir}{fileName}.mre', 'w') as file:
+            file.write('\n'.join(lines))
+
+    def loadFromFile(self, fileName: str, fileDir: str = './'):
+        '''
+        Loads data into the memory from a sparse or dense '.mre' file. Only pages holding non-zero words are allocated.
+
+        Args:
+            fileName (str): name of memory file, do not include '.mre' extension
+            fileDir (str): file location directory, default same directory ('./')
+
+        Raises:
+            MemoryError: if a word is outside memory range
+        '''
+        address = 0
+        with open(f'{fileDir}{fileName}.mre', 'r') as file:
+            for line in file:
+                read = line.strip()
+                if not read:
+                    continue
+                if read.startswith('@'):
+                    address = int(read[1:], 16)
+                    continue
+                value = int(read, 16)
+                if value or address >> self.pageBits in self.pages:
+                    self.store(value, address)
+                elif address >= self.__size:
+                    raise MemoryError(f'address out of bounds error (0x{address:0{self.__digits}X})')
+                address += 1
+
+    def saveToImage(self, fileName: str, fileDir: str = './', symbols: dict = None):
+        '''
+        Saves the words up to the head marker as a binary '.mri' image. Images are dense, use saveToFile() for a sparse
+        copy of wide address spaces.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            symbols (dict): optional label to address mapping saved with the image, as in Assembler.address_book
+        '''
+        writeImage(f'{fileDir}{fileName}.mri', [self.load(address) for address in range(self._head + 1)], symbols)
+
+    def loadFromImage(self, fileName: str, fileDir: str = './') -> dict:
+        '''
+        Loads data into the memory from a binary '.mri' image. Only pages holding non-zero words are allocated.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): file location directory, default same directory ('./')
+
+        Returns:
+            symbols (dict): label to address mapping saved with the image, empty if the image has no symbols
+
+        Raises:
+            MemoryError: if the image holds more words than the memory
+            MemoryImageError: if the file is not a valid image
+        '''
+        with MemoryImage(f'{fileDir}{fileName}.mri') as image:
+            if image.count > self.__size:
+                raise MemoryError(f'image exceeds memory size ({image.count} words)')
+            words = image.words().tolist()
+            for address in image.signed:
+                words[address] -= 0x10000
+            for address, value in enumerate(words):
+                if value or address >> self.pageBits in self.pages:
+                    self.store(value, address)
+            self._head = max(image.count - 1, 0)
+            return image.symbols
+
+    def snapshot(self) -> tuple:
+        '''
+        Returns a snapshot of the memory contents which can be passed to restore(). Only allocated pages are copied.
+        '''
+        return ({index: page[:] for index, page in self.pages.items()}, set(self.dirty), self._head)
+
+    def restore(self, snapshot: tuple):
+        '''
+        Restores the memory contents saved by snapshot().
+
+        Args:
+            snapshot: snapshot returned by this memory's snapshot()
+        '''
+        pages, dirty, self._head = snapshot
+        self.pages = {index: page[:] for index, page in pages.items()}
+        self.dirty = set(dirty)
+
+    def fork(self) -> 'SparseMemory':
+        '''
+        Returns an independent memory holding the same contents.
+        '''
+        mem = SparseMemory(self.addressBits, self.pageBits)
+        mem.restore(self.snapshot())
+        return mem
+
+    def __copy__(self):
+        return self.fork()
+
 class MemoryError(Exception):
     def __init__(self, message = 'memory access error'):
         super().__init__(f'Memory Error: {message}')
\ No newline at end of file
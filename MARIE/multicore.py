@@ -0,0 +1,521 @@
+# Shared-memory multi-core mode for the MARIE simple computer. Runs several
+# Marie cores, each with its own registers, in separate processes over one
+# address space held in a multiprocessing shared memory block, either taking
+# turns in fixed quanta (deterministic) or all at once (free-running).
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 8/29/2025
+from array import array
+from multiprocessing import shared_memory
+from queue import Empty
+import multiprocessing
+import time
+from .marie import (Marie, RunResult, MarieExecutionError, MarieInputError, MarieStepLimitError, MarieTimeoutError,
+                    MarieOutputError)
+from .image import MemoryImage, writeImage
+from .memory import ArrayMemory, MemoryError
+
+#Error types rebuilt from core processes, other errors are reported as RuntimeError
+_errors = {cls.__name__: cls for cls in (MarieExecutionError, MarieInputError, MarieStepLimitError, MarieTimeoutError,
+                                         MarieOutputError, MemoryError)}
+
+#Largest number of cores, owner tags are single bytes
+maxCores = 255
+
+#Seconds between checks for core processes that exited without a result
+pollInterval = 0.05
+
+class SharedMemory(ArrayMemory):
+    '''
+    Simulated memory with 4096 16-bit words held in a multiprocessing shared memory block, so every process attached to
+    it sees the same words. Storage rules match ArrayMemory, except that negative values are limited to -0x10000: the
+    block keeps the low 16 bits of each word and a sign flag per word. Instances pickle by block name, passing one to
+    another process attaches it to the same block.
+
+    Next to the words the block holds an owner tag per word, the core that last wrote it. A memory attached as a core
+    (core > 0) counts its reads and writes and the accesses to words last written by another core. Snapshots, copies and
+    forks are private ArrayMemory contents.
+
+    Attributes:
+        name (str): shared memory block name
+        core (int): core number counting accesses (1 based), 0 when not counting
+        reads (int): words read by the core, including instruction fetches
+        writes (int): words written by the core
+        sharedReads (int): reads of words last written by another core
+        sharedWrites (int): writes to words last written by another core
+    '''
+    def __init__(self, name: str = None, create: bool = True):
+        '''
+        Args:
+            name (str): shared memory block name, default a generated name
+            create (bool): create a new zeroed block, False attaches to an existing block
+        '''
+        self._block = shared_memory.SharedMemory(name, create, 4 * 4096 if create else 0)
+        self._created = create
+        self._head = 0 #program head marker
+        self.__attach()
+
+    def __attach(self):
+        buffer = self._block.buf
+        self.memory = buffer[:2 * 4096].cast('H')
+        self.owners = buffer[2 * 4096:3 * 4096]
+        self.signs = buffer[3 * 4096:4 * 4096]
+        self.core = 0
+        self.reads = 0
+        self.writes = 0
+        self.sharedReads = 0
+        self.sharedWrites = 0
+
+    @property
+    def name(self) -> str:
+        return self._block.name
+
+    def __getstate__(self):
+        return {'name': self._block.name, 'head': self._head}
+
+    def __setstate__(self, state: dict):
+        self._block = shared_memory.SharedMemory(state['name'])
+        self._created = False
+        self._head = state['head']
+        self.__attach()
+
+    def store(self, value: int, address: int):
+        '''
+        Stores a passed integer value at a target address within the memory
+
+        Args:
+            value (int): integer value being stored within the target address
+            address (int): target memory address to store within
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096) or if passed value is outside storage range (-0x10000 to 0xFFFF)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        if not -0x10000 <= value <= 0xFFFF:
+            raise MemoryError(f'storage bound error (min -0x10000, max 0xFFFF)')
+        self.memory[address] = value & 0xFFFF
+        self.signs[address] = value < 0
+        core = self.core
+        if core:
+            self.writes += 1
+            owner = self.owners[address]
+            if owner and owner != core:
+                self.sharedWrites += 1
+            self.owners[address] = core
+
+        # Update head value as needed
+        if self._head < address:
+            self._head = address
+
+    def load(self, address: int) -> int:
+        '''
+        Returns value stored in memory at a specified address
+
+        Args:
+            address (int): target memory address to read
+
+        Raises:
+            MemoryError: if passed address is outside memory range (4096)
+        '''
+        if address >= 4096:
+            raise MemoryError(f'address out of bounds error (0x{address:04X})')
+        core = self.core
+        if core:
+            self.reads += 1
+            owner = self.owners[address]
+            if owner and owner != core:
+                self.sharedReads += 1
+        if self.signs[address]:
+            return self.memory[address] - 0x10000
+        return self.memory[address]
+
+    def flatWords(self) -> list:
+        '''
+        Returns a copy of every word, in address order. Writes to the copy do not reach the memory, write through
+        store().
+        '''
+        return [word - 0x10000 if sign else word for word, sign in zip(self.memory, self.signs)]
+
+    def loadRange(self, address: int, count: int) -> array:
+        '''
+        Returns a copy of a range of 16-bit words, negative words as their two's complement bit pattern (see load()).
+
+        Args:
+            address (int): first address to read
+            count (int): number of words to read
+
+        Raises:
+            MemoryError: if part of the range is outside memory range (4096)
+        '''
+        if address < 0 or address + count > 4096:
+            raise MemoryError(f'address out of bounds error (0x{address + count - 1:04X})')
+        return array('H', self.memory[address:address + count])
+
+    def storeRange(self, values, address: int = 0):
+        '''
+        Stores a sequence of words starting at a target address.
+
+        Args:
+            values: sequence of integer values, or an array('H') of unsigned words which is copied without conversion
+            address (int): first address to store within, default 0
+
+        Raises:
+            MemoryError: if part of the range is outside memory range (4096) or if a value is outside storage range (-0x10000 to 0xFFFF)
+        '''
+        if not isinstance(values, array) or values.typecode != 'H':
+            values = list(values)
+            if any(not -0x10000 <= v <= 0xFFFF for v in values):
+                raise MemoryError(f'storage bound error (min -0x10000, max 0xFFFF)')
+            signs = bytes(v < 0 for v in values)
+            values = array('H', [v & 0xFFFF for v in values])
+        else:
+            signs = bytes(len(values))
+        if address < 0 or address + len(values) > 4096:
+            raise MemoryError(f'address out of bounds error (0x{address + len(values) - 1:04X})')
+        self.memory[address:address + len(values)] = values
+        self.signs[address:address + len(values)] = signs
+
+        # Update head value as needed
+        if values and self._head < address + len(values) - 1:
+            self._head = address + len(values) - 1
+
+    def clearOwners(self):
+        '''
+        Clears every owner tag, words then count as not written by any core.
+        '''
+        self.owners[:] = bytes(4096)
+
+    def clear(self):
+        '''
+        Zeroes every word and owner tag in place and resets the head marker.
+        '''
+        self._block.buf[:] = bytes(4 * 4096)
+        self._head = 0
+
+    def snapshot(self) -> tuple:
+        return (array('H', self.memory), bytes(self.signs), self._head)
+
+    def restore(self, snapshot: tuple):
+        words, signs, self._head = snapshot
+        self.memory[:] = words
+        self.signs[:] = signs
+
+    def copy(self) -> ArrayMemory:
+        '''
+        Returns an independent private copy of the memory.
+        '''
+        mem = ArrayMemory()
+        mem.storeRange(self.flatWords())
+        mem._head = self._head
+        return mem
+
+    def fork(self) -> ArrayMemory:
+        return self.copy()
+
+    def saveToImage(self, fileName: str, fileDir: str = './', symbols: dict = None):
+        '''
+        Saves data stored within the memory as a binary '.mri' image.
+
+        Args:
+            fileName (str): name of image file, do not include '.mri' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            symbols (dict): optional label to address mapping saved with the image, as in Assembler.address_book
+        '''
+        writeImage(f'{fileDir}{fileName}.mri', self.flatWords()[:self._head + 1], symbols)
+
+    def _copyImage(self, image: MemoryImage):
+        self.memory[:image.count] = image.words()
+        self.signs[:image.count] = bytes(image.count)
+        for address in image.signed:
+            self.signs[address] = 1
+
+    def close(self):
+        '''
+        Detaches from the shared memory block and removes the block if this memory created it. Views returned by view()
+        must be released first.
+        '''
+        if self._block is None:
+            return
+        self.memory.release()
+        self.owners.release()
+        self.signs.release()
+        self._block.close()
+        if self._created:
+            self._block.unlink()
+        self._block = None
+
+    def __del__(self):
+        # Release the views so the block itself can be closed when collected
+        try:
+            self.memory.release()
+            self.owners.release()
+            self.signs.release()
+        except (AttributeError, BufferError):
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CoreStats():
+    '''
+    Execution and contention counters of one core of a MultiCore run.
+
+    Attributes:
+        core (int): core index
+        steps (int): number of instructions executed
+        reads (int): words read, including instruction fetches
+        writes (int): words written
+        sharedReads (int): reads of words last written by another core
+        sharedWrites (int): writes to words last written by another core
+        turns (int): quanta executed, 1 for a free-running core
+        waitTime (float): seconds spent waiting for the core's turn
+    '''
+    def __init__(self, core: int, steps: int, reads: int, writes: int, sharedReads: int, sharedWrites: int,
+                 turns: int, waitTime: float):
+        self.core = core
+        self.steps = steps
+        self.reads = reads
+        self.writes = writes
+        self.sharedReads = sharedReads
+        self.sharedWrites = sharedWrites
+        self.turns = turns
+        self.waitTime = waitTime
+
+    @property
+    def contention(self) -> float:
+        '''Fraction of memory accesses touching words last written by another core'''
+        accesses = self.reads + self.writes
+        return (self.sharedReads + self.sharedWrites) / accesses if accesses else 0.0
+
+    def __repr__(self):
+        return (f'CoreStats(core={self.core}, steps={self.steps}, sharedReads={self.sharedReads}, '
+                f'sharedWrites={self.sharedWrites}, turns={self.turns})')
+
+class MultiCoreResult():
+    '''
+    Result of a MultiCore run.
+
+    Attributes:
+        results (list): RunResult of each core, in core order
+        stats (list): CoreStats of each core, in core order
+        elapsed (float): wall-clock run time in seconds, from starting the first core to the last one stopping
+    '''
+    def __init__(self, results: list, stats: list, elapsed: float):
+        self.results = results
+        self.stats = stats
+        self.elapsed = elapsed
+
+    @property
+    def steps(self) -> int:
+        '''Total number of instructions executed by every core'''
+        return sum(stats.steps for stats in self.stats)
+
+    @property
+    def ok(self) -> bool:
+        '''True if every core halted without error'''
+        return all(result.ok for result in self.results)
+
+    @property
+    def throughput(self) -> float:
+        '''Instructions executed per second over every core'''
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return f'MultiCoreResult(cores={len(self.results)}, steps={self.steps}, ok={self.ok}, elapsed={self.elapsed:.3f})'
+
+def _packError(error: Exception):
+    if error is None:
+        return None
+    attributes = {name: value for name, value in vars(error).items() if isinstance(value, (int, bool, type(None)))}
+    return (type(error).__name__, str(error), attributes)
+
+def _unpackError(packed) -> Exception:
+    if packed is None:
+        return None
+    name, message, attributes = packed
+    if name not in _errors:
+        return RuntimeError(f'{name}: {message}')
+    error = _errors[name].__new__(_errors[name])
+    Exception.__init__(error, message)
+    error.__dict__.update(attributes)
+    return error
+
+def _passTurn(core: int, turns: list, done, holder):
+    '''
+    Releases the turn semaphore of the next core still running after a passed core, the core itself included, and
+    records it as the turn holder.
+    '''
+    cores = len(turns)
+    for offset in range(1, cores + 1):
+        if not done[(core + offset) % cores]:
+            holder.value = (core + offset) % cores
+            turns[(core + offset) % cores].release()
+            return
+
+def _runCore(memory: SharedMemory, core: int, start: int, inputs: list, maxSteps: int, quantum: int, engine,
+             deterministic: bool, deadline: float, turns: list, done, holder, queue):
+    '''
+    Core process entry point. Runs one core to a stop, in quanta passed between cores through the turn semaphores when
+    deterministic, and puts its result on the queue.
+    '''
+    m = Marie(memory)
+    m.run(maxSteps = 0)
+    m.PC, m.AC = start, core
+    memory.core = core + 1
+    source = iter(inputs).__next__
+    result = None
+    steps, count, waited = 0, 0, 0.0
+    try:
+        while True:
+            if deterministic:
+                waiting = time.perf_counter()
+                turns[core].acquire()
+                waited += time.perf_counter() - waiting
+            limit = maxSteps
+            if deterministic:
+                limit = steps + quantum if maxSteps is None else min(steps + quantum, maxSteps)
+            timeout = None if deadline is None else deadline - time.time()
+            if timeout is not None and timeout <= 0:
+                state = m.snapshot()
+                result = RunResult(state.outputs, state.registers, steps, False, MarieTimeoutError())
+            else:
+                result = m.run(source, limit, engine = engine, timeout = timeout, resume = True)
+            steps = result.steps
+            count += 1
+            finished = not (deterministic and isinstance(result.error, MarieStepLimitError) and limit != maxSteps)
+            if deterministic:
+                if finished:
+                    done[core] = 1
+                _passTurn(core, turns, done, holder)
+            if finished:
+                break
+    except Exception as e:
+        state = m.snapshot()
+        result = RunResult(state.outputs, state.registers, state.steps, False, e)
+        if deterministic and not done[core]:
+            done[core] = 1
+            _passTurn(core, turns, done, holder)
+    stats = (core, result.steps, memory.reads, memory.writes, memory.sharedReads, memory.sharedWrites, count, waited)
+    queue.put((core, result.outputs, result.registers, result.steps, result.halted, _packError(result.error), stats))
+
+class MultiCore():
+    '''
+    Runs K Marie cores in separate processes over one SharedMemory address space. Each core has its own registers,
+    input values and outputs, starts at its start address with its core index in the AC, so one program can split work
+    between cores, and runs until it halts, fails or reaches the step limit.
+
+    Deterministic runs pass a single turn around the running cores in core order, each turn executing quantum
+    instructions, so the interleaving and every result repeat exactly across runs. Free-running runs execute every core
+    at once for real multi-core throughput, the interleaving of memory accesses is then up to the operating system and
+    the contention counters are approximate.
+
+    A core process exiting without a result (killed, crashed, or unable to send its result) is reported as an errored
+    RunResult with no outputs and zero counters, in deterministic runs its turn passes on to the remaining cores.
+
+    Cores run on the default fetch/decode loop unless an engine is passed. Engines caching decoded instructions (see
+    MARIE.engine) do not see code written by other cores and should only run programs that modify no shared code.
+
+    Attributes:
+        cores (int): number of cores
+        memory (SharedMemory): shared address space
+        quantum (int): instructions per turn in deterministic runs
+        engine: Engine subclass run by every core, None for the default fetch/decode loop
+    '''
+    def __init__(self, cores: int, memory: SharedMemory = None, quantum: int = 1000, engine = None):
+        '''
+        Args:
+            cores (int): number of cores, at most maxCores
+            memory (SharedMemory): shared address space holding the loaded program, default a new empty memory
+            quantum (int): instructions per turn in deterministic runs
+            engine: optional Engine subclass run by every core
+        '''
+        if not 1 <= cores <= maxCores:
+            raise ValueError(f'core count must be between 1 and {maxCores}')
+        self.cores = cores
+        self.memory = SharedMemory() if memory is None else memory
+        self.quantum = max(quantum, 1)
+        self.engine = engine
+
+    def run(self, inputs: list = None, starts: list = None, maxSteps: int = None, deterministic: bool = True,
+            timeout: float = None) -> MultiCoreResult:
+        '''
+        Runs every core over the shared memory and waits for all of them to stop. Owner tags are cleared first, the
+        memory is left as the cores leave it.
+
+        Args:
+            inputs (list): list of input values for each core, default no inputs
+            starts (list): start address of each core, default 0
+            maxSteps (int): maximum number of instructions executed by each core, default unlimited
+            deterministic (bool): take turns in fixed quanta (True) or run free (False)
+            timeout (float): wall-clock limit in seconds for each core, default unlimited
+
+        Returns:
+            result (MultiCoreResult): results and counters of every core
+        '''
+        cores = self.cores
+        inputs = [list(values) for values in inputs] if inputs is not None else [[] for _ in range(cores)]
+        starts = list(starts) if starts is not None else [0] * cores
+        if len(inputs) != cores or len(starts) != cores:
+            raise ValueError(f'expected inputs and starts for {cores} cores')
+        self.memory.clearOwners()
+        context = multiprocessing.get_context()
+        queue = context.Queue()
+        turns = [context.Semaphore(0) for _ in range(cores)]
+        done = context.RawArray('b', cores)
+        holder = context.RawValue('i', 0)
+        deadline = None if timeout is None else time.time() + timeout
+        processes = [context.Process(target = _runCore, daemon = True,
+                                     args = (self.memory, core, starts[core], inputs[core], maxSteps, self.quantum,
+                                             self.engine, deterministic, deadline, turns, done, holder, queue))
+                     for core in range(cores)]
+
+        began = time.perf_counter()
+        for process in processes:
+            process.start()
+        if deterministic:
+            turns[0].release()
+        messages = {}
+        while len(messages) < cores:
+            try:
+                message = queue.get(timeout = pollInterval)
+                messages[message[0]] = message
+            except Empty:
+                self.__collectDead(processes, messages, queue, turns, done, holder, deterministic)
+        elapsed = time.perf_counter() - began
+        for process in processes:
+            process.join()
+
+        results, stats = [], []
+        for core in range(cores):
+            _, outputs, registers, steps, halted, error, counters = messages[core]
+            results.append(RunResult(outputs, registers, steps, halted, _unpackError(error)))
+            stats.append(CoreStats(*counters))
+        return MultiCoreResult(results, stats, elapsed)
+
+    def __collectDead(self, processes: list, messages: dict, queue, turns: list, done, holder, deterministic: bool):
+        '''
+        Records an errored result for each core process that exited without putting its result on the queue, and in
+        deterministic runs passes on a turn held by a dead core.
+        '''
+        dead = [core for core, process in enumerate(processes) if core not in messages and process.exitcode is not None]
+        if dead:
+            #Results put just before exiting may still be unread
+            try:
+                while True:
+                    message = queue.get_nowait()
+                    messages[message[0]] = message
+            except Empty:
+                pass
+        for core in dead:
+            if core not in messages:
+                error = MarieExecutionError(f'core {core} process exited with code {processes[core].exitcode} without a result')
+                messages[core] = (core, [], {}, 0, False, _packError(error), (core, 0, 0, 0, 0, 0, 0, 0.0))
+                done[core] = 1
+        #A core passing its turn before seeing the dead core as done hands the turn to it, checked on every poll
+        if deterministic and done[holder.value] and processes[holder.value].exitcode is not None:
+            _passTurn(holder.value, turns, done, holder)
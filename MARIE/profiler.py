@@ -0,0 +1,231 @@
+# Execution profiler for MARIE programs. Collects per-address execution counts,
+# an opcode mix, memory read and write heat maps and loop back-edge counts in
+# preallocated counters while running on the pre-decoded engine.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 6/20/2025
+import json
+from .abstraction import instruction_set
+from .engine import PredecodedEngine, _Halt, denseTable
+from .marie import MarieExecutionError
+
+#Instruction names keyed by opcode
+opcodeNames = {opcode: name for name, opcode in instruction_set.items()}
+
+class Profile():
+    '''
+    Execution profile accumulated over one or more runs. Pass the profile's engine method to Marie.run() to profile a
+    run, runs without it execute unchanged:
+
+        profile = Profile()
+        machine.run(inputs, engine = profile.engine)
+
+    Attributes:
+        hits (list): executed instruction count per address
+        reads (list): data read count per address, instruction fetches are not counted
+        writes (list): write count per address
+        opcodes (list): executed instruction count per opcode (0x0 - 0xF)
+        backEdges (dict): (source, target) address pair to taken count for each backward JUMP
+        runs (int): number of profiled runs
+        steps (int): number of profiled instructions
+    '''
+    def __init__(self, size: int = 4096):
+        '''
+        Args:
+            size (int): number of addresses counted, default 4096
+        '''
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        '''
+        Zeroes every counter.
+        '''
+        self.hits = [0] * self.size
+        self.reads = [0] * self.size
+        self.writes = [0] * self.size
+        self.opcodes = [0] * 16
+        self.backEdges = {}
+        self.runs = 0
+        self.steps = 0
+
+    def engine(self, machine) -> 'ProfilingEngine':
+        '''
+        Engine factory passed to Marie.run(), returns a ProfilingEngine recording into this profile.
+        '''
+        return ProfilingEngine(machine, self)
+
+    def opcodeMix(self) -> dict:
+        '''
+        Executed instruction counts keyed by instruction name, invalid opcodes are omitted.
+        '''
+        return {name: self.opcodes[opcode] for opcode, name in opcodeNames.items()}
+
+    def hotLoops(self, count: int = 10) -> list:
+        '''
+        Loops found from backward jumps, hottest first.
+
+        Args:
+            count (int): maximum number of loops returned, None for every loop
+
+        Returns:
+            loops (list): (start, end, iterations, instructions) tuples, where start is the jump target, end the address of
+            the backward JUMP, iterations the number of times it was taken and instructions the executed instruction count
+            within the range
+        '''
+        loops = [(target, source, taken, sum(self.hits[target:source + 1]))
+                 for (source, target), taken in self.backEdges.items()]
+        loops.sort(key = lambda loop: (-loop[3], loop[0]))
+        return loops if count is None else loops[:count]
+
+    def report(self, address_book: dict = None, line_book: dict = None) -> list:
+        '''
+        Per-address profile of every address executed, read or written, mapped back to the program source.
+
+        Args:
+            address_book (dict): label to address mapping, as in Assembler.address_book
+            line_book (dict): address to source line number mapping, as in Assembler.line_book
+
+        Returns:
+            rows (list): dictionary per address with the keys 'address', 'label' (nearest preceding label and offset, such
+            as 'LOOP+2', None if no label precedes the address), 'line' (None if unknown), 'hits', 'reads' and 'writes'
+        '''
+        labels = sorted((address, label) for label, address in (address_book or {}).items())
+        line_book = line_book or {}
+        rows = []
+        nearest = None
+        i = 0
+        for address in range(self.size):
+            while i < len(labels) and labels[i][0] <= address:
+                nearest = labels[i]
+                i += 1
+            hits, reads, writes = self.hits[address], self.reads[address], self.writes[address]
+            if not (hits or reads or writes):
+                continue
+            if nearest is None:
+                label = None
+            elif nearest[0] == address:
+                label = nearest[1]
+            else:
+                label = f'{nearest[1]}+{address - nearest[0]}'
+            rows.append({
+                'address': address,
+                'label': label,
+                'line': line_book.get(address),
+                'hits': hits,
+                'reads': reads,
+                'writes': writes
+            })
+        return rows
+
+    def saveToFile(self, fileName: str, fileDir: str = './', address_book: dict = None, line_book: dict = None):
+        '''
+        Saves the profile as a '.json' file holding the run totals, opcode mix, hot loops and per-address report.
+
+        Args:
+            fileName (str): name of the profile file, do not include '.json' extension
+            fileDir (str): target output file directory, default same directory ('./')
+            address_book (dict): label to address mapping used to label addresses
+            line_book (dict): address to source line number mapping
+        '''
+        data = {
+            'runs': self.runs,
+            'steps': self.steps,
+            'opcodes': self.opcodeMix(),
+            'loops': [dict(zip(('start', 'end', 'iterations', 'instructions'), loop)) for loop in self.hotLoops(None)],
+            'addresses': self.report(address_book, line_book)
+        }
+        with open(f'{fileDir}{fileName}.json', 'w') as file:
+            json.dump(data, file, indent = 1)
+
+class ProfilingEngine(PredecodedEngine):
+    '''
+    Pre-decoded engine counting every executed instruction, data read, write and backward jump into a Profile. Counters
+    are plain list increments, yet a profiled run takes about 1.5 to 2 times as long as PredecodedEngine, roughly the
+    speed of the default fetch/decode loop (slower on short straight-line programs). Profile to find hot code, not to
+    run faster. Counters are kept for every address, memories wider than denseTable words can not be profiled.
+    '''
+    def __init__(self, machine, profile: Profile):
+        '''
+        Args:
+            machine (Marie): machine whose loaded program is being executed
+            profile (Profile): profile receiving the counts
+
+        Raises:
+            MarieExecutionError: if the memory is wider than denseTable words
+        '''
+        if len(machine.memory) > denseTable:
+            raise MarieExecutionError(f'memory too wide to profile ({len(machine.memory)} words, max {denseTable})')
+        super().__init__(machine)
+        self.profile = profile
+        profile.runs += 1
+        if len(self.memory) > profile.size:
+            grow = len(self.memory) - profile.size
+            profile.hits += [0] * grow
+            profile.reads += [0] * grow
+            profile.writes += [0] * grow
+            profile.size = len(self.memory)
+        self.__load = self.load
+        self.__store = self.store
+
+    def __countedLoad(self, address: int) -> int:
+        value = self.__load(address)
+        self.profile.reads[address] += 1
+        return value
+
+    def __countedStore(self, value: int, address: int):
+        self.__store(value, address)
+        self.profile.writes[address] += 1
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        table = self.table
+        decode, load = self.decode, self.__load
+        hits, opcodes = self.profile.hits, self.profile.opcodes
+        self.load, self.store = self.__countedLoad, self.__countedStore
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        try:
+            while steps != limit:
+                entry = table[pc]
+                if entry is None:
+                    entry = table[pc] = decode(load(pc))
+                target = entry[0](entry[1], pc + 1)
+                hits[pc] += 1
+                opcodes[entry[2] >> 12 & 0xF] += 1
+                pc = target
+                steps += 1
+        except _Halt:
+            hits[pc] += 1
+            opcodes[0x7] += 1
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.__stop(steps)
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.__stop(steps)
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
+
+    def __stop(self, steps: int):
+        '''
+        Adds a run slice's steps and restores the uncounted memory accessors used to write back registers and replay
+        faults.
+        '''
+        self.steps += steps
+        self.profile.steps += steps
+        self.load, self.store = self.__load, self.__store
+
+    def _jump(self, operand: int, pc: int) -> int:
+        if operand < pc:
+            edge = (pc - 1, operand)
+            edges = self.profile.backEdges
+            edges[edge] = edges.get(edge, 0) + 1
+        return operand
@@ -0,0 +1,151 @@
+# Incremental terminal rendering for stepwise MARIE execution. Keeps the last
+# frame (register line and memory rows) and redraws only the lines that changed
+# using ANSI cursor positioning, instead of clearing and reprinting everything.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 7/25/2025
+from array import array
+import shutil
+import sys
+
+#Register names in display order
+registerNames = ('AC', 'MAR', 'MBR', 'PC', 'IR', 'InReg', 'OutReg')
+
+#ANSI control sequences
+_clear = '\x1b[2J\x1b[H'
+_save = '\x1b7'
+_restore = '\x1b8'
+_clearLine = '\x1b[K'
+_clearBelow = '\x1b[J'
+_reverse = '\x1b[7m'
+_normal = '\x1b[0m'
+
+class StepRenderer():
+    '''
+    Incremental renderer of a machine's registers and memory. A frame is a register line, a column header and a window
+    of memory rows following the PC, padded to a fixed height so the text printed below it never moves. Each render()
+    compares register values and memory row words with the previous frame and rewrites only the changed lines, values
+    changed since the previous frame are shown in reverse video.
+
+    Attributes:
+        stream: text stream receiving the ANSI output
+        height (int): number of memory rows in the window
+        highlight (bool): show changed values in reverse video
+        written (int): characters written by the last render()
+    '''
+    width = 12
+    cellWidth = 9
+
+    def __init__(self, stream = None, height: int = None, highlight: bool = True):
+        '''
+        Args:
+            stream: text stream, default sys.stdout
+            height (int): memory rows shown, default fits the terminal leaving room for step text
+            highlight (bool): show changed values in reverse video
+        '''
+        self.stream = sys.stdout if stream is None else stream
+        self.height = height if height is not None else max(shutil.get_terminal_size().lines - 16, 4)
+        self.highlight = highlight
+        self.written = 0
+        self.reset()
+
+    def reset(self):
+        '''
+        Forgets the previous frame, the next render() clears the terminal and draws a full frame.
+        '''
+        self.__lines = None
+        self.__registers = None
+        self.__rows = {}
+        self.__start = 0
+
+    @property
+    def frameHeight(self) -> int:
+        '''Number of terminal lines used by a frame'''
+        return self.height + 3
+
+    def frame(self, machine) -> list:
+        '''
+        Builds the frame of a machine and records it as the previous frame.
+
+        Args:
+            machine (Marie): rendered machine
+
+        Returns:
+            lines (list): frame lines, including ANSI highlighting
+        '''
+        memory = machine.memory
+        size = len(memory)
+        digits = max((size.bit_length() + 2) // 4, 3)
+        registers = machine.registers
+        previous = self.__registers or registers
+
+        #Register line
+        line = ''.ljust(self.width)
+        for name in registerNames:
+            line += self.__cell(f'{name}: {registers[name]:04X}', self.width, registers[name] != previous[name])
+        lines = [line, ''.ljust(self.cellWidth - 1) + '|' + ''.join(f'0x{i:X}'.ljust(self.cellWidth) for i in range(16))]
+
+        #Memory window, moved only when the PC leaves it
+        last = min(getattr(memory, '_head', size - 1), size - 1) >> 4
+        pcRow = (machine.PC >> 4) if 0 <= machine.PC < size else self.__start
+        if not self.__start <= pcRow < self.__start + self.height:
+            self.__start = pcRow - self.height // 2
+        self.__start = max(min(self.__start, last + 1 - self.height), 0)
+        words = getattr(memory, 'memory', None)
+        if not isinstance(words, (list, array)):
+            words = None
+        rows = {}
+        for row in range(self.__start, self.__start + self.height):
+            if row > last:
+                lines.append('')
+                continue
+            base = row << 4
+            if words is not None:
+                values = tuple(words[base:base + 16])
+            else:
+                values = tuple(memory.load(address) for address in range(base, min(base + 16, size)))
+            old = self.__rows.get(row, values)
+            line = f'0x{base:0{digits}X}'.ljust(self.cellWidth - 1) + '|'
+            for value, before in zip(values, old):
+                line += self.__cell(f'0x{value:04X}', self.cellWidth, value != before)
+            lines.append(line)
+            rows[row] = values
+        self.__registers = registers
+        self.__rows.update(rows)
+        return lines
+
+    def __cell(self, text: str, width: int, changed: bool) -> str:
+        if changed and self.highlight:
+            return f'{_reverse}{text}{_normal}' + ' ' * (width - len(text))
+        return text.ljust(width)
+
+    def render(self, machine):
+        '''
+        Draws the frame of a machine, rewriting only the lines that differ from the previous frame. The cursor is left
+        where it was, below the frame after the first render().
+
+        Args:
+            machine (Marie): rendered machine
+        '''
+        first = self.__lines is None
+        lines = self.frame(machine)
+        if first:
+            out = _clear + '\n'.join(lines) + '\n\n'
+        else:
+            out = _save
+            for index, (line, old) in enumerate(zip(lines, self.__lines)):
+                if line != old:
+                    out += f'\x1b[{index + 1};1H{line}{_clearLine}'
+            out += _restore
+        self.__lines = lines
+        self.written = len(out)
+        self.stream.write(out)
+        self.stream.flush()
+
+    def clearText(self):
+        '''
+        Clears the text printed below the frame and moves the cursor to its first line.
+        '''
+        self.stream.write(f'\x1b[{self.frameHeight + 2};1H{_clearBelow}')
+        self.stream.flush()
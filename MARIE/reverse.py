@@ -0,0 +1,332 @@
+# Reverse execution for the MARIE simple computer. Records an undo delta for
+# every executed instruction into a fixed-size ring buffer and takes periodic
+# full-state checkpoints, so a run can be stepped backwards or moved to any
+# earlier step without re-running it from the start.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 8/8/2025
+from array import array
+from .engine import Engine, PredecodedEngine, _Halt
+from .marie import MarieStepLimitError
+
+class RecordingEngine(PredecodedEngine):
+    '''
+    Pre-decoded engine writing the undo delta of each instruction into a TraceRecorder's ring buffer before executing
+    it: PC, AC, IR, InReg, OutReg, input and output counts and the address and previous value of any word written by
+    STORE or JNS.
+    '''
+    def __init__(self, machine, recorder: 'TraceRecorder', step: int):
+        '''
+        Args:
+            machine (Marie): machine whose loaded program is being executed
+            recorder (TraceRecorder): recorder holding the ring buffer
+            step (int): step count of the machine when the run starts
+        '''
+        super().__init__(machine)
+        self.recorder = recorder
+        self.base = step
+        self.slot = 0
+        self.addresses = recorder._addresses
+        self.previous = recorder._previous
+
+    def run(self, maxSteps: int = None) -> bool:
+        m = self.machine
+        r = self.recorder
+        table = self.table
+        decode, load = self.decode, self.load
+        pcs, acs, words, inputs, outputs = r._pcs, r._acs, r._words, r._inputs, r._outputs
+        addresses, consumed, counts = self.addresses, r._consumed, r._counts
+        capacity = r.capacity
+        self.ac = m.AC
+        self.halted = False
+        limit = -1 if maxSteps is None else maxSteps
+        steps = 0
+        entry = None
+        pc = m.PC
+        word = m.IR
+        try:
+            while steps != limit:
+                slot = self.slot = (self.base + steps) % capacity
+                pcs[slot] = pc
+                acs[slot] = self.ac
+                words[slot] = word
+                inputs[slot] = m.InReg
+                outputs[slot] = m.OutReg
+                consumed[slot] = r.inputCount
+                counts[slot] = r.outputCount
+                addresses[slot] = -1
+                entry = table[pc]
+                if entry is None:
+                    entry = table[pc] = decode(load(pc))
+                pc = entry[0](entry[1], pc + 1)
+                word = entry[2]
+                steps += 1
+        except _Halt:
+            steps += 1
+            pc += 1
+            self.halted = True
+        except Exception as e:
+            self.steps += steps
+            self._fault(pc, self.ac, entry and entry[2], e)
+        self.steps += steps
+        m.AC, m.PC = self.ac, pc
+        self._writeBack(entry and entry[2])
+        return self.halted
+
+    def __written(self, address: int):
+        self.previous[self.slot] = self.load(address)
+        self.addresses[self.slot] = address
+
+    def _jns(self, operand: int, pc: int) -> int:
+        self.__written(operand)
+        return super()._jns(operand, pc)
+
+    def _store(self, operand: int, pc: int) -> int:
+        self.__written(operand)
+        return super()._store(operand, pc)
+
+class TraceRecorder():
+    '''
+    Records a headless run of a Marie machine for reverse execution. The last capacity instructions are kept as undo
+    deltas in array-backed ring buffers, and the registers and memory are checkpointed every interval steps. When more
+    than maxCheckpoints checkpoints are held the oldest is dropped, along with the undo deltas, input values and output
+    values only needed to reach steps before the oldest remaining one, so recording memory stays bounded by the buffer
+    size and checkpoint count.
+
+    stepBack() undoes deltas from the ring buffer or replays from the nearest earlier checkpoint, whichever is shorter,
+    and goto() moves to any recorded step the same way. Consumed input values are logged so replays read the same
+    inputs, and output values are logged so restoring a later checkpoint restores the outputs before it.
+
+    Attributes:
+        machine (Marie): recorded machine
+        capacity (int): number of undo deltas kept
+        interval (int): steps between checkpoints
+        maxCheckpoints (int): maximum number of checkpoints held
+        inputCount (int): number of input values consumed by the machine at the current step
+        outputCount (int): number of values output by the machine at the current step
+    '''
+    def __init__(self, machine, inputs = None, capacity: int = 16384, interval: int = 1024, maxCheckpoints: int = 64):
+        '''
+        Args:
+            machine (Marie): machine to record, its loaded program starts at address 0 on the first run
+            inputs: iterable of input values, or a callable returning the next input value (None when exhausted)
+            capacity (int): number of undo deltas kept in the ring buffer
+            interval (int): steps between checkpoints
+            maxCheckpoints (int): maximum number of checkpoints held, at least 2
+        '''
+        self.machine = machine
+        self.capacity = capacity
+        self.interval = interval
+        self.maxCheckpoints = max(maxCheckpoints, 2)
+        self.inputCount = 0
+        self.outputCount = 0
+        self._pcs = array('q', bytes(8 * capacity))
+        self._acs = array('q', bytes(8 * capacity))
+        self._words = array('q', bytes(8 * capacity))
+        self._inputs = array('q', bytes(8 * capacity))
+        self._outputs = array('q', bytes(8 * capacity))
+        self._consumed = array('q', bytes(8 * capacity))
+        self._counts = array('q', bytes(8 * capacity))
+        self._addresses = array('q', bytes(8 * capacity))
+        self._previous = array('q', bytes(8 * capacity))
+        if inputs is None:
+            inputs = ()
+        self.__source = inputs if callable(inputs) else iter(inputs).__next__
+        self.__inputLog = []
+        self.__inputBase = 0 #input count of the first value in the input log
+        self.__outputLog = []
+        self.__outputBase = 0 #output count of the first value in the output log
+        self.__checkpoints = {}
+        self.__start = 0 #first step with an undo delta in the ring buffer
+        self.__end = 0 #step after the last undo delta in the ring buffer
+        self.__step = 0
+        self.__started = False
+        self.__failed = False #machine left by a failing instruction, its registers are not a step state
+        self.__halted = False
+        self.__registers = Engine(machine)
+
+    @property
+    def step(self) -> int:
+        '''Current step of the machine'''
+        return self.__step
+
+    @property
+    def history(self) -> tuple:
+        '''(first, last) steps reachable through undo deltas alone'''
+        return (self.__start, self.__end)
+
+    @property
+    def checkpoints(self) -> list:
+        '''Steps holding a checkpoint, in order'''
+        return sorted(self.__checkpoints)
+
+    def __nextInput(self):
+        if self.inputCount - self.__inputBase < len(self.__inputLog):
+            value = self.__inputLog[self.inputCount - self.__inputBase]
+        else:
+            try:
+                value = self.__source()
+            except StopIteration:
+                value = None
+            if value is None:
+                return None
+            self.__inputLog.append(value)
+        self.inputCount += 1
+        return value
+
+    def __output(self, value: int):
+        # Replayed outputs are already logged
+        if self.outputCount - self.__outputBase == len(self.__outputLog):
+            self.__outputLog.append(value)
+        self.outputCount += 1
+
+    def run(self, maxSteps: int = None):
+        '''
+        Runs the machine forward from the current step, recording every instruction.
+
+        Args:
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+
+        Returns:
+            result (RunResult): result of the run, see Marie.run()
+        '''
+        return self.__forward(None if maxSteps is None else self.__step + maxSteps)
+
+    def __forward(self, target: int = None):
+        '''
+        Runs forward until the target step, a halt or an error, stopping at every interval boundary for a checkpoint.
+        '''
+        m = self.machine
+        if not self.__started:
+            # Reset the registers, outputs and step count before the step 0 checkpoint
+            m.run(maxSteps = 0)
+            self.__started = True
+        while True:
+            step = self.__step
+            if step % self.interval == 0 and step not in self.__checkpoints:
+                self.__checkpoint()
+            limit = (step // self.interval + 1) * self.interval
+            if target is not None:
+                limit = min(limit, target)
+            engine = lambda machine: RecordingEngine(machine, self, step)
+            result = m.run(self.__nextInput, limit, self.__output, engine, resume = True)
+            self.__record(step, result.steps)
+            self.__halted = result.halted
+            if result.error is not None and not isinstance(result.error, MarieStepLimitError):
+                # The failing instruction's delta holds the state before it
+                self.__failed = True
+                self.__start = max(self.__start, result.steps + 1 - self.capacity)
+            if not isinstance(result.error, MarieStepLimitError) or result.steps == target:
+                return result
+
+    def __record(self, step: int, end: int):
+        '''
+        Marks the undo deltas of steps step to end as recorded.
+        '''
+        if not self.__start <= step <= self.__end:
+            self.__start = step
+        self.__end = end
+        self.__start = max(self.__start, end - self.capacity)
+        self.__step = end
+
+    def __checkpoint(self):
+        '''
+        Checkpoints the registers and memory at the current step, dropping the oldest checkpoint when there are too many.
+        '''
+        m = self.machine
+        self.__checkpoints[self.__step] = (m.registers, m.memory.snapshot(), self.inputCount, self.outputCount,
+                                           self.__halted)
+        if len(self.__checkpoints) > self.maxCheckpoints:
+            del self.__checkpoints[min(self.__checkpoints)]
+            oldest = min(self.__checkpoints)
+            _, _, inputCount, outputCount, _ = self.__checkpoints[oldest]
+            # Steps before the oldest checkpoint can no longer be reached, nor can the inputs and outputs before it
+            if self.__start < oldest:
+                self.__start = oldest
+            del self.__inputLog[:inputCount - self.__inputBase]
+            self.__inputBase = inputCount
+            del self.__outputLog[:outputCount - self.__outputBase]
+            self.__outputBase = outputCount
+
+    def stepBack(self, count: int = 1) -> int:
+        '''
+        Moves the machine back by count instructions, stopping at the oldest recorded step.
+
+        Returns:
+            step (int): step of the machine
+        '''
+        return self.goto(max(self.__step - count, min(self.__checkpoints, default = 0)))
+
+    def goto(self, step: int) -> int:
+        '''
+        Moves the machine to a passed step. Earlier steps are reached by undoing deltas or by replaying from the nearest
+        earlier checkpoint, whichever takes fewer instructions. Later steps are reached by running forward, stopping
+        early if the program halts or fails. A machine stopped by a failing instruction is first moved to the state
+        before it.
+
+        Args:
+            step (int): target step
+
+        Returns:
+            step (int): step of the machine
+        '''
+        step = max(step, 0)
+        if self.__failed and self.__start <= self.__step:
+            self.__undo(self.__step)
+        nearest = max((s for s in self.__checkpoints if s <= step), default = None)
+        if step < self.__step:
+            undo = self.__step - step if self.__start <= step else None
+            replay = None if nearest is None else step - nearest
+            if undo is not None and (replay is None or undo <= replay):
+                self.__undo(step)
+                return self.__step
+            if replay is None:
+                raise ValueError(f'step {step} is not recorded')
+            self.__restore(nearest)
+        elif nearest is not None and nearest > self.__step:
+            self.__restore(nearest)
+        if step > self.__step:
+            self.__forward(step)
+        return self.__step
+
+    def __undo(self, step: int):
+        '''
+        Applies undo deltas from the current step back to a passed step.
+        '''
+        m = self.machine
+        capacity = self.capacity
+        addresses, previous = self._addresses, self._previous
+        for current in range(self.__step - 1, step - 1, -1):
+            slot = current % capacity
+            if addresses[slot] >= 0:
+                m.memory.store(previous[slot], addresses[slot])
+        slot = step % capacity
+        m.AC = self._acs[slot]
+        m.PC = self._pcs[slot]
+        m.InReg = self._inputs[slot]
+        m.OutReg = self._outputs[slot]
+        self.__registers._writeBack(self._words[slot])
+        self.inputCount = self._consumed[slot]
+        self.outputCount = self._counts[slot]
+        m._rewind(step, self.outputCount, ())
+        self.__end = self.__step = step
+        self.__failed = self.__halted = False
+
+    def __restore(self, step: int):
+        '''
+        Restores the checkpoint at a passed step.
+        '''
+        m = self.machine
+        registers, memory, self.inputCount, outputs, self.__halted = self.__checkpoints[step]
+        for name, value in registers.items():
+            setattr(m, name, value)
+        m.memory.restore(memory)
+        # The machine holds the outputs up to the current step, a later checkpoint's outputs come from the output log
+        kept = min(self.outputCount, outputs)
+        m._rewind(step, kept, self.__outputLog[kept - self.__outputBase:outputs - self.__outputBase], self.__halted)
+        self.outputCount = outputs
+        self.__failed = False
+        if not self.__start <= step <= self.__end:
+            self.__start = step
+        self.__end = self.__step = step
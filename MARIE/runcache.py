@@ -0,0 +1,274 @@
+# Run result cache for the MARIE simple computer. Headless runs are
+# deterministic given the loaded memory image and the input values, so results
+# are keyed on a hash of both and served without executing. Runs stopped by the
+# step limit are kept as resumable partial results.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 8/15/2025
+from array import array
+from collections import OrderedDict
+import base64
+import hashlib
+import json
+import os
+import time
+import zlib
+from .marie import Marie, MarieSnapshot, RunResult, MarieExecutionError, MarieInputError, MarieStepLimitError
+from .memory import Memory, MemoryError
+
+#Cache entry format version, part of every key
+RUN_CACHE_VERSION = '1'
+
+#Error types stored with results, other errors (timeouts) are not cached
+_errors = {cls.__name__: cls for cls in (MarieExecutionError, MarieInputError, MarieStepLimitError, MemoryError)}
+
+def imageWords(memory) -> list:
+    '''
+    Returns every word of a memory, trailing zero words removed.
+    '''
+    if hasattr(memory, 'flatWords'):
+        words = list(memory.flatWords())
+    else:
+        words = [memory.load(address) for address in range(len(memory))]
+    end = len(words)
+    while end and not words[end - 1]:
+        end -= 1
+    del words[end:]
+    return words
+
+class RunCache():
+    '''
+    Cache of headless run results keyed on a SHA-256 hash of the memory type, size and image and the input values.
+    Entries hold the outputs, final registers, step count, error and final memory image of a run, so a hit leaves the
+    machine exactly as executing would. Runs stopped by the step limit are stored as partial entries which later runs
+    with a larger limit resume instead of starting over.
+
+    Entries are held in an in-process LRU tier and an optional on-disk tier of '.json' files, evicted least recently used
+    first above maxDiskBytes and dropped once older than maxAge seconds.
+
+    Attributes:
+        hits (int): runs served without executing
+        resumes (int): runs resumed from a partial entry
+        misses (int): runs executed from the start
+        diskEvictions (int): entry files evicted from the on-disk tier
+    '''
+    def __init__(self, cacheDir: str = None, maxEntries: int = 1024, maxDiskBytes: int = 64 * 1024 * 1024,
+                 maxAge: float = None):
+        '''
+        Args:
+            cacheDir (str): directory for the on-disk tier, default no on-disk tier
+            maxEntries (int): maximum number of entries held in the in-process LRU tier
+            maxDiskBytes (int): maximum total size of the on-disk tier
+            maxAge (float): seconds after which unused entries expire, default never
+        '''
+        self.cacheDir = cacheDir
+        self.maxEntries = maxEntries
+        self.maxDiskBytes = maxDiskBytes
+        self.maxAge = maxAge
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.resumes = 0
+        self.misses = 0
+        self.diskEvictions = 0
+        if cacheDir:
+            os.makedirs(cacheDir, exist_ok = True)
+
+    def key(self, memory, inputs: list) -> str:
+        '''
+        Returns the cache key of a memory image and input values.
+        '''
+        words = imageWords(memory)
+        try:
+            image = array('q', words).tobytes()
+        except OverflowError:
+            image = json.dumps(words).encode('utf-8')
+        digest = hashlib.sha256(f'{RUN_CACHE_VERSION}\0{type(memory).__name__}\0{len(memory)}\0'.encode('utf-8'))
+        digest.update(image)
+        digest.update(f'\0{json.dumps(list(inputs))}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def run(self, machine: Marie, inputs = None, maxSteps: int = None, engine = None, timeout: float = None) -> RunResult:
+        '''
+        Runs a machine's loaded program from the start as Marie.run() would, serving the result from the cache when the
+        same image and inputs were run before. Callable input sources can not be keyed and always execute.
+
+        Args:
+            machine (Marie): machine holding the loaded program
+            inputs: list of input values
+            maxSteps (int): maximum number of instructions to execute, default unlimited
+            engine: optional Engine subclass used when executing (see MARIE.engine)
+            timeout (float): wall-clock limit in seconds when executing, runs that time out are not cached
+
+        Returns:
+            result (RunResult): outputs, final registers, executed step count and any execution error
+        '''
+        if callable(inputs):
+            return machine.run(inputs, maxSteps, engine = engine, timeout = timeout)
+        inputs = list(inputs or ())
+        key = self.key(machine.memory, inputs)
+        entry = self.__lookup(key)
+        if entry is not None:
+            partial = entry['error'] is not None and entry['error'][0] == 'MarieStepLimitError'
+            steps = entry['steps']
+            if (not partial and (maxSteps is None or steps <= maxSteps)) or (partial and maxSteps == steps):
+                self.hits += 1
+                return self.__restore(machine, entry)
+            if partial and (maxSteps is None or maxSteps > steps):
+                self.resumes += 1
+                self.__restore(machine, entry)
+                return self.__execute(machine, key, inputs, entry['inputs'], maxSteps, engine, timeout, True)
+            # A longer run is cached, the state at a smaller limit is not
+            self.misses += 1
+            return machine.run(inputs, maxSteps, engine = engine, timeout = timeout)
+        self.misses += 1
+        return self.__execute(machine, key, inputs, 0, maxSteps, engine, timeout, False)
+
+    def __execute(self, machine: Marie, key: str, inputs: list, used: int, maxSteps: int, engine, timeout: float,
+                  resume: bool) -> RunResult:
+        '''
+        Executes a run, counting consumed inputs, and stores its result.
+        '''
+        position = [used]
+        def source():
+            if position[0] >= len(inputs):
+                return None
+            value = inputs[position[0]]
+            position[0] += 1
+            return value
+        result = machine.run(source, maxSteps, engine = engine, timeout = timeout, resume = resume)
+        error = result.error
+        if error is None or _errors.get(type(error).__name__) is type(error):
+            entry = {
+                'outputs': result.outputs,
+                'registers': result.registers,
+                'steps': result.steps,
+                'halted': result.halted,
+                'error': None if error is None else [type(error).__name__, str(error), self.__attributes(error)],
+                'inputs': position[0],
+                'memory': base64.b64encode(zlib.compress(json.dumps(imageWords(machine.memory)).encode('utf-8'))).decode('ascii'),
+                'head': getattr(machine.memory, '_head', 0)
+            }
+            self.__insert(key, entry)
+            self.__saveDisk(key, entry)
+        return result
+
+    def __attributes(self, error: Exception) -> dict:
+        return {name: value for name, value in vars(error).items() if isinstance(value, (int, bool, type(None)))}
+
+    def __restore(self, machine: Marie, entry: dict) -> RunResult:
+        '''
+        Leaves a machine in the stored state of an entry and returns its result.
+        '''
+        memory = machine.memory
+        words = json.loads(zlib.decompress(base64.b64decode(entry['memory'])))
+        if type(memory) is Memory:
+            memory.memory[:] = words + [0x0] * (len(memory) - len(words))
+        else:
+            for address in range(len(memory)):
+                value = words[address] if address < len(words) else 0x0
+                if memory.load(address) != value:
+                    memory.store(value, address)
+        if hasattr(memory, '_head'):
+            memory._head = entry['head']
+        machine.restore(MarieSnapshot(entry['registers'], memory.snapshot(), entry['outputs'], entry['steps'],
+                                      entry['halted']))
+        error = None
+        if entry['error'] is not None:
+            name, message, attributes = entry['error']
+            error = _errors[name].__new__(_errors[name])
+            Exception.__init__(error, message)
+            error.__dict__.update(attributes)
+        return RunResult(list(entry['outputs']), dict(entry['registers']), entry['steps'], entry['halted'], error)
+
+    def __lookup(self, key: str) -> dict:
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+            return entry
+        entry = self.__loadDisk(key)
+        if entry is not None:
+            self.__insert(key, entry)
+        return entry
+
+    def __insert(self, key: str, entry: dict):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.maxEntries:
+            self.__entries.popitem(last = False)
+
+    def __loadDisk(self, key: str) -> dict:
+        '''
+        Loads an entry from the on-disk tier, refreshing its modification time for LRU eviction. Expired entries are
+        removed.
+        '''
+        if not self.cacheDir:
+            return None
+        path = os.path.join(self.cacheDir, f'{key}.json')
+        try:
+            if self.maxAge is not None and time.time() - os.path.getmtime(path) > self.maxAge:
+                os.remove(path)
+                return None
+            with open(path, 'r') as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def __saveDisk(self, key: str, entry: dict):
+        '''
+        Writes an entry to the on-disk tier and evicts expired and least recently used entries over the size bound.
+        '''
+        if not self.cacheDir:
+            return
+        tmp = os.path.join(self.cacheDir, f'{key}.{os.getpid()}.tmp')
+        with open(tmp, 'w') as file:
+            json.dump(entry, file, separators = (',', ':'))
+        os.replace(tmp, os.path.join(self.cacheDir, f'{key}.json'))
+        self.evict()
+
+    def evict(self):
+        '''
+        Removes expired entry files and the least recently used files above maxDiskBytes from the on-disk tier.
+        '''
+        if not self.cacheDir:
+            return
+        files = []
+        total = 0
+        now = time.time()
+        with os.scandir(self.cacheDir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        files.sort()
+        for mtime, size, path in files:
+            expired = self.maxAge is not None and now - mtime > self.maxAge
+            if total <= self.maxDiskBytes and not expired:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.diskEvictions += 1
+
+    def stats(self) -> dict:
+        '''
+        Cache counters keyed by name, including the number of entries in the in-process tier.
+        '''
+        return {
+            'hits': self.hits,
+            'resumes': self.resumes,
+            'misses': self.misses,
+            'diskEvictions': self.diskEvictions,
+            'entries': len(self.__entries)
+        }
+
+    def clear(self):
+        '''
+        Empties the in-process tier, the on-disk tier is kept.
+        '''
+        self.__entries.clear()
@@ -0,0 +1,174 @@
+# Output sinks for headless MARIE runs. Sinks are callables passed as the output
+# argument of Marie.run() and receive each value as it is output, letting
+# consumers stream, bound, persist or check outputs while the program runs.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 7/11/2025
+from collections import deque
+import json
+from .marie import MarieOutputError
+
+class OutputSink():
+    '''
+    Base output sink. Calling a sink with a value writes it, exceptions raised while writing stop the run and are
+    reported in its RunResult. Sinks holding resources are closed with close() or by using them as context managers.
+    '''
+    def __call__(self, value: int):
+        self.write(value)
+
+    def write(self, value: int):
+        '''
+        Receives a single output value.
+        '''
+        raise NotImplementedError()
+
+    def close(self):
+        '''
+        Flushes and releases the sink.
+        '''
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class ListSink(OutputSink):
+    '''
+    Collects every output value.
+
+    Attributes:
+        values (list): output values, in order
+    '''
+    def __init__(self):
+        self.values = []
+
+    def write(self, value: int):
+        self.values.append(value)
+
+class RingBufferSink(OutputSink):
+    '''
+    Keeps the last capacity output values, older values are dropped.
+
+    Attributes:
+        values (deque): last output values, oldest first
+        count (int): number of values written
+    '''
+    def __init__(self, capacity: int):
+        '''
+        Args:
+            capacity (int): number of values kept
+        '''
+        self.values = deque(maxlen = capacity)
+        self.count = 0
+
+    @property
+    def dropped(self) -> int:
+        '''Number of values dropped from the buffer'''
+        return self.count - len(self.values)
+
+    def write(self, value: int):
+        self.values.append(value)
+        self.count += 1
+
+class FileSink(OutputSink):
+    '''
+    Writes output values to a file in batches, one value per line as a decimal integer or, in JSON lines mode, as an
+    object with the keys 'index' and 'value'.
+    '''
+    def __init__(self, filepath: str, batchSize: int = 256, jsonl: bool = False, mode: str = 'w'):
+        '''
+        Args:
+            filepath (str): target file path
+            batchSize (int): values buffered between writes
+            jsonl (bool): write JSON lines instead of plain integers
+            mode (str): file open mode, 'a' appends to an existing file
+        '''
+        self.file = open(filepath, mode)
+        self.batchSize = batchSize
+        self.jsonl = jsonl
+        self.count = 0
+        self.__buffer = []
+
+    def write(self, value: int):
+        if self.jsonl:
+            self.__buffer.append(json.dumps({'index': self.count, 'value': value}))
+        else:
+            self.__buffer.append(f'{value}')
+        self.count += 1
+        if len(self.__buffer) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        '''
+        Writes the buffered values to the file.
+        '''
+        if self.__buffer:
+            self.file.write('\n'.join(self.__buffer) + '\n')
+            self.__buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+class ExpectedSink(OutputSink):
+    '''
+    Checks output values against an expected sequence and stops the run at the first divergence, or at the first value
+    past the end of the expected outputs, with a MarieOutputError.
+
+    Attributes:
+        expected (list): expected output values
+        matched (int): number of values matching the expected outputs so far
+    '''
+    def __init__(self, expected: list, sink: OutputSink = None):
+        '''
+        Args:
+            expected (list): expected output values
+            sink: optional sink receiving every value before it is checked
+        '''
+        self.expected = list(expected)
+        self.sink = sink
+        self.matched = 0
+
+    @property
+    def complete(self) -> bool:
+        '''True if every expected value was output'''
+        return self.matched == len(self.expected)
+
+    def write(self, value: int):
+        if self.sink is not None:
+            self.sink(value)
+        index = self.matched
+        if index >= len(self.expected):
+            raise MarieOutputError(f'unexpected output {value} at index {index} (expected {len(self.expected)} outputs)', index)
+        if value != self.expected[index]:
+            raise MarieOutputError(f'output mismatch at index {index} (expected {self.expected[index]}, got {value})', index)
+        self.matched += 1
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+
+class TeeSink(OutputSink):
+    '''
+    Forwards each output value to several sinks in order.
+    '''
+    def __init__(self, *sinks):
+        '''
+        Args:
+            sinks: sinks, or plain callables, receiving each value
+        '''
+        self.sinks = sinks
+
+    def write(self, value: int):
+        for sink in self.sinks:
+            sink(value)
+
+    def close(self):
+        for sink in self.sinks:
+            if isinstance(sink, OutputSink):
+                sink.close()
@@ -0,0 +1,210 @@
+# Vectorized lockstep execution of many MARIE machines running the same program
+# image. Registers are held as NumPy arrays and memory as an N x 4096 int64
+# matrix, each step executes one instruction on every running machine.
+#
+# Requires NumPy.
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 5/30/2025
+from .abstraction import MemoryABC
+from .marie import RunResult, MarieExecutionError, MarieInputError, MarieStepLimitError
+from .memory import MemoryError
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class VectorMarie():
+    '''
+    N MARIE machines executing one program image in lockstep. Handlers follow the Marie class semantics, memory words
+    hold the values stored as in Memory. Machines retire as they halt or fail.
+
+    Attributes:
+        AC, MAR, MBR, PC, IR, InReg, OutReg: int64 register arrays, one entry per machine
+        memory: int64 memory matrix, one row per machine
+        steps: int64 array of executed instruction counts
+    '''
+    def __init__(self, mem: MemoryABC, count: int):
+        '''
+        Args:
+            mem (MemoryABC): memory holding the program image shared by every machine
+            count (int): number of machines
+
+        Raises:
+            ImportError: if NumPy is not installed
+        '''
+        if np is None:
+            raise ImportError('VectorMarie requires NumPy')
+        self.count = count
+        self.size = len(mem)
+        self.image = np.array([mem.load(address) for address in range(self.size)], dtype=np.int64)
+        self.memory = np.empty((count, self.size), dtype=np.int64)
+        self.__initialize()
+
+    def __initialize(self):
+        n = self.count
+        self.memory[:] = self.image
+        self.AC = np.zeros(n, dtype=np.int64)
+        self.MAR = np.zeros(n, dtype=np.int64)
+        self.MBR = np.zeros(n, dtype=np.int64)
+        self.PC = np.zeros(n, dtype=np.int64)
+        self.IR = np.zeros(n, dtype=np.int64)
+        self.InReg = np.zeros(n, dtype=np.int64)
+        self.OutReg = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.halted = np.zeros(n, dtype=bool)
+        self.errors = [None] * n
+        self.outputs = [[] for _ in range(n)]
+        self.__active = np.arange(n)
+
+    def registers(self, machine: int) -> dict:
+        '''
+        Register values of a single machine keyed by register name.
+        '''
+        return {name: int(getattr(self, name)[machine]) for name in ('AC', 'MAR', 'MBR', 'PC', 'IR', 'InReg', 'OutReg')}
+
+    def __fail(self, machines, error):
+        '''
+        Records an error for each passed machine, retiring them at the end of the step.
+        '''
+        for i in machines.tolist():
+            self.errors[i] = error(i) if callable(error) else error
+
+    def run(self, inputs: list = None, maxSteps: int = None) -> list:
+        '''
+        Runs every machine from a fresh copy of the program image until it halts, fails or reaches the step limit.
+
+        Args:
+            inputs (list): one list of input values per machine, default no inputs
+            maxSteps (int): maximum number of instructions executed per machine, default unlimited
+
+        Returns:
+            results (list): RunResult for each machine
+        '''
+        self.__initialize()
+        self.__inputs = [list(i) for i in inputs] if inputs is not None else [[] for _ in range(self.count)]
+        self.__inputPtr = [0] * self.count
+        step = 0
+        while len(self.__active) and step != maxSteps:
+            self.step()
+            step += 1
+        for i in self.__active.tolist():
+            self.errors[i] = MarieStepLimitError(f'step limit reached ({maxSteps} steps, address {self.PC[i]})')
+        return [RunResult(self.outputs[i], self.registers(i), int(self.steps[i]), bool(self.halted[i]), self.errors[i])
+                for i in range(self.count)]
+
+    def step(self):
+        '''
+        Executes one instruction on every running machine.
+        '''
+        active = self.__active
+        mem = self.memory
+        pc = self.PC[active]
+
+        #Fetch, machines with PC outside memory fail before MBR and IR are set. Negative addresses index from the end
+        #of memory as in Memory.load
+        self.MAR[active] = pc
+        inside = (pc >= -self.size) & (pc < self.size)
+        if not inside.all():
+            high = active[pc >= self.size]
+            self.__fail(high, lambda i: MemoryError(f'address out of bounds error (0x{int(self.PC[i]):04X})'))
+            self.__fail(active[pc < -self.size], IndexError('list index out of range'))
+            active, pc = active[inside], pc[inside]
+        word = mem[active, pc]
+        self.MBR[active] = word
+        self.IR[active] = word
+        self.PC[active] = pc + 1
+
+        #Decode
+        inst = (word >> 12) & 0xF
+        operand = word & 0xFFF
+        self.MAR[active] = operand
+        failed = np.zeros(len(active), dtype=bool)
+        for op in np.flatnonzero(np.bincount(inst, minlength=16)).tolist():
+            select = inst == op
+            idx = active[select]
+            x = operand[select]
+            if op == 0x0:
+                mem[idx, x] = self.PC[idx] + 1
+                self.PC[idx] = x + 1
+            elif op == 0x1:
+                self.AC[idx] = mem[idx, x]
+            elif op == 0x2:
+                value = self.AC[idx]
+                bad = value > 0xFFFF
+                if bad.any():
+                    self.__fail(idx[bad], MarieExecutionError(f'{MemoryError("storage bound error (max 0xFFFF)")}'))
+                    failed[np.flatnonzero(select)[bad]] = True
+                    idx, x, value = idx[~bad], x[~bad], value[~bad]
+                mem[idx, x] = value
+            elif op == 0x3:
+                self.MBR[idx] = mem[idx, x]
+                self.AC[idx] += self.MBR[idx]
+            elif op == 0x4:
+                self.MBR[idx] = mem[idx, x]
+                self.AC[idx] -= self.MBR[idx]
+            elif op == 0x5:
+                for k, i in enumerate(idx.tolist()):
+                    value, error = self.__readInput(i)
+                    if error:
+                        self.errors[i] = error
+                        failed[np.flatnonzero(select)[k]] = True
+                    else:
+                        self.InReg[i] = value
+                        self.AC[i] = value
+            elif op == 0x6:
+                self.OutReg[idx] = self.AC[idx]
+                for i in idx.tolist():
+                    self.outputs[i].append(int(self.AC[i]))
+            elif op == 0x7:
+                self.halted[idx] = True
+            elif op == 0x8:
+                ac = self.AC[idx]
+                skip = ((x == 0x000) & (ac < 0)) | ((x == 0x400) & (ac == 0)) | ((x == 0x800) & (ac > 0))
+                self.PC[idx[skip]] += 1
+            elif op == 0x9:
+                self.PC[idx] = x
+            elif op == 0xA:
+                self.AC[idx] = 0
+            elif op == 0xB:
+                address = mem[idx, x]
+                self.MBR[idx] = address
+                self.MAR[idx] = address
+                high = address >= self.size
+                low = address < -self.size
+                bad = high | low
+                if bad.any():
+                    self.__fail(idx[high], lambda i: MarieExecutionError(f'{MemoryError(f"address out of bounds error (0x{int(self.MAR[i]):04X})")}'))
+                    self.__fail(idx[low], MarieExecutionError('list index out of range'))
+                    failed[np.flatnonzero(select)[bad]] = True
+                    idx, address = idx[~bad], address[~bad]
+                self.MBR[idx] = mem[idx, address]
+                self.AC[idx] += self.MBR[idx]
+            elif op == 0xC:
+                self.PC[idx] = mem[idx, x]
+            else:
+                self.__fail(idx, lambda i: MarieExecutionError(f'critical error, passed instruction outside instruction set (address {int(self.PC[i]) - 1})'))
+                failed[select] = True
+
+        #Count completed instructions and retire halted and failed machines
+        self.steps[active[~failed]] += 1
+        running = ~(failed | self.halted[active])
+        self.__active = active[running]
+
+    def __readInput(self, machine: int) -> tuple:
+        '''
+        Reads the next input value of a machine.
+
+        Returns:
+            (value, error): input value, or None and the input error
+        '''
+        ptr = self.__inputPtr[machine]
+        values = self.__inputs[machine]
+        if ptr >= len(values):
+            return None, MarieInputError(f'input requested but no input values remain (address {int(self.PC[machine]) - 1})')
+        self.__inputPtr[machine] = ptr + 1
+        value = int(values[ptr])
+        if value > 0xFFF:
+            return None, MarieInputError(f'input value out of range (0x{value:X} > 0xFFF)')
+        return value, None
@@ -0,0 +1,248 @@
+# Benchmark suite for the MARIE assembler, execution engines and memory I/O.
+# Runs the program corpus in benchmarks/programs plus generated large sources
+# and writes machine-readable results for comparison across commits.
+#
+# Usage:
+#   python benchmarks/bench.py [--output results.json] [--compare baseline.json]
+#                              [--repeat 5] [--quick]
+#
+# Author: Steven Short
+# Professor: Abdulbast Abushgra
+# Date: 6/27/2025
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from MARIE import Assembler, Marie, Memory, ArrayMemory, PagedMemory, PredecodedEngine, CompiledEngine, FusedEngine, Profile, \
+    AcceleratedEngine
+
+programDir = os.path.join(root, 'benchmarks', 'programs')
+
+#Corpus program name to (inputs, expected outputs)
+corpus = {
+    'multiply': ([200, 160], [32000]),
+    'fibonacci': ([22], [0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 987, 1597, 2584, 4181, 6765, 10946]),
+    'bubblesort': ([], list(range(1, 17))),
+    'subroutines': ([20], [2870]),
+    'selfmodify': ([50], [136])
+}
+
+#Engine name to engine argument of Marie.run(), None for the default fetch/decode loop
+engines = {
+    'interpreter': None,
+    'predecoded': PredecodedEngine,
+    'compiled': CompiledEngine,
+    'fused': FusedEngine,
+    'accelerated': AcceleratedEngine,
+    'profiled': lambda machine: Profile().engine(machine)
+}
+
+def generateSource(statements: int, labelWidth: int = 4) -> str:
+    '''
+    Generates a runnable straight-line source of roughly the passed number of statements, built from labelled
+    LOAD/ADD/STORE blocks over a data table.
+
+    Args:
+        statements (int): approximate number of statements
+        labelWidth (int): length of the generated labels
+
+    Returns:
+        source (str): Marie assembly source
+    '''
+    blocks = max(statements // 4, 1)
+    variables = min(blocks, 64)
+    lines = ['/ generated benchmark source']
+    for i in range(blocks):
+        name = f'V{i % variables}'.ljust(labelWidth, 'X')
+        label = f'B{i}'.ljust(labelWidth, 'X')
+        lines.append(f'{label},  LOAD {name}     / block {i}')
+        lines.append(f'        ADD ONE')
+        lines.append(f'        STORE {name}')
+    lines.append('        HALT')
+    for i in range(variables):
+        lines.append(f'{f"V{i}".ljust(labelWidth, "X")}, DEC {i}')
+    lines.append('ONE,    DEC 1')
+    return '\n'.join(lines)
+
+def best(function, repeat: int, minTime: float = 0.02, setup = None) -> float:
+    '''
+    Returns the best wall-clock time of a single call to a function. Calls are timed in batches lasting at least minTime
+    seconds and the best of repeat batches is kept. When setup is passed, every call receives its own setup() result,
+    built before the batch is timed.
+    '''
+    def batch(number: int) -> float:
+        if setup is None:
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            return time.perf_counter() - start
+        prepared = [setup() for _ in range(number)]
+        start = time.perf_counter()
+        for argument in prepared:
+            function(argument)
+        return time.perf_counter() - start
+
+    number = 1
+    while True:
+        elapsed = batch(number)
+        if elapsed >= minTime:
+            break
+        number *= 2
+    times = [elapsed]
+    for _ in range(repeat - 1):
+        times.append(batch(number))
+    return min(times) / number
+
+def assemble(filepath: str) -> Assembler:
+    assembler = Assembler()
+    if not assembler.assembleFile(filepath):
+        raise RuntimeError(f'benchmark program failed to assemble ({filepath})')
+    return assembler
+
+def benchAssembler(sources: dict, repeat: int) -> list:
+    '''
+    Measures Assembler.assembleFile throughput in source lines per second.
+    '''
+    results = []
+    for name, filepath in sources.items():
+        with open(filepath, 'r') as file:
+            lines = sum(1 for _ in file)
+        elapsed = best(lambda: assemble(filepath), repeat)
+        results.append(result(f'assemble/{name}', lines / elapsed, 'lines/s', elapsed))
+    return results
+
+def benchEngines(programs: dict, repeat: int) -> list:
+    '''
+    Measures Marie.run throughput in instructions per second for every corpus program on every engine. Outputs are
+    checked against the expected outputs before timing, each timed run gets a machine loaded outside the timed region.
+    '''
+    results = []
+    for name, (filepath, inputs, expected) in programs.items():
+        words = assemble(filepath).memory
+        for engineName, engine in engines.items():
+            def machine():
+                mem = Memory()
+                mem.memory[:] = words.memory
+                return Marie(mem)
+            def run(machine):
+                return machine.run(inputs, engine = engine)
+            check = run(machine())
+            if not check.ok or (expected is not None and check.outputs != expected):
+                raise RuntimeError(f'{name} on {engineName} produced {check}')
+            elapsed = best(run, repeat, setup = machine)
+            results.append(result(f'run/{name}/{engineName}', check.steps / elapsed, 'instructions/s', elapsed))
+    return results
+
+def benchMemory(directory: str, repeat: int) -> list:
+    '''
+    Measures full 4096 word memory save and load throughput in words per second for the '.mre' and '.mri' formats.
+    '''
+    results = []
+    for memoryName, memoryType in (('list', Memory), ('array', ArrayMemory), ('paged', PagedMemory)):
+        mem = memoryType()
+        for address in range(len(mem)):
+            mem.store(address & 0xFFFF, address)
+        words = len(mem)
+        for formatName, save, load in (('mre', 'saveToFile', 'loadFromFile'), ('mri', 'saveToImage', 'loadFromImage')):
+            name = f'{memoryName}-{formatName}'
+            elapsed = best(lambda: getattr(mem, save)(name, directory), repeat)
+            results.append(result(f'memory/{name}/save', words / elapsed, 'words/s', elapsed))
+            target = memoryType()
+            elapsed = best(lambda: getattr(target, load)(name, directory), repeat)
+            results.append(result(f'memory/{name}/load', words / elapsed, 'words/s', elapsed))
+    return results
+
+def result(name: str, value: float, unit: str, elapsed: float) -> dict:
+    return {'name': name, 'value': value, 'unit': unit, 'seconds': elapsed}
+
+def commit() -> str:
+    '''
+    Current git commit of the repository, None if unavailable.
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd = root, capture_output = True, text = True,
+                              check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    '''
+    Compares results against a baseline results file.
+
+    Returns:
+        regressions (list): names of results slower than the baseline by more than threshold (fraction)
+    '''
+    previous = {entry['name']: entry['value'] for entry in baseline['results']}
+    regressions = []
+    print(f'\nCompared with {baseline.get("commit") or "baseline"}:')
+    for entry in results:
+        old = previous.get(entry['name'])
+        if not old:
+            continue
+        change = entry['value'] / old - 1
+        flag = ''
+        if change < -threshold:
+            flag = '  REGRESSION'
+            regressions.append(entry['name'])
+        print(f'  {entry["name"]:<40} {change:+8.1%}{flag}')
+    return regressions
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'MARIE benchmark suite')
+    parser.add_argument('--output', default = None, help = 'results JSON file, default print only')
+    parser.add_argument('--compare', default = None, help = 'baseline results JSON file to compare against')
+    parser.add_argument('--threshold', type = float, default = 0.25, help = 'regression threshold (fraction), default 0.25')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'runs per measurement, the best is kept')
+    parser.add_argument('--quick', action = 'store_true', help = 'single run per measurement, small generated sources')
+    args = parser.parse_args(argv)
+    repeat = 1 if args.quick else args.repeat
+    sizes = {'generated-500': (500, 4), 'generated-3000': (3000, 4), 'generated-3000-long': (3000, 30)}
+    if args.quick:
+        sizes = {'generated-500': (500, 4)}
+
+    programs = {name: (os.path.join(programDir, f'{name}.mas'), inputs, expected)
+                for name, (inputs, expected) in corpus.items()}
+    with tempfile.TemporaryDirectory() as directory:
+        generated = {}
+        for name, (statements, labelWidth) in sizes.items():
+            filepath = os.path.join(directory, f'{name}.mas')
+            with open(filepath, 'w') as file:
+                file.write(generateSource(statements, labelWidth))
+            generated[name] = filepath
+            programs[name] = (filepath, [], [])
+
+        results = []
+        results += benchAssembler({**{name: p[0] for name, p in programs.items() if name in corpus}, **generated}, repeat)
+        results += benchEngines(programs, repeat)
+        results += benchMemory(os.path.join(directory, ''), repeat)
+
+    for entry in results:
+        print(f'{entry["name"]:<40} {entry["value"]:>14,.0f} {entry["unit"]}')
+
+    report = {
+        'commit': commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent = 1)
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            if compare(results, json.load(file), args.threshold):
+                return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())